@@ -0,0 +1,267 @@
+"""
+Optional ASGI deployment for the read-heavy public endpoints.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 2
+
+Public news lists and match fixtures/results are answered by async handlers
+running on the event loop against the async database engine, so hundreds of
+slow or keep-alive clients do not each pin a sync worker. Every other request
+is handed unchanged to the Flask app on a thread pool, so authentication,
+validation and writes behave exactly as in the WSGI deployment.
+"""
+
+import asyncio
+import math
+import re
+from urllib.parse import parse_qsl
+
+from werkzeug.datastructures import MultiDict
+
+from app.filters import FilterError, news_filters
+from app.models import Match, News
+from app.serializers import dumps, match_serializer, news_serializer
+from app.services.rate_limit import RedisStorage, exceeded_headers, exceeded_payload
+
+
+class AsyncRequest:
+    """The parts of an ASGI request the async handlers need."""
+
+    def __init__(self, scope):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1')
+                        for name, value in scope.get('headers', [])}
+        self.args = MultiDict(parse_qsl(scope.get('query_string', b'').decode('latin-1'),
+                                        keep_blank_values=True))
+        self.remote_addr = (scope.get('client') or (None, None))[0]
+
+    @property
+    def access_route(self):
+        """Same as Werkzeug's: the ``X-Forwarded-For`` chain, else the peer."""
+        forwarded = self.headers.get('x-forwarded-for')
+        if forwarded:
+            return [address.strip() for address in forwarded.split(',')]
+        return [self.remote_addr]
+
+
+class AsyncApplication:
+    """ASGI app routing selected GET endpoints to async handlers.
+
+    Unmatched requests fall through to the Flask app. The WSGI bridge runs
+    on ``ASGI_WSGI_THREADS`` threads, independent from the async DB pool.
+    Rate limit and revocation checks backed by Redis run on the loop's
+    default executor so their network round trips never block the loop.
+    """
+
+    def __init__(self, flask_app, database):
+        from uvicorn.middleware.wsgi import WSGIMiddleware
+
+        self.flask_app = flask_app
+        self.database = database
+        self.routes = []
+        self.rate_limiter = flask_app.extensions.get('rate_limiter')
+        self.token_revocation = flask_app.extensions['token_revocation']
+        self.compressor = flask_app.extensions.get('compressor')
+        self.cors_origins = set(flask_app.config.get('CORS_ORIGINS') or [])
+        self.wsgi = WSGIMiddleware(flask_app, workers=int(flask_app.config.get('ASGI_WSGI_THREADS', 10)))
+
+    def route(self, pattern, endpoint, unless=()):
+        """Register an async handler for a GET path pattern.
+
+        ``endpoint`` is the name of the Flask view it stands in for, so the
+        same ``RATELIMITS`` rules apply. Requests with any of the ``unless``
+        query parameters are left to that view.
+        """
+        regex = re.compile(pattern)
+
+        def decorator(handler):
+            self.routes.append((regex, endpoint, frozenset(unless), handler))
+            return handler
+        return decorator
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            for regex, endpoint, unless, handler in self.routes:
+                match = regex.fullmatch(scope['path'])
+                if match:
+                    request = AsyncRequest(scope)
+                    if unless.intersection(request.args):
+                        break
+                    exceeded = await self.check_rate_limit(request, endpoint)
+                    if exceeded:
+                        await self.send_json(send, request, 429, exceeded_payload(exceeded),
+                                             exceeded_headers(exceeded))
+                        return
+                    status, payload = await handler(self, request, **match.groupdict())
+                    await self.send_json(send, request, status, payload)
+                    return
+
+        await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.database.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def blocking(remote, func, *args):
+        """Call a synchronous helper, in a thread when it does network I/O."""
+        if not remote:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def check_rate_limit(self, request, endpoint):
+        """Apply the Flask app's rate limits (per IP: these routes are public)."""
+        if not (self.rate_limiter and self.rate_limiter.enabled):
+            return None
+        rules = self.rate_limiter.rules_for(endpoint, endpoint.split('.')[0])
+        if not rules:
+            return None
+        ip = self.rate_limiter.client_ip(request.access_route, request.remote_addr)
+        exceeded, _ = await self.blocking(isinstance(self.rate_limiter.storage, RedisStorage),
+                                          self.rate_limiter.evaluate, rules, ip)
+        return exceeded
+
+    async def send_json(self, send, request, status, payload, extra_headers=()):
+        body = dumps(payload)
+        headers = [(b'content-type', b'application/json')]
+        if self.compressor is not None and self.compressor.enabled:
+            body, encoding = self.compressor.compress_body(body, 'application/json',
+                                                           request.headers.get('accept-encoding'))
+            headers.append((b'vary', b'Accept-Encoding'))
+            if encoding is not None:
+                headers.append((b'content-encoding', encoding.encode()))
+        headers.append((b'content-length', str(len(body)).encode()))
+        headers += [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in extra_headers]
+
+        origin = request.headers.get('origin')
+        if origin and (origin in self.cors_origins or '*' in self.cors_origins):
+            headers += [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'' if request.method == 'HEAD' else body})
+
+    async def authenticate(self, request):
+        """Validate the bearer token like ``@requires()``; returns an error or None."""
+        from flask_jwt_extended import decode_token
+        from jwt import ExpiredSignatureError
+
+        authorization = request.headers.get('authorization', '')
+        if not authorization.startswith('Bearer '):
+            return 401, {'msg': 'Missing Authorization Header'}
+
+        with self.flask_app.app_context():
+            try:
+                payload = decode_token(authorization[7:])
+            except ExpiredSignatureError:
+                return 401, {'msg': 'Token has expired'}
+            except Exception as e:
+                return 422, {'msg': str(e)}
+
+        if payload.get('type') != 'access':
+            return 422, {'msg': 'Only non-refresh tokens are allowed'}
+        revoked = await self.blocking(self.token_revocation.backend == 'redis',
+                                      self.token_revocation.is_revoked, payload)
+        if revoked:
+            return 401, {'msg': 'Token has been revoked'}
+        # Same checks as @requires()
+        if payload.get('role') is None:
+            return 401, {'error': 'Token outdated', 'message': 'Refresh the access token'}
+        if not payload.get('is_active'):
+            return 401, {'error': 'Account is deactivated'}
+        return None
+
+
+def create_asgi_app(flask_app):
+    """Wrap a Flask app with async handlers for the public read endpoints."""
+    from app import async_db
+    from app.routes.news import published_news_query
+
+    application = AsyncApplication(flask_app, async_db)
+
+    @application.route(r'/api/news', 'news.get_news', unless=('ids',))
+    async def news_list(app, request):
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 10, type=int)
+        try:
+            plan = news_serializer.plan_from_args(request.args)
+        except ValueError as err:
+            return 400, {'error': 'Invalid fieldset', 'message': str(err)}
+        try:
+            filters = news_filters.compile(request.args, config=app.flask_app.config)
+        except FilterError as err:
+            return 400, {'error': 'Invalid filter', 'message': str(err)}
+
+        def load(session):
+            query = published_news_query(session.query(News).options(*news_serializer.load_options(plan)), filters)
+            total = query.order_by(None).count()
+            items = query.limit(per_page).offset((max(page, 1) - 1) * per_page).all()
+            return total, plan.dump_many(items)
+
+        total, articles = await app.database.run(load)
+        pages = math.ceil(total / per_page) if per_page > 0 else 0
+        return 200, {
+            'articles': articles,
+            'pagination': {
+                'page': page,
+                'pages': pages,
+                'per_page': per_page,
+                'total': total,
+                'has_next': page < pages,
+                'has_prev': page > 1
+            }
+        }
+
+    @application.route(r'/api/news/featured', 'news.get_featured_news')
+    async def featured_news(app, request):
+        limit = request.args.get('limit', 5, type=int)
+        articles = await app.database.run(
+            lambda session: news_serializer.dump_many(News.get_featured_articles(limit, session=session)))
+        return 200, {'featured_articles': articles}
+
+    @application.route(r'/api/news/breaking', 'news.get_breaking_news')
+    async def breaking_news(app, request):
+        limit = request.args.get('limit', 3, type=int)
+        articles = await app.database.run(
+            lambda session: news_serializer.dump_many(News.get_breaking_news(limit, session=session)))
+        return 200, {'breaking_news': articles}
+
+    @application.route(r'/api/news/recent', 'news.get_recent_news')
+    async def recent_news(app, request):
+        limit = request.args.get('limit', 10, type=int)
+        category = request.args.get('category')
+        articles = await app.database.run(
+            lambda session: news_serializer.dump_many(
+                News.get_recent_articles(limit, category, session=session)))
+        return 200, {'recent_articles': articles}
+
+    @application.route(r'/api/matches/upcoming', 'matches.get_upcoming_matches')
+    async def upcoming_matches(app, request):
+        error = await app.authenticate(request)
+        if error:
+            return error
+        limit = request.args.get('limit', 5, type=int)
+        matches = await app.database.run(
+            lambda session: match_serializer.dump_many(Match.get_upcoming_matches(limit, session=session)))
+        return 200, {'upcoming_matches': matches}
+
+    @application.route(r'/api/matches/results', 'matches.get_recent_results')
+    async def recent_results(app, request):
+        error = await app.authenticate(request)
+        if error:
+            return error
+        limit = request.args.get('limit', 5, type=int)
+        matches = await app.database.run(
+            lambda session: match_serializer.dump_many(Match.get_recent_results(limit, session=session)))
+        return 200, {'recent_results': matches}
+
+    return application
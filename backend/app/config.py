@@ -1,27 +1,138 @@
 import os
 from datetime import timedelta
 
+from dotenv import load_dotenv
+
+# Load environment variables before the settings below read them
+load_dotenv()
+
 class Config:
     """Base configuration class."""
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Database connection pool (per process: workers x (size + overflow) < max_connections)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # Seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    DB_STATEMENT_TIMEOUT = int(os.getenv('DB_STATEMENT_TIMEOUT', 0))  # Milliseconds, 0 = no limit
+    DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'False').lower() == 'true'  # PgBouncer transaction pooling: NullPool, no prepared statements
+    
+    # Read replicas: GET requests of these blueprints read from a replica
+    DATABASE_REPLICA_URLS = [url for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url]
+    REPLICA_BLUEPRINTS = ('auth', 'players', 'matches', 'trainings', 'finances', 'news')
+    REPLICA_READ_YOUR_WRITES = float(os.getenv('REPLICA_READ_YOUR_WRITES', 5))  # Seconds a writer keeps reading the primary
+    REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', 5))  # Seconds of lag before a replica leaves the rotation
+    REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('REPLICA_LAG_CHECK_INTERVAL', 2))
+    REPLICA_STICKY_BACKEND = os.getenv('REPLICA_STICKY_BACKEND', 'memory')  # 'redis' to share the window across workers
+    
     # JWT Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(seconds=int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES', 3600)))
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(seconds=int(os.getenv('JWT_REFRESH_TOKEN_EXPIRES', 2592000)))
+    JWT_QUERY_STRING_NAME = 'access_token'  # Only read by views accepting query string tokens (EventSource)
+    TOKEN_REVOCATION_BACKEND = os.getenv('TOKEN_REVOCATION_BACKEND', 'memory')  # 'redis' to share logouts/role changes across workers
     
     # Mail Configuration
-    MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
+    MAIL_SERVER = os.getenv('MAIL_SERVER')  # Mail is only set up when a server is configured
     MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
     MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'True').lower() == 'true'
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'noreply@esc.tn')
+    MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE', 50))  # Messages per SMTP connection
+    MAIL_DEFAULT_RATE_LIMIT = float(os.getenv('MAIL_DEFAULT_RATE_LIMIT', 0))  # Messages/s per provider, 0 = unlimited
+    MAIL_PROVIDER_RATE_LIMITS = os.getenv('MAIL_PROVIDER_RATE_LIMITS', '')  # e.g. "gmail.com=20,yahoo.fr=5"
     
     # Upload Configuration
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
     MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16777216))  # 16MB
+    MEDIA_URL = os.getenv('MEDIA_URL', '/media')
+    UPLOAD_IMAGE_SIZES = {'thumb': 320, 'medium': 960}  # Variant name -> max width in px
+    MEDIA_ACCEL = os.getenv('MEDIA_ACCEL')  # 'nginx' (X-Accel-Redirect), 'sendfile' (X-Sendfile) or unset
+    MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/protected-media')  # nginx internal location
+    MEDIA_MAX_AGE = int(os.getenv('MEDIA_MAX_AGE', 3600))  # Cache lifetime for non content-addressed files
+
+    # Last login write-behind (seconds between batched flushes, 0 = write immediately)
+    LAST_LOGIN_FLUSH_INTERVAL = float(os.getenv('LAST_LOGIN_FLUSH_INTERVAL', 5))
+    LAST_LOGIN_BATCH_SIZE = int(os.getenv('LAST_LOGIN_BATCH_SIZE', 500))
+    
+    # Background jobs ('redis' in production, 'thread' in development, 'eager' in tests)
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    JOB_QUEUE_BACKEND = os.getenv('JOB_QUEUE_BACKEND', 'thread')
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))
+    JOB_MAX_RETRIES = int(os.getenv('JOB_MAX_RETRIES', 3))
+    JOB_RETRY_BACKOFF = float(os.getenv('JOB_RETRY_BACKOFF', 2))  # Seconds, doubled on each retry
+    JOB_IDEMPOTENCY_TTL = int(os.getenv('JOB_IDEMPOTENCY_TTL', 86400))
+    JOB_EAGER_PROPAGATES = os.getenv('JOB_EAGER_PROPAGATES', 'True').lower() == 'true'  # Eager backend: re-raise once retries are exhausted
+    
+    # Live match events ('redis' pub/sub across processes, 'memory' for a single process)
+    LIVE_EVENTS_BACKEND = os.getenv('LIVE_EVENTS_BACKEND', 'memory')
+    LIVE_EVENTS_HISTORY = int(os.getenv('LIVE_EVENTS_HISTORY', 200))  # Events kept per match for Last-Event-ID resume
+    LIVE_EVENTS_HEARTBEAT = float(os.getenv('LIVE_EVENTS_HEARTBEAT', 15))  # Seconds between keep-alive comments
+    
+    # CORS (empty = no cross-origin access)
+    CORS_ORIGINS = [origin for origin in os.getenv('CORS_ORIGINS', 'http://localhost:4200').split(',') if origin]
+    
+    # Rate limiting: endpoint or blueprint -> rules ("<count>/<period> [per ip|user]")
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'True').lower() == 'true'
+    RATELIMIT_STORAGE = os.getenv('RATELIMIT_STORAGE', 'memory')  # 'redis' to share counters across workers
+    RATELIMIT_STRATEGY = os.getenv('RATELIMIT_STRATEGY', 'sliding-window')  # or 'token-bucket'
+    RATELIMIT_PROXY_COUNT = int(os.getenv('RATELIMIT_PROXY_COUNT', 0))  # Reverse proxies in front of the app
+    RATELIMITS = {
+        'auth.login': ['10/minute', '50/hour'],
+        'auth.register': ['5/hour'],
+        'auth.refresh': ['30/minute per user'],
+        'news': ['120/minute'],
+    }
     
+    # Response compression (gzip, brotli when installed) and precompressed response cache
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'True').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))  # Bytes; smaller bodies are sent as-is
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))  # gzip level for dynamic responses
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))  # Cached bodies use the maximum
+    COMPRESS_MIMETYPES = ['application/json', 'text/csv', 'text/plain', 'text/html', 'text/css', 'application/javascript']
+    COMPRESS_CACHE_TTL = int(os.getenv('COMPRESS_CACHE_TTL', 30))  # Seconds public lists stay cached, 0 = off
+    COMPRESS_CACHE_MAX_ENTRIES = int(os.getenv('COMPRESS_CACHE_MAX_ENTRIES', 256))
+    
+    # Blueprints registered by create_app (see app.BLUEPRINTS)
+    BLUEPRINTS = ['auth', 'players', 'matches', 'trainings', 'finances', 'news', 'dashboard', 'uploads', 'media']
+    
+    # Flask-Migrate/Alembic, enabled for `flask db` by app.cli.cli_settings
+    MIGRATIONS_ENABLED = os.getenv('MIGRATIONS_ENABLED', 'False').lower() == 'true'
+    
+    # Async (ASGI) read path: pool sized per process, independent of the worker count
+    ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')  # Defaults to DATABASE_URL with an async driver
+    ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', 20))
+    ASYNC_DB_MAX_OVERFLOW = int(os.getenv('ASYNC_DB_MAX_OVERFLOW', 10))
+    ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 10))  # Threads running the Flask app for other routes
+    
+    # Squad selection (Player.is_selectable)
+    SQUAD_RED_CARD_BAN_MATCHES = int(os.getenv('SQUAD_RED_CARD_BAN_MATCHES', 1))  # Matches a red card counts for
+    SQUAD_YELLOW_CARD_WINDOW = int(os.getenv('SQUAD_YELLOW_CARD_WINDOW', 5))  # Last finished matches counted
+    SQUAD_YELLOW_CARD_LIMIT = int(os.getenv('SQUAD_YELLOW_CARD_LIMIT', 3))  # Yellow cards in the window that suspend
+    SQUAD_ATTENDANCE_DAYS = int(os.getenv('SQUAD_ATTENDANCE_DAYS', 14))
+    SQUAD_MIN_ATTENDANCE = float(os.getenv('SQUAD_MIN_ATTENDANCE', 0.5))  # Share of recent trainings attended
+    
+    # Player form ratings (app.services.ratings)
+    RATING_FORM_MATCHES = int(os.getenv('RATING_FORM_MATCHES', 10))  # Last rated appearances counted
+    RATING_FORM_ALPHA = float(os.getenv('RATING_FORM_ALPHA', 0.3))  # Weight lost per older match
+    RATING_FULL_MINUTES = int(os.getenv('RATING_FULL_MINUTES', 90))  # Minutes for a full-weight appearance
+    RATING_OPPONENT_FACTOR = float(os.getenv('RATING_OPPONENT_FACTOR', 0.2))  # Opponent strength scales ratings by +/- half of it
+    RATING_OPPONENT_PRIOR = float(os.getenv('RATING_OPPONENT_PRIOR', 2))  # Virtual average matches per opponent
+    
+    # List filters (app.filters): predicates on unindexed fields allowed per request
+    FILTER_MAX_UNINDEXED = int(os.getenv('FILTER_MAX_UNINDEXED', 1))
+    FILTER_UNINDEXED_POLICY = os.getenv('FILTER_UNINDEXED_POLICY', 'reject')  # reject (400) or warn (logged)
+    BATCH_MAX_IDS = int(os.getenv('BATCH_MAX_IDS', 100))  # ?ids= batch lookups
+    
+    # Dashboard (GET /api/dashboard): sections loaded concurrently, each cached with its own TTL
+    DASHBOARD_WORKERS = int(os.getenv('DASHBOARD_WORKERS', 4))  # Threads per process, 0 = load in the request
+    DASHBOARD_TIMEOUT = float(os.getenv('DASHBOARD_TIMEOUT', 5))  # Seconds before a section is reported as timed out
+    DASHBOARD_SECTION_TTLS = {}  # Section name -> seconds, overrides the defaults in app.routes.dashboard
+
     # Pagination
     POSTS_PER_PAGE = 20
     PLAYERS_PER_PAGE = 20
@@ -36,6 +147,13 @@ class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+    DB_STATEMENT_TIMEOUT = int(os.getenv('DB_STATEMENT_TIMEOUT', 30000))
+    REPLICA_STICKY_BACKEND = os.getenv('REPLICA_STICKY_BACKEND', 'redis')
+    RATELIMIT_STORAGE = os.getenv('RATELIMIT_STORAGE', 'redis')
+    TOKEN_REVOCATION_BACKEND = os.getenv('TOKEN_REVOCATION_BACKEND', 'redis')
+    RATELIMIT_PROXY_COUNT = int(os.getenv('RATELIMIT_PROXY_COUNT', 1))  # nginx
+    JOB_QUEUE_BACKEND = os.getenv('JOB_QUEUE_BACKEND', 'redis')
+    LIVE_EVENTS_BACKEND = os.getenv('LIVE_EVENTS_BACKEND', 'redis')
     
     # Security settings for production
     SESSION_COOKIE_SECURE = True
@@ -47,6 +165,11 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    LAST_LOGIN_FLUSH_INTERVAL = 0
+    RATELIMIT_ENABLED = False  # Suites testing the limiter switch it on
+    JOB_QUEUE_BACKEND = 'eager'
+    COMPRESS_CACHE_TTL = 0
+    MAIL_SUPPRESS_SEND = True
 
 # Configuration dictionary
 config = {
@@ -0,0 +1,497 @@
+"""
+Declarative filtering and sorting for the list endpoints.
+
+Each model gets a ``QueryFilter`` listing the fields clients may filter
+and sort on, the way ``app.serializers`` lists the fields they may read.
+Query strings use one parameter per predicate:
+
+    ?position=ST                 eq (repeat the parameter for several values)
+    ?position__in=ST,CF          in
+    ?age__range=18,21            range (either bound may be empty), or
+    ?age__min=18&age__max=21
+    ?last_name__prefix=Ben       prefix (LIKE 'Ben%', index friendly)
+    ?sort=-rating,last_name      multi-key sort, ``-`` for descending
+    ?ids=3,1,2                   batch lookup by primary key (``fetch_by_ids``)
+
+Fields are columns or hybrid properties, so computed values
+(``Player.age``, ``PlayerStats.pass_accuracy``...) are filtered and
+sorted by the database. Everything compiles into the WHERE and ORDER BY
+clauses of the endpoint's single query; the primary key is appended to
+the sort so pages are stable.
+
+A predicate on a column without an index scans the table. Requests with
+more than ``FILTER_MAX_UNINDEXED`` such predicates are rejected
+(``FILTER_UNINDEXED_POLICY = 'reject'``) or only logged (``'warn'``).
+The parameters the endpoints accepted before they were declared here
+(``search``, ``featured``...) keep their meaning and never count against
+that budget, so existing clients are not turned away.
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask import current_app, has_app_context
+from sqlalchemy import Boolean, Date, DateTime, Enum, Float, Integer, Numeric, UniqueConstraint, and_, not_, or_
+
+from app.models import User, Player, Match, PlayerStats, Training, Finance, News
+
+OPERATORS = ('eq', 'in', 'range', 'prefix')
+RANGE_BOUNDS = ('min', 'max')
+
+
+class FilterError(ValueError):
+    """Invalid filter or sort parameters (reported to the client as a 400)."""
+
+
+def parse_bool(value):
+    """``true``/``false`` query parameter to a boolean (None when absent)."""
+    if value is None:
+        return None
+    value = value.lower()
+    if value not in ('true', 'false', '1', '0'):
+        raise FilterError(f'Invalid boolean {value!r}')
+    return value in ('true', '1')
+
+
+def parse_date(value):
+    return date.fromisoformat(value)
+
+
+def parse_datetime(value):
+    return datetime.fromisoformat(value)
+
+
+def _column(expression):
+    """The table column behind a mapped attribute (None for SQL expressions)."""
+    prop = getattr(expression, 'property', None)
+    columns = getattr(prop, 'columns', None)
+    return columns[0] if columns and len(columns) == 1 and hasattr(columns[0], 'table') else None
+
+
+def is_indexed(expression):
+    """Whether an index can serve predicates on ``expression`` (leading column of an index).
+
+    Read from the model metadata: existing databases get the indexes from the
+    migrations in backend/migrations, which must list any column declared here.
+    """
+    column = _column(expression)
+    if column is None:
+        return False
+    if column.primary_key or column.index or column.unique:
+        return True
+    table = column.table
+    leading = [index.columns.values()[0] for index in table.indexes]
+    leading += [constraint.columns.values()[0] for constraint in table.constraints
+                if isinstance(constraint, UniqueConstraint) and len(constraint.columns)]
+    return any(candidate is column for candidate in leading)
+
+
+def _converter(expression):
+    """Parser of query-string values for the type of a column."""
+    column = _column(expression)
+    column_type = column.type if column is not None else getattr(expression, 'type', None)
+    if isinstance(column_type, Boolean):
+        return parse_bool
+    if isinstance(column_type, DateTime):
+        return parse_datetime
+    if isinstance(column_type, Date):
+        return parse_date
+    if isinstance(column_type, Integer):
+        return int
+    if isinstance(column_type, Numeric) and not isinstance(column_type, Float):
+        return Decimal
+    if isinstance(column_type, Float):
+        return float
+    return str
+
+
+class Field:
+    """A column or hybrid property clients may filter and sort on.
+
+    ``type`` parses query-string values (inferred from the column type;
+    pass it for hybrid properties). ``indexed`` is inferred from the
+    table's indexes and defaults to False for SQL expressions.
+    """
+
+    def __init__(self, expression, ops=('eq', 'in'), type=None, indexed=None, sortable=True):
+        unknown = set(ops) - set(OPERATORS)
+        if unknown:
+            raise ValueError(f'Unknown filter operators: {sorted(unknown)}')
+        self.expression = expression
+        self.ops = tuple(ops)
+        self.sortable = sortable
+        self.indexed = is_indexed(expression) if indexed is None else indexed
+        self.parse = type or _converter(expression)
+        column = _column(expression)
+        self.choices = tuple(column.type.enums) if column is not None and isinstance(column.type, Enum) else None
+        self._datetime = column is not None and isinstance(column.type, DateTime)
+
+    def value(self, name, raw):
+        if self.parse is parse_bool:
+            return parse_bool(raw)
+        try:
+            value = self.parse(raw)
+        except (ValueError, ArithmeticError):
+            raise FilterError(f'Invalid value {raw!r} for {name}') from None
+        if self.choices is not None and value not in self.choices:
+            raise FilterError(f"Invalid value {raw!r} for {name} (expected one of: {', '.join(self.choices)})")
+        return value
+
+    def predicate(self, name, op, values, args):
+        """SQL criterion for ``op``; ``values`` are the raw query-string values."""
+        expression = self.expression
+        if op == 'eq':
+            parsed = [self.value(name, raw) for raw in values]
+            if self.parse is parse_bool:
+                return expression if parsed[-1] else not_(expression)
+            return expression == parsed[0] if len(parsed) == 1 else expression.in_(parsed)
+        if op == 'in':
+            parsed = [self.value(name, raw) for raw in ','.join(values).split(',') if raw]
+            if not parsed:
+                raise FilterError(f'{name}__in needs at least one value')
+            return expression.in_(parsed)
+        if op == 'prefix':
+            return expression.startswith(values[-1], autoescape=True)
+        # range: (low, high), either may be None
+        low, high = values
+        criteria = []
+        if low:
+            criteria.append(expression >= self.value(name, low))
+        if high:
+            if self._datetime and len(high) == 10:
+                # A day as the upper bound of a timestamp includes the whole day
+                criteria.append(expression < self.value(name, high) + timedelta(days=1))
+            else:
+                criteria.append(expression <= self.value(name, high))
+        if not criteria:
+            raise FilterError(f'{name}__range needs a lower or an upper bound')
+        return and_(*criteria)
+
+
+class Custom:
+    """A named predicate built by ``builder(value, args)`` (None to skip it)."""
+
+    ops = ('eq',)
+    sortable = False
+
+    def __init__(self, builder, indexed=False):
+        self.builder = builder
+        self.indexed = indexed
+
+    def predicate(self, name, op, values, args):
+        try:
+            return self.builder(values[-1], args)
+        except FilterError:
+            raise
+        except (ValueError, ArithmeticError):
+            raise FilterError(f'Invalid value {values[-1]!r} for {name}') from None
+
+
+def search(*columns):
+    """``?search=`` substring match over several columns (never indexed)."""
+    def builder(value, args):
+        if not value:
+            return None
+        escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return or_(*(column.ilike(f'%{escaped}%', escape='\\') for column in columns))
+    return Custom(builder)
+
+
+def calendar_period(column):
+    """``?year=2024[&month=3]`` as a date range on ``column``, so its index is used."""
+    def builder(value, args):
+        year = int(value)
+        month = args.get('month', type=int)
+        if month:
+            if not 1 <= month <= 12:
+                raise FilterError(f'Invalid month {month}')
+            start = date(year, month, 1)
+            end = date(year + month // 12, month % 12 + 1, 1)
+        else:
+            start, end = date(year, 1, 1), date(year + 1, 1, 1)
+        return and_(column >= start, column < end)
+    return Custom(builder, indexed=is_indexed(column))
+
+
+def choice(**options):
+    """A parameter selecting one of several predicates (None = no filter).
+
+    Unknown values select nothing, like the hand-written filters did.
+    """
+    def builder(value, args):
+        return options.get(value)
+    return Custom(builder)
+
+
+def flag(expression):
+    """``?featured=true`` style switch: ``true`` filters, anything else does not."""
+    def builder(value, args):
+        return expression if value.lower() in ('true', '1') else None
+    return Custom(builder, indexed=is_indexed(expression))
+
+
+class CompiledFilter:
+    """WHERE criteria and ORDER BY clauses compiled from a query string."""
+
+    def __init__(self, criteria, order_by, unindexed):
+        self.criteria = criteria
+        self.order_by = order_by
+        self.unindexed = unindexed
+
+    def apply(self, query):
+        return query.filter(*self.criteria).order_by(*self.order_by)
+
+
+class QueryFilter:
+    """Whitelisted filter and sort parameters of a model's list endpoint.
+
+    ``fields`` maps parameter names to ``Field`` or ``Custom`` entries,
+    ``sort`` maps extra sort-only keys to expressions, ``aliases`` maps
+    legacy parameter names to their canonical form (``'age_min':
+    'age__min'``) and ``defaults`` gives values used when a parameter is
+    absent (an empty value disables them). Defaults are chosen by the
+    endpoint and do not count against the unindexed predicate budget;
+    neither do the ``legacy`` fields, which clients used before.
+    """
+
+    def __init__(self, model, fields, sort=None, default_sort=None, aliases=None, defaults=None, legacy=()):
+        self.model = model
+        self.fields = dict(fields)
+        self.sort_keys = {name: field.expression for name, field in self.fields.items() if field.sortable}
+        self.sort_keys.update(sort or {})
+        self.default_sort = default_sort
+        self.aliases = dict(aliases or {})
+        self.defaults = dict(defaults or {})
+        self.legacy = frozenset(legacy)
+        self.primary_key = model.__mapper__.primary_key[0]
+
+    def _params(self, args):
+        """``{(field, op): [raw values]}`` from the query string."""
+        params = {}
+        for key in args:
+            values = args.getlist(key)
+            name, _, op = self.aliases.get(key, key).partition('__')
+            field = self.fields.get(name)
+            if field is None:
+                if op:
+                    raise FilterError(f'Unknown filter field {name!r}')
+                continue  # Not a filter (page, fields, sort...)
+            if op in RANGE_BOUNDS:
+                bounds = params.setdefault((name, 'range'), [None, None])
+                bounds[RANGE_BOUNDS.index(op)] = values[-1]
+                op = 'range'
+            elif op == 'range':
+                low, _, high = values[-1].partition(',')
+                params[(name, 'range')] = [low or None, high or None]
+            else:
+                params[(name, op or 'eq')] = values
+            if (op or 'eq') not in field.ops:
+                raise FilterError(f"{name} does not support {op or 'eq'} (supported: {', '.join(field.ops)})")
+        return params
+
+    def order_by(self, value):
+        """ORDER BY clauses for ``?sort=``, ending with the primary key."""
+        clauses, unique = [], False
+        for name in (value or self.default_sort or '').split(','):
+            name = name.strip()
+            if not name:
+                continue
+            key = name.lstrip('-')
+            if key not in self.sort_keys:
+                raise FilterError(f"Unknown sort key {key!r} (expected one of: {', '.join(self.sort_keys)})")
+            expression = self.sort_keys[key]
+            clauses.append(expression.desc() if name.startswith('-') else expression.asc())
+            unique = unique or _column(expression) is self.primary_key
+        if not unique:
+            clauses.append(self.primary_key.asc())
+        return clauses
+
+    def compile(self, args, config=None):
+        """Compile ``args`` (a ``MultiDict``) into criteria and sort clauses.
+
+        Raises ``FilterError`` for unknown fields, unsupported operators,
+        invalid values and, under the reject policy, too many predicates on
+        unindexed columns.
+        """
+        if config is None:
+            config = current_app.config if has_app_context() else {}
+        params = self._params(args)
+        requested = {name for name, _ in params}
+        for name, value in self.defaults.items():
+            if name not in requested and name not in args:
+                params[(name, 'eq')] = [value]
+
+        criteria, unindexed = [], []
+        for (name, op), values in params.items():
+            field = self.fields[name]
+            if op == 'eq' and not values[-1]:
+                continue  # ?status= disables a default
+            criterion = field.predicate(name, op, values, args)
+            if criterion is None:
+                continue
+            criteria.append(criterion)
+            if not field.indexed and name in requested and name not in self.legacy:
+                unindexed.append(name)
+
+        limit = config.get('FILTER_MAX_UNINDEXED', 1)
+        if len(unindexed) > limit:
+            message = (f"Too many filters on unindexed fields ({', '.join(sorted(unindexed))}); "
+                       f'combine at most {limit} with indexed ones')
+            if config.get('FILTER_UNINDEXED_POLICY', 'reject') == 'reject':
+                raise FilterError(message)
+            if has_app_context():
+                current_app.logger.warning('%s: %s', self.model.__name__, message)
+
+        return CompiledFilter(criteria, self.order_by(args.get('sort')), unindexed)
+
+    def apply(self, query, args):
+        return self.compile(args).apply(query)
+
+
+def parse_ids(value, limit=None):
+    """``?ids=3,1,2`` as a list of distinct ids, in request order."""
+    if limit is None:
+        limit = current_app.config.get('BATCH_MAX_IDS', 100) if has_app_context() else 100
+    try:
+        ids = list(dict.fromkeys(int(part) for part in value.split(',') if part.strip()))
+    except ValueError:
+        raise FilterError(f'Invalid ids {value!r} (expected comma-separated integers)') from None
+    if not ids:
+        raise FilterError('ids needs at least one id')
+    if len(ids) > limit:
+        raise FilterError(f'At most {limit} ids per request')
+    return ids
+
+
+def fetch_by_ids(query, ids, visible=None):
+    """Rows of ``query`` with primary keys ``ids``, loaded with one IN query.
+
+    Returns ``(rows, missing)``: the rows in the order of ``ids`` and the
+    ids that do not exist or that ``visible(row)`` hides, reported the same
+    way since the detail endpoints answer 404 for both.
+    """
+    primary_key = query.column_descriptions[0]['entity'].__mapper__.primary_key[0]
+    found = {getattr(row, primary_key.key): row for row in query.filter(primary_key.in_(ids))}
+    rows = [found[id] for id in ids if id in found and (visible is None or visible(found[id]))]
+    shown = {getattr(row, primary_key.key) for row in rows}
+    return rows, [id for id in ids if id not in shown]
+
+
+# Model filters
+
+user_filters = QueryFilter(
+    User,
+    fields={
+        'role': Field(User.role),
+        'is_active': Field(User.is_active, ops=('eq',)),
+        'username': Field(User.username, ops=('eq', 'prefix')),
+        'last_name': Field(User.last_name, ops=('eq', 'prefix')),
+        'created_at': Field(User.created_at, ops=('range',)),
+        'search': search(User.username, User.first_name, User.last_name, User.email),
+    },
+    legacy=('search',),
+    default_sort='-created_at',
+)
+
+player_filters = QueryFilter(
+    Player,
+    fields={
+        'position': Field(Player.position),
+        'status': Field(Player.status),
+        'jersey_number': Field(Player.jersey_number, ops=('eq', 'in', 'range')),
+        'nationality': Field(Player.nationality, ops=('eq', 'prefix')),
+        'preferred_foot': Field(Player.preferred_foot, ops=('eq',)),
+        'age': Field(Player.age, ops=('range',), type=int),
+        'rating': Field(Player.rating, ops=('range',)),
+        'contract_active': Field(Player.contract_active, ops=('eq',), type=parse_bool, sortable=False),
+        'last_name': Field(User.last_name, ops=('eq', 'prefix')),
+        'joined_date': Field(Player.joined_date, ops=('range',)),
+        'search': search(User.first_name, User.last_name, Player.nationality),
+    },
+    aliases={'age_min': 'age__min', 'age_max': 'age__max'},
+    defaults={'status': 'active'},
+    legacy=('search',),
+    default_sort='jersey_number',
+)
+
+match_filters = QueryFilter(
+    Match,
+    fields={
+        'competition': Field(Match.competition),
+        'result': Field(Match.result),
+        'is_home': Field(Match.is_home, ops=('eq',)),
+        'opponent': Field(Match.opponent, ops=('eq', 'prefix')),
+        'date': Field(Match.date, ops=('range',)),
+        'year': calendar_period(Match.date),
+        'status': choice(upcoming=Match.is_upcoming, finished=Match.is_finished, all=None),
+    },
+    sort={'is_finished': Match.is_finished},
+    legacy=('status',),
+    default_sort='-date',
+)
+
+player_stats_filters = QueryFilter(
+    PlayerStats,
+    fields={
+        'pass_accuracy': Field(PlayerStats.pass_accuracy, ops=('range',), type=float),
+        'performance_rating': Field(PlayerStats.performance_rating, ops=('range',)),
+        'minutes_played': Field(PlayerStats.minutes_played, ops=('range',)),
+        'goals': Field(PlayerStats.goals, ops=('range',)),
+        'assists': Field(PlayerStats.assists, ops=('range',)),
+        'started': Field(PlayerStats.started, ops=('eq',)),
+    },
+    sort={'id': PlayerStats.id},
+    default_sort='id',
+)
+
+training_filters = QueryFilter(
+    Training,
+    fields={
+        'type': Field(Training.type),
+        'intensity': Field(Training.intensity),
+        'completed': Field(Training.completed, ops=('eq',)),
+        'location': Field(Training.location, ops=('eq', 'prefix')),
+        'date': Field(Training.date, ops=('range',)),
+        'start_time': Field(Training.start_time, ops=('range',), type=lambda value: datetime.strptime(value, '%H:%M').time()),
+        'duration_minutes': Field(Training.duration_minutes, ops=('range',), type=int),
+        'upcoming': flag(Training.is_upcoming),
+        'title': Field(Training.title, ops=('prefix',)),
+    },
+    aliases={'date_from': 'date__min', 'date_to': 'date__max',
+             'duration_min': 'duration_minutes__min', 'duration_max': 'duration_minutes__max'},
+    legacy=('upcoming',),
+    default_sort='-date,-start_time',
+)
+
+finance_filters = QueryFilter(
+    Finance,
+    fields={
+        'type': Field(Finance.type),
+        'category': Field(Finance.category),
+        'status': Field(Finance.status),
+        'currency': Field(Finance.currency, ops=('eq',)),
+        'amount': Field(Finance.amount, ops=('range',)),
+        'transaction_date': Field(Finance.transaction_date, ops=('range',)),
+        'due_date': Field(Finance.due_date, ops=('range',)),
+        'year': calendar_period(Finance.transaction_date),
+        'overdue': Field(Finance.is_overdue, ops=('eq',), type=parse_bool, sortable=False),
+        'player_id': Field(Finance.player_id, ops=('eq', 'in')),
+        'match_id': Field(Finance.match_id, ops=('eq', 'in')),
+    },
+    default_sort='-transaction_date',
+)
+
+news_filters = QueryFilter(
+    News,
+    fields={
+        'category': Field(News.category),
+        'featured': flag(News.is_featured),
+        'breaking': flag(News.is_breaking),
+        'author_id': Field(News.author_id, ops=('eq', 'in')),
+        'published_at': Field(News.published_at, ops=('range',)),
+        'search': search(News.title, News.content, News.tags),
+    },
+    sort={'priority': News.priority, 'views': News.views_count},
+    legacy=('featured', 'breaking', 'search'),
+    default_sort='-priority,-published_at',
+)
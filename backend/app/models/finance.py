@@ -1,5 +1,6 @@
 from datetime import datetime, date
 from sqlalchemy import Numeric
+from sqlalchemy.ext.hybrid import hybrid_property
 from app import db
 
 class Finance(db.Model):
@@ -10,14 +11,14 @@ class Finance(db.Model):
     id = db.Column(db.Integer, primary_key=True)
 
     # Transaction details
-    type = db.Column(db.Enum('income', 'expense', name='transaction_types'), nullable=False)
+    type = db.Column(db.Enum('income', 'expense', name='transaction_types'), nullable=False, index=True)
     category = db.Column(db.Enum(
         # Income categories
         'sponsorship', 'ticket_sales', 'merchandise', 'transfer_fee', 'prize_money', 'donation', 'membership_fee', 'other_income',
         # Expense categories
         'salary', 'equipment', 'travel', 'facility', 'medical', 'training', 'transfer_fee_out', 'utilities', 'insurance', 'other_expense',
         name='finance_categories'
-    ), nullable=False)
+    ), nullable=False, index=True)
 
     amount = db.Column(Numeric(12, 2), nullable=False)
     currency = db.Column(db.String(3), default='TND', nullable=False)  # Tunisian Dinar
@@ -28,12 +29,12 @@ class Finance(db.Model):
     reference_number = db.Column(db.String(50), nullable=True, unique=True)
 
     # Date information
-    transaction_date = db.Column(db.Date, nullable=False)
+    transaction_date = db.Column(db.Date, nullable=False, index=True)
     due_date = db.Column(db.Date, nullable=True)  # For pending transactions
 
     # Status and approval
     status = db.Column(db.Enum('pending', 'approved', 'rejected', 'completed', name='transaction_status'),
-                      default='pending', nullable=False)
+                      default='pending', nullable=False, index=True)
     approved_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     approval_date = db.Column(db.DateTime, nullable=True)
 
@@ -101,10 +102,14 @@ class Finance(db.Model):
         """Check if transaction is approved."""
         return self.status in ['approved', 'completed']
 
-    @property
+    @hybrid_property
     def is_overdue(self):
         """Check if transaction is overdue."""
-        return self.due_date and self.due_date < date.today() and self.status == 'pending'
+        return self.due_date is not None and self.due_date < date.today() and self.status == 'pending'
+
+    @is_overdue.expression
+    def is_overdue(cls):
+        return db.and_(cls.due_date.isnot(None), cls.due_date < date.today(), cls.status == 'pending')
 
     @property
     def signed_amount(self):
@@ -1,4 +1,6 @@
 from datetime import datetime, date
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy.ext.hybrid import hybrid_property
 from app import db
 
 class Match(db.Model):
@@ -7,18 +9,18 @@ class Match(db.Model):
     __tablename__ = 'matches'
     
     id = db.Column(db.Integer, primary_key=True)
-    opponent = db.Column(db.String(100), nullable=False)
-    date = db.Column(db.DateTime, nullable=False)
+    opponent = db.Column(db.String(100), nullable=False, index=True)
+    date = db.Column(db.DateTime, nullable=False, index=True)
     location = db.Column(db.String(200), nullable=False)
     is_home = db.Column(db.Boolean, default=True, nullable=False)
     competition = db.Column(db.Enum('league', 'cup', 'friendly', 'playoff', name='competition_types'), 
-                           nullable=False, default='league')
+                           nullable=False, default='league', index=True)
     
     # Match result
     goals_for = db.Column(db.Integer, nullable=True)
     goals_against = db.Column(db.Integer, nullable=True)
     result = db.Column(db.Enum('win', 'draw', 'loss', 'pending', name='match_results'), 
-                      default='pending', nullable=False)
+                      default='pending', nullable=False, index=True)
     
     # Match details
     attendance = db.Column(db.Integer, nullable=True)
@@ -49,16 +51,20 @@ class Match(db.Model):
             if hasattr(self, key):
                 setattr(self, key, value)
     
-    @property
+    @hybrid_property
     def is_finished(self):
         """Check if match is finished."""
         return self.result != 'pending'
     
-    @property
+    @hybrid_property
     def is_upcoming(self):
         """Check if match is upcoming."""
         return self.date > datetime.utcnow() and not self.is_finished
     
+    @is_upcoming.expression
+    def is_upcoming(cls):
+        return db.and_(cls.date > datetime.utcnow(), cls.result == 'pending')
+    
     @property
     def score(self):
         """Get match score as string."""
@@ -100,6 +106,20 @@ class Match(db.Model):
         """Get list of goalscorers in this match."""
         return self.player_stats.filter(PlayerStats.goals > 0).all()
     
+    @staticmethod
+    def get_upcoming_matches(limit=5, session=None):
+        """Get the next matches still to be played."""
+        return (session or db.session).query(Match).filter(
+            Match.is_upcoming
+        ).order_by(Match.date.asc()).limit(limit).all()
+    
+    @staticmethod
+    def get_recent_results(limit=5, session=None):
+        """Get the most recent finished matches."""
+        return (session or db.session).query(Match).filter(
+            Match.is_finished
+        ).order_by(Match.date.desc()).limit(limit).all()
+    
     def to_dict(self, include_stats=False):
         """Convert match object to dictionary."""
         data = {
@@ -187,12 +207,20 @@ class PlayerStats(db.Model):
             if hasattr(self, key):
                 setattr(self, key, value)
     
-    @property
+    @hybrid_property
     def pass_accuracy(self):
-        """Calculate pass accuracy percentage."""
+        """Calculate pass accuracy percentage (rounded half up, like SQL ROUND)."""
         if self.passes_attempted == 0:
             return 0
-        return round((self.passes_completed / self.passes_attempted) * 100, 1)
+        accuracy = Decimal(self.passes_completed * 100) / Decimal(self.passes_attempted)
+        return float(accuracy.quantize(Decimal('0.1'), ROUND_HALF_UP))
+    
+    @pass_accuracy.expression
+    def pass_accuracy(cls):
+        return db.case(
+            (cls.passes_attempted == 0, 0),
+            else_=db.func.round(cls.passes_completed * 100.0 / cls.passes_attempted, 1)
+        )
     
     @property
     def shot_accuracy(self):
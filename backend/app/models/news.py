@@ -1,20 +1,31 @@
+import re
+import unicodedata
 from datetime import datetime
-from app import db
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from app import db, media_store
 
 class News(db.Model):
     """News and announcements model."""
     
     __tablename__ = 'news'
     
+    WORDS_PER_MINUTE = 200
+    EXCERPT_LENGTH = 200
+    
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     slug = db.Column(db.String(250), nullable=False, unique=True, index=True)
     content = db.Column(db.Text, nullable=False)
     excerpt = db.Column(db.Text, nullable=True)  # Short summary
     
+    # Derived text metrics (computed from content at write time)
+    word_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    reading_time = db.Column(db.Integer, default=1, server_default='1', nullable=False)  # in minutes
+    
     # Publication details
-    published = db.Column(db.Boolean, default=False, nullable=False)
-    published_at = db.Column(db.DateTime, nullable=True)
+    published = db.Column(db.Boolean, default=False, nullable=False, index=True)
+    published_at = db.Column(db.DateTime, nullable=True, index=True)
     author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     # Content categorization
@@ -22,7 +33,7 @@ class News(db.Model):
         'match_report', 'transfer', 'training', 'announcement', 'interview', 
         'injury_update', 'club_news', 'community', 'achievement', 'other',
         name='news_categories'
-    ), nullable=False, default='club_news')
+    ), nullable=False, default='club_news', index=True)
     
     # SEO and metadata
     meta_description = db.Column(db.String(160), nullable=True)
@@ -39,8 +50,8 @@ class News(db.Model):
     comments_enabled = db.Column(db.Boolean, default=True, nullable=False)
     
     # Priority and visibility
-    is_featured = db.Column(db.Boolean, default=False, nullable=False)
-    is_breaking = db.Column(db.Boolean, default=False, nullable=False)
+    is_featured = db.Column(db.Boolean, default=False, nullable=False, index=True)
+    is_breaking = db.Column(db.Boolean, default=False, nullable=False, index=True)
     priority = db.Column(db.Integer, default=0, nullable=False)  # Higher number = higher priority
     
     # Related content
@@ -67,39 +78,101 @@ class News(db.Model):
         for key, value in kwargs.items():
             if hasattr(self, key):
                 setattr(self, key, value)
-    
-    def generate_slug(self, title):
-        """Generate URL-friendly slug from title."""
-        import re
-        import unicodedata
         
+        self.update_text_metrics()
+    
+    @staticmethod
+    def slugify(title):
+        """Convert a title to a URL-friendly slug (without uniqueness suffix)."""
         # Normalize unicode characters
         slug = unicodedata.normalize('NFKD', title)
         slug = slug.encode('ascii', 'ignore').decode('ascii')
         
         # Convert to lowercase and replace spaces/special chars with hyphens
         slug = re.sub(r'[^\w\s-]', '', slug).strip().lower()
-        slug = re.sub(r'[-\s]+', '-', slug)
+        return re.sub(r'[-\s]+', '-', slug)
+    
+    def generate_slug(self, title):
+        """Generate a unique URL-friendly slug from title.
+        
+        Finds the next free numeric suffix with a single prefix query on the
+        slug index instead of probing candidates one by one. The unique
+        constraint remains the source of truth: see save_with_unique_slug().
+        """
+        base_slug = self.slugify(title)
+        pattern = base_slug.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '-%'
+        
+        query = db.session.query(News.slug).filter(
+            db.or_(News.slug == base_slug, News.slug.like(pattern, escape='\\'))
+        )
+        if self.id is not None:
+            query = query.filter(News.id != self.id)
         
-        # Ensure uniqueness
-        base_slug = slug
-        counter = 1
-        while News.query.filter_by(slug=slug).first():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
+        taken = [slug for (slug,) in query.all()]
+        if base_slug not in taken:
+            return base_slug
         
-        return slug
+        suffix_re = re.compile(re.escape(base_slug) + r'-(\d+)$')
+        suffixes = [int(match.group(1)) for match in map(suffix_re.match, taken) if match]
+        return f"{base_slug}-{max(suffixes, default=0) + 1}"
+    
+    def save_with_unique_slug(self, title=None, max_attempts=5):
+        """Flush the article, retrying with a new slug on a unique conflict.
+        
+        Pass ``title`` to regenerate the slug (e.g. after a title change).
+        Other pending changes are flushed first so that rolling back the
+        savepoint after a conflict only discards the slug.
+        """
+        if self.id is not None:
+            db.session.flush()
+        
+        for attempt in range(1, max_attempts + 1):
+            if title or attempt > 1:
+                self.slug = self.generate_slug(title or self.title)
+            try:
+                with db.session.begin_nested():
+                    db.session.add(self)
+                    db.session.flush()
+                return self.slug
+            except IntegrityError as e:
+                # Another writer took the slug between our query and insert
+                if attempt == max_attempts or 'slug' not in str(e.orig).lower():
+                    raise
     
     @property
     def is_published(self):
         """Check if article is published."""
         return self.published and self.published_at and self.published_at <= datetime.utcnow()
     
+    @classmethod
+    def compute_text_metrics(cls, content):
+        """Return (word_count, reading_time) for an article body."""
+        word_count = len(content.split()) if content else 0
+        return word_count, max(1, round(word_count / cls.WORDS_PER_MINUTE))
+    
+    @classmethod
+    def make_excerpt(cls, content):
+        """Build a short excerpt from the beginning of the content."""
+        if not content:
+            return None
+        if len(content) > cls.EXCERPT_LENGTH:
+            return content[:cls.EXCERPT_LENGTH] + '...'
+        return content
+    
+    def update_text_metrics(self, regenerate_excerpt=False):
+        """Recompute word count, reading time and (if empty) the excerpt.
+        
+        Called whenever the content is written so that serialization never
+        has to tokenize the article body.
+        """
+        self.word_count, self.reading_time = self.compute_text_metrics(self.content)
+        if regenerate_excerpt or not self.excerpt:
+            self.excerpt = self.make_excerpt(self.content)
+    
     @property
-    def reading_time(self):
-        """Estimate reading time in minutes."""
-        word_count = len(self.content.split())
-        return max(1, round(word_count / 200))  # Assuming 200 words per minute
+    def featured_image_sources(self):
+        """Responsive image URLs for an uploaded featured image."""
+        return media_store.image_sources(self.featured_image)
     
     @property
     def tag_list(self):
@@ -121,8 +194,13 @@ class News(db.Model):
         db.session.commit()
     
     def increment_views(self):
-        """Increment view count."""
-        self.views_count += 1
+        """Increment view count.
+        
+        Done as a single UPDATE on the primary, so a copy of the article read
+        from a lagging replica cannot overwrite newer counts.
+        """
+        News.query.filter_by(id=self.id).update(
+            {News.views_count: News.views_count + 1}, synchronize_session=False)
         db.session.commit()
     
     def add_like(self):
@@ -145,9 +223,9 @@ class News(db.Model):
         db.session.commit()
     
     @staticmethod
-    def get_featured_articles(limit=5):
+    def get_featured_articles(limit=5, session=None):
         """Get featured articles."""
-        return News.query.filter_by(
+        return (session or db.session).query(News).options(db.defer(News.content)).filter_by(
             published=True,
             is_featured=True
         ).filter(
@@ -158,9 +236,9 @@ class News(db.Model):
         ).limit(limit).all()
     
     @staticmethod
-    def get_breaking_news(limit=3):
+    def get_breaking_news(limit=3, session=None):
         """Get breaking news."""
-        return News.query.filter_by(
+        return (session or db.session).query(News).options(db.defer(News.content)).filter_by(
             published=True,
             is_breaking=True
         ).filter(
@@ -170,9 +248,9 @@ class News(db.Model):
         ).limit(limit).all()
     
     @staticmethod
-    def get_recent_articles(limit=10, category=None):
+    def get_recent_articles(limit=10, category=None, session=None):
         """Get recent articles."""
-        query = News.query.filter_by(published=True).filter(
+        query = (session or db.session).query(News).options(db.defer(News.content)).filter_by(published=True).filter(
             News.published_at <= datetime.utcnow()
         )
         
@@ -184,7 +262,7 @@ class News(db.Model):
     @staticmethod
     def search_articles(query_text, limit=20):
         """Search articles by title and content."""
-        return News.query.filter_by(published=True).filter(
+        return News.query.options(db.defer(News.content)).filter_by(published=True).filter(
             db.or_(
                 News.title.ilike(f'%{query_text}%'),
                 News.content.ilike(f'%{query_text}%'),
@@ -194,6 +272,42 @@ class News(db.Model):
             News.published_at <= datetime.utcnow()
         ).order_by(News.published_at.desc()).limit(limit).all()
     
+    @staticmethod
+    def backfill_text_metrics(batch_size=500):
+        """Populate word count, reading time and empty excerpts for existing rows.
+        
+        Walks the table by primary key and writes each batch with a single
+        executemany UPDATE. Returns the number of articles updated.
+        """
+        updated = 0
+        last_id = 0
+        
+        while True:
+            rows = db.session.query(News.id, News.content, News.excerpt).filter(
+                News.id > last_id
+            ).order_by(News.id.asc()).limit(batch_size).all()
+            
+            if not rows:
+                break
+            
+            values = []
+            for article_id, content, excerpt in rows:
+                word_count, reading_time = News.compute_text_metrics(content)
+                values.append({
+                    'id': article_id,
+                    'word_count': word_count,
+                    'reading_time': reading_time,
+                    'excerpt': excerpt or News.make_excerpt(content)
+                })
+            
+            db.session.execute(update(News), values)
+            db.session.commit()
+            
+            updated += len(values)
+            last_id = rows[-1][0]
+        
+        return updated
+    
     def to_dict(self, include_content=True):
         """Convert news object to dictionary."""
         data = {
@@ -207,9 +321,11 @@ class News(db.Model):
             'is_published': self.is_published,
             'published_at': self.published_at.isoformat() if self.published_at else None,
             'featured_image': self.featured_image,
+            'featured_image_sources': self.featured_image_sources,
             'video_url': self.video_url,
             'views_count': self.views_count,
             'likes_count': self.likes_count,
+            'word_count': self.word_count,
             'reading_time': self.reading_time,
             'is_featured': self.is_featured,
             'is_breaking': self.is_breaking,
@@ -1,7 +1,22 @@
-from datetime import datetime, date
-from sqlalchemy import Numeric
+from datetime import datetime, date, timedelta
+from flask import current_app
+from sqlalchemy import Numeric, event, inspect
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import object_session
 from app import db
-from app.models.user import User
+from app.models.user import User, mark_claims_changed
+
+
+def _recent_match_ids(limit):
+    """Ids of the team's last ``limit`` finished matches, most recent first."""
+    from app.models.match import Match
+
+    return db.select(Match.id).where(Match.result != 'pending').order_by(Match.date.desc()).limit(limit)
+
+def _attendance_window():
+    """First and last day of the trainings counted by ``recent_attendance_rate``."""
+    today = date.today()
+    return today - timedelta(days=current_app.config.get('SQUAD_ATTENDANCE_DAYS', 14)), today
 
 class Player(db.Model):
     """Player model for managing football players."""
@@ -11,9 +26,9 @@ class Player(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
     jersey_number = db.Column(db.Integer, nullable=True, unique=True)
-    position = db.Column(db.Enum('GK', 'CB', 'LB', 'RB', 'CDM', 'CM', 'CAM', 'LM', 'RM', 'LW', 'RW', 'CF', 'ST', name='player_positions'), nullable=False)
+    position = db.Column(db.Enum('GK', 'CB', 'LB', 'RB', 'CDM', 'CM', 'CAM', 'LM', 'RM', 'LW', 'RW', 'CF', 'ST', name='player_positions'), nullable=False, index=True)
     birth_date = db.Column(db.Date, nullable=False)
-    nationality = db.Column(db.String(50), nullable=False)
+    nationality = db.Column(db.String(50), nullable=False, index=True)
     height = db.Column(db.Float, nullable=True)  # in cm
     weight = db.Column(db.Float, nullable=True)  # in kg
     preferred_foot = db.Column(db.Enum('left', 'right', 'both', name='preferred_foot'), default='right')
@@ -23,7 +38,7 @@ class Player(db.Model):
     contract_end = db.Column(db.Date, nullable=True)
     salary = db.Column(Numeric(10, 2), nullable=True)
     status = db.Column(db.Enum('active', 'injured', 'suspended', 'loaned', 'retired', name='player_status'),
-                      default='active', nullable=False)
+                      default='active', nullable=False, index=True)
 
     # Performance metrics
     market_value = db.Column(Numeric(12, 2), nullable=True)
@@ -46,7 +61,6 @@ class Player(db.Model):
     # Relationships
     stats = db.relationship('PlayerStats', backref='player', lazy='dynamic', cascade='all, delete-orphan')
     training_attendances = db.relationship('TrainingAttendance', backref='player', lazy='dynamic', cascade='all, delete-orphan')
-    user_account = db.relationship('User', backref='player_profile', lazy=True, uselist=False, foreign_keys=[user_id])
 
     def __init__(self, user_id, position, birth_date, nationality, **kwargs):
         self.user_id = user_id
@@ -59,23 +73,35 @@ class Player(db.Model):
             if hasattr(self, key):
                 setattr(self, key, value)
 
-    @property
+    @hybrid_property
     def age(self):
         """Calculate player's age."""
         today = date.today()
         return today.year - self.birth_date.year - ((today.month, today.day) < (self.birth_date.month, self.birth_date.day))
 
+    @age.expression
+    def age(cls):
+        today = date.today()
+        month = db.extract('month', cls.birth_date)
+        birthday_ahead = db.or_(month > today.month,
+                                db.and_(month == today.month, db.extract('day', cls.birth_date) > today.day))
+        return today.year - db.extract('year', cls.birth_date) - db.case((birthday_ahead, 1), else_=0)
+
     @property
     def full_name(self):
         """Get player's full name from user account."""
         return self.user_account.full_name if self.user_account else "Unknown"
 
-    @property
+    @hybrid_property
     def is_available(self):
         """Check if player is available for selection."""
         return self.status == 'active'
 
-    @property
+    @is_available.expression
+    def is_available(cls):
+        return cls.status == 'active'
+
+    @hybrid_property
     def contract_active(self):
         """Check if player has an active contract."""
         if not self.contract_start or not self.contract_end:
@@ -83,8 +109,114 @@ class Player(db.Model):
         today = date.today()
         return self.contract_start <= today <= self.contract_end
 
+    @contract_active.expression
+    def contract_active(cls):
+        today = date.today()
+        return db.and_(cls.contract_start.isnot(None), cls.contract_end.isnot(None),
+                       cls.contract_start <= today, cls.contract_end >= today)
+
+    @hybrid_property
+    def contract_running(self):
+        """Check that no recorded contract date rules the player out today.
+
+        Unlike ``contract_active``, missing dates are open-ended, so players
+        whose contract was never entered are not held back from selection.
+        """
+        today = date.today()
+        return ((self.contract_start is None or self.contract_start <= today)
+                and (self.contract_end is None or self.contract_end >= today))
+
+    @contract_running.expression
+    def contract_running(cls):
+        today = date.today()
+        return db.and_(db.or_(cls.contract_start.is_(None), cls.contract_start <= today),
+                       db.or_(cls.contract_end.is_(None), cls.contract_end >= today))
+
+    @hybrid_property
+    def is_suspended(self):
+        """Check if a recent red card or an accumulation of yellow cards rules the player out.
+
+        A red card in the team's last ``SQUAD_RED_CARD_BAN_MATCHES`` finished
+        matches, or ``SQUAD_YELLOW_CARD_LIMIT`` yellow cards over the last
+        ``SQUAD_YELLOW_CARD_WINDOW``, suspends the player.
+        """
+        from app.models.match import PlayerStats
+
+        config = current_app.config
+        bans = config.get('SQUAD_RED_CARD_BAN_MATCHES', 1)
+        window = config.get('SQUAD_YELLOW_CARD_WINDOW', 5)
+        recent = db.session.execute(_recent_match_ids(max(bans, window))).scalars().all()
+        stats = {stat.match_id: stat for stat in self.stats.filter(PlayerStats.match_id.in_(recent))}
+
+        if any(stats[match_id].red_cards for match_id in recent[:bans] if match_id in stats):
+            return True
+        yellow_cards = sum(stats[match_id].yellow_cards for match_id in recent[:window] if match_id in stats)
+        return yellow_cards >= config.get('SQUAD_YELLOW_CARD_LIMIT', 3)
+
+    @is_suspended.expression
+    def is_suspended(cls):
+        from app.models.match import PlayerStats
+
+        config = current_app.config
+        red_card = db.exists().where(
+            PlayerStats.player_id == cls.id,
+            PlayerStats.red_cards > 0,
+            PlayerStats.match_id.in_(_recent_match_ids(config.get('SQUAD_RED_CARD_BAN_MATCHES', 1)))
+        )
+        yellow_cards = db.select(db.func.coalesce(db.func.sum(PlayerStats.yellow_cards), 0)).where(
+            PlayerStats.player_id == cls.id,
+            PlayerStats.match_id.in_(_recent_match_ids(config.get('SQUAD_YELLOW_CARD_WINDOW', 5)))
+        ).scalar_subquery()
+        return db.or_(red_card, yellow_cards >= config.get('SQUAD_YELLOW_CARD_LIMIT', 3))
+
+    @hybrid_property
+    def recent_attendance_rate(self):
+        """Share of the trainings of the last ``SQUAD_ATTENDANCE_DAYS`` attended (None without records)."""
+        from app.models.training import Training
+
+        start, end = _attendance_window()
+        attended = [attendance.attended for attendance in
+                    self.training_attendances.join(Training).filter(Training.date.between(start, end))]
+        return sum(attended) / len(attended) if attended else None
+
+    @recent_attendance_rate.expression
+    def recent_attendance_rate(cls):
+        from app.models.training import Training, TrainingAttendance
+
+        start, end = _attendance_window()
+        return db.select(
+            db.func.avg(db.case((TrainingAttendance.attended, 1.0), else_=0.0))
+        ).select_from(TrainingAttendance).join(Training, Training.id == TrainingAttendance.training_id).where(
+            TrainingAttendance.player_id == cls.id,
+            Training.date.between(start, end)
+        ).scalar_subquery()
+
+    @hybrid_property
+    def is_selectable(self):
+        """Check if player can be picked in a match squad.
+
+        Active status, a running contract, no suspension and at least
+        ``SQUAD_MIN_ATTENDANCE`` of recent trainings attended (players
+        without contract dates or attendance records are not held back).
+        """
+        if not (self.is_available and self.contract_running) or self.is_suspended:
+            return False
+        rate = self.recent_attendance_rate
+        return rate is None or rate >= current_app.config.get('SQUAD_MIN_ATTENDANCE', 0.5)
+
+    @is_selectable.expression
+    def is_selectable(cls):
+        return db.and_(
+            cls.is_available,
+            cls.contract_running,
+            db.not_(cls.is_suspended),
+            db.func.coalesce(cls.recent_attendance_rate, 1.0) >= current_app.config.get('SQUAD_MIN_ATTENDANCE', 0.5)
+        )
+
     def get_season_stats(self, season_year=None):
         """Get player statistics for a specific season."""
+        from app.models.match import Match, PlayerStats
+
         if season_year is None:
             season_year = datetime.now().year
 
@@ -121,16 +253,10 @@ class Player(db.Model):
         return total_stats
 
     def update_rating(self):
-        """Update player rating based on recent performances."""
-        recent_stats = self.stats.order_by(PlayerStats.id.desc()).limit(10).all()
-        if not recent_stats:
-            return
+        """Update player rating based on recent performances (see ``app.services.ratings``)."""
+        from app.services import ratings
 
-        # Simple rating calculation based on recent performances
-        total_rating = sum(stat.performance_rating for stat in recent_stats if stat.performance_rating)
-        if total_rating > 0:
-            self.rating = total_rating / len(recent_stats)
-            db.session.commit()
+        return ratings.refresh([self.id]).get(self.id)
 
     def to_dict(self, include_sensitive=False):
         """Convert player object to dictionary."""
@@ -170,3 +296,18 @@ class Player(db.Model):
 
     def __repr__(self):
         return f'<Player {self.full_name} #{self.jersey_number}>'
+
+
+# Linking or unlinking a profile changes the player_id claim of the user account
+
+@event.listens_for(Player, 'after_insert')
+@event.listens_for(Player, 'after_delete')
+def _player_profile_linked(mapper, connection, target):
+    mark_claims_changed(object_session(target), target.user_id)
+
+@event.listens_for(Player, 'after_update')
+def _player_profile_moved(mapper, connection, target):
+    history = inspect(target).attrs.user_id.history
+    for user_id in [*history.added, *history.deleted]:
+        if user_id is not None:
+            mark_claims_changed(object_session(target), user_id)
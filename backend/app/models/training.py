@@ -1,4 +1,5 @@
 from datetime import datetime, date, time
+from sqlalchemy.ext.hybrid import hybrid_property
 from app import db
 
 class Training(db.Model):
@@ -8,14 +9,14 @@ class Training(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
-    date = db.Column(db.Date, nullable=False)
+    date = db.Column(db.Date, nullable=False, index=True)
     start_time = db.Column(db.Time, nullable=False)
     end_time = db.Column(db.Time, nullable=False)
     location = db.Column(db.String(200), nullable=False)
     
     # Training details
     type = db.Column(db.Enum('technical', 'physical', 'tactical', 'recovery', 'friendly', name='training_types'), 
-                    nullable=False, default='technical')
+                    nullable=False, default='technical', index=True)
     intensity = db.Column(db.Enum('low', 'medium', 'high', name='training_intensity'), 
                          nullable=False, default='medium')
     
@@ -32,7 +33,7 @@ class Training(db.Model):
                                nullable=True)
     
     # Training outcome
-    completed = db.Column(db.Boolean, default=False, nullable=False)
+    completed = db.Column(db.Boolean, default=False, nullable=False, index=True)
     notes = db.Column(db.Text, nullable=True)
     coach_feedback = db.Column(db.Text, nullable=True)
     
@@ -56,22 +57,30 @@ class Training(db.Model):
             if hasattr(self, key):
                 setattr(self, key, value)
     
-    @property
+    @hybrid_property
     def duration_minutes(self):
-        """Calculate training duration in minutes."""
+        """Calculate training duration in minutes (from the hours and minutes of the times)."""
         if self.start_time and self.end_time:
-            start_datetime = datetime.combine(date.today(), self.start_time)
-            end_datetime = datetime.combine(date.today(), self.end_time)
-            duration = end_datetime - start_datetime
-            return int(duration.total_seconds() / 60)
+            return (self.end_time.hour - self.start_time.hour) * 60 + self.end_time.minute - self.start_time.minute
         return 0
     
-    @property
+    @duration_minutes.expression
+    def duration_minutes(cls):
+        hours = db.extract('hour', cls.end_time) - db.extract('hour', cls.start_time)
+        minutes = db.extract('minute', cls.end_time) - db.extract('minute', cls.start_time)
+        return db.cast(hours * 60 + minutes, db.Integer)
+    
+    @hybrid_property
     def is_upcoming(self):
         """Check if training is upcoming."""
         training_datetime = datetime.combine(self.date, self.start_time)
         return training_datetime > datetime.now()
     
+    @is_upcoming.expression
+    def is_upcoming(cls):
+        now = datetime.now()
+        return db.or_(cls.date > now.date(), db.and_(cls.date == now.date(), cls.start_time > now.time()))
+    
     @property
     def is_today(self):
         """Check if training is today."""
@@ -1,7 +1,11 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.attributes import set_committed_value
 from werkzeug.security import generate_password_hash, check_password_hash
-from app import db
+from app import db, last_login_recorder, media_store, token_revocation
+from app.services.permissions import allows
 
 class User(db.Model):
     """User model for authentication and authorization."""
@@ -15,11 +19,11 @@ class User(db.Model):
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
     role = db.Column(db.Enum('admin', 'coach', 'player', 'staff', 'supporter', name='user_roles'),
-                     nullable=False, default='supporter')
+                     nullable=False, default='supporter', index=True)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     avatar = db.Column(db.String(255), nullable=True)
     phone = db.Column(db.String(20), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     last_login = db.Column(db.DateTime, nullable=True)
 
@@ -53,11 +57,23 @@ class User(db.Model):
         self.last_login = datetime.utcnow()
         db.session.commit()
 
+    def record_login(self):
+        """Queue a last login update without opening a write transaction."""
+        now = datetime.utcnow()
+        # Reflect the new value on this instance without marking it dirty
+        set_committed_value(self, 'last_login', now)
+        last_login_recorder.record(self.id, now)
+
     @property
     def full_name(self):
         """Return the user's full name."""
         return f"{self.first_name} {self.last_name}"
 
+    @property
+    def avatar_sources(self):
+        """Responsive image URLs for an uploaded avatar."""
+        return media_store.image_sources(self.avatar)
+
     @property
     def is_admin(self):
         """Check if user is an admin."""
@@ -80,14 +96,7 @@ class User(db.Model):
 
     def has_permission(self, permission):
         """Check if user has specific permission based on role."""
-        permissions = {
-            'admin': ['read', 'write', 'delete', 'manage_users', 'manage_finances'],
-            'coach': ['read', 'write', 'manage_players', 'manage_trainings'],
-            'staff': ['read', 'write'],
-            'player': ['read', 'update_profile'],
-            'supporter': ['read']
-        }
-        return permission in permissions.get(self.role, [])
+        return allows(self.role, permission)
 
     def to_dict(self, include_sensitive=False):
         """Convert user object to dictionary."""
@@ -101,6 +110,7 @@ class User(db.Model):
             'role': self.role,
             'is_active': self.is_active,
             'avatar': self.avatar,
+            'avatar_sources': self.avatar_sources,
             'phone': self.phone if include_sensitive else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'last_login': self.last_login.isoformat() if self.last_login else None
@@ -109,3 +119,27 @@ class User(db.Model):
 
     def __repr__(self):
         return f'<User {self.username}>'
+
+
+def mark_claims_changed(session, user_id):
+    """Revoke a user's access tokens once the session's transaction commits."""
+    session.info.setdefault('claims_changed', set()).add(user_id)
+
+@event.listens_for(User, 'after_update')
+def _user_claims_changed(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.role.history.has_changes() or state.attrs.is_active.history.has_changes():
+        mark_claims_changed(object_session(target), target.id)
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    mark_claims_changed(object_session(target), target.id)
+
+@event.listens_for(Session, 'after_commit')
+def _revoke_changed_claims(session):
+    for user_id in session.info.pop('claims_changed', ()):
+        token_revocation.revoke_user(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_changed_claims(session):
+    session.info.pop('claims_changed', None)
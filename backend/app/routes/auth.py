@@ -7,9 +7,12 @@ from marshmallow import Schema, fields, ValidationError
 from datetime import datetime, timedelta
 import re
 
-from app import db
+from app import db, token_revocation
+from app.filters import FilterError, user_filters
 from app.models.user import User
 from app.models.player import Player
+from app.serializers import json_response, user_serializer
+from app.services.tokens import requires, token_claims
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -37,9 +40,6 @@ class UpdateProfileSchema(Schema):
     email = fields.Email(missing=None)
     phone = fields.Str(missing=None)
 
-# JWT blacklist (in production, use Redis or database)
-blacklisted_tokens = set()
-
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user."""
@@ -80,7 +80,7 @@ def register():
         db.session.commit()
 
         # Create access and refresh tokens
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(identity=user.id, additional_claims=token_claims(user))
         refresh_token = create_refresh_token(identity=user.id)
 
         return jsonify({
@@ -115,11 +115,11 @@ def login():
     if not user.is_active:
         return jsonify({'error': 'Account is deactivated'}), 401
 
-    # Update last login
-    user.update_last_login()
+    # Queue last login update (flushed in batches by the write-behind recorder)
+    user.record_login()
 
     # Create tokens
-    access_token = create_access_token(identity=user.id)
+    access_token = create_access_token(identity=user.id, additional_claims=token_claims(user))
     refresh_token = create_refresh_token(identity=user.id)
 
     return jsonify({
@@ -139,7 +139,7 @@ def refresh():
     if not user or not user.is_active:
         return jsonify({'error': 'User not found or inactive'}), 404
 
-    new_access_token = create_access_token(identity=current_user_id)
+    new_access_token = create_access_token(identity=current_user_id, additional_claims=token_claims(user))
 
     return jsonify({
         'access_token': new_access_token
@@ -149,8 +149,8 @@ def refresh():
 @jwt_required()
 def logout():
     """Logout user and blacklist token."""
-    jti = get_jwt()['jti']
-    blacklisted_tokens.add(jti)
+    token = get_jwt()
+    token_revocation.revoke_token(token['jti'], token['exp'])
 
     return jsonify({'message': 'Successfully logged out'}), 200
 
@@ -249,39 +249,23 @@ def change_password():
         return jsonify({'error': 'Password change failed', 'message': str(e)}), 500
 
 @auth_bp.route('/users', methods=['GET'])
-@jwt_required()
+@requires(permission='users.read', error='Admin access required')
 def get_users():
-    """Get list of users (admin only)."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-
-    if not current_user or not current_user.is_admin:
-        return jsonify({'error': 'Admin access required'}), 403
-
+    """Get list of users (admin only, filters and sort keys in ``app.filters.user_filters``)."""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
-    role_filter = request.args.get('role')
-    search = request.args.get('search')
-
-    query = User.query
 
-    if role_filter:
-        query = query.filter_by(role=role_filter)
-
-    if search:
-        query = query.filter(
-            (User.username.ilike(f'%{search}%')) |
-            (User.first_name.ilike(f'%{search}%')) |
-            (User.last_name.ilike(f'%{search}%')) |
-            (User.email.ilike(f'%{search}%'))
-        )
+    try:
+        filters = user_filters.compile(request.args)
+    except FilterError as err:
+        return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
 
-    users = query.order_by(User.created_at.desc()).paginate(
+    users = filters.apply(User.query).paginate(
         page=page, per_page=per_page, error_out=False
     )
 
-    return jsonify({
-        'users': [user.to_dict() for user in users.items],
+    return json_response({
+        'users': user_serializer.dump_many(users.items),
         'pagination': {
             'page': page,
             'pages': users.pages,
@@ -290,7 +274,7 @@ def get_users():
             'has_next': users.has_next,
             'has_prev': users.has_prev
         }
-    }), 200
+    })
 
 def is_strong_password(password):
     """Check if password meets strength requirements."""
@@ -303,9 +287,3 @@ def is_strong_password(password):
     has_digit = re.search(r'\d', password)
 
     return bool(has_upper and has_lower and has_digit)
-
-# JWT token blacklist checker
-def check_if_token_revoked(jwt_header, jwt_payload):
-    """Check if JWT token is blacklisted."""
-    jti = jwt_payload['jti']
-    return jti in blacklisted_tokens
@@ -0,0 +1,73 @@
+from datetime import date
+import time
+
+from flask import Blueprint, request, jsonify
+
+from app import dashboard
+from app.models.finance import Finance
+from app.models.match import Match
+from app.models.news import News
+from app.models.training import Training
+from app.serializers import json_response, match_serializer, news_serializer, training_serializer
+from app.services.dashboard import elapsed_ms
+from app.services.tokens import current_claims, requires
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+# Sections, each cached on its own and invalidated by writes to its blueprint
+
+@dashboard.section('upcoming_matches', blueprint='matches', permission='matches.read', ttl=60)
+def upcoming_matches():
+    return match_serializer.dump_many(Match.get_upcoming_matches(5))
+
+@dashboard.section('recent_results', blueprint='matches', permission='matches.read', ttl=300)
+def recent_results():
+    return match_serializer.dump_many(Match.get_recent_results(5))
+
+@dashboard.section('today_trainings', blueprint='trainings', permission='trainings.read', ttl=60)
+def today_trainings():
+    trainings = Training.query.filter(Training.date == date.today()).order_by(Training.start_time.asc()).all()
+    return training_serializer.dump_many(trainings)
+
+@dashboard.section('featured_news', blueprint='news', ttl=120)
+def featured_news():
+    return news_serializer.dump_many(News.get_featured_articles(5))
+
+@dashboard.section('breaking_news', blueprint='news', ttl=30)
+def breaking_news():
+    return news_serializer.dump_many(News.get_breaking_news(3))
+
+@dashboard.section('finance_summary', blueprint='finances', permission='finances.read', ttl=300)
+def finance_summary():
+    today = date.today()
+    return {
+        'period': f'{today.year}-{today.month:02d}',
+        'summary': Finance.get_monthly_summary(today.year, today.month)
+    }
+
+@dashboard_bp.route('', methods=['GET'])
+@requires()
+def get_dashboard():
+    """Get the club overview: the sections the user may see, loaded concurrently.
+
+    ``?sections=`` restricts the response to some sections. ``meta`` gives
+    each section's status (cached, loaded, error or timeout) and time.
+    """
+    start = time.perf_counter()
+    names = [name.strip() for name in request.args.get('sections', '').split(',') if name.strip()]
+    unknown = [name for name in names if name not in dashboard.sections]
+    if unknown:
+        return jsonify({
+            'error': 'Invalid sections',
+            'message': f"Unknown section(s): {', '.join(unknown)} (expected: {', '.join(dashboard.sections)})"
+        }), 400
+
+    sections, statuses = dashboard.build(current_claims(), names or None)
+
+    return json_response({
+        **sections,
+        'meta': {
+            'sections': statuses,
+            'total_ms': elapsed_ms(start)
+        }
+    })
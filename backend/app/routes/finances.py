@@ -1,12 +1,17 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from marshmallow import Schema, fields, ValidationError
 from datetime import date, datetime
 from decimal import Decimal
+import csv
+import io
 
 from app import db
-from app.models.user import User
+from app.filters import FilterError, fetch_by_ids, finance_filters, parse_ids
 from app.models.finance import Finance
+from app.serializers import json_response, finance_serializer
+from app.services.permissions import can
+from app.services.tokens import current_claims, requires
+from app.tasks import notify_finance_approved
 
 finances_bp = Blueprint('finances', __name__)
 
@@ -46,62 +51,42 @@ class FinanceUpdateSchema(Schema):
     receipt_number = fields.Str(missing=None)
     notes = fields.Str(missing=None)
 
-def check_permission(current_user, action):
-    """Check if user has permission to perform action."""
-    if action == 'read':
-        return current_user.is_admin or current_user.is_coach or current_user.is_staff
-    
-    if action in ['create', 'update']:
-        return current_user.is_admin or current_user.is_staff
-    
-    if action in ['delete', 'approve']:
-        return current_user.is_admin
-    
-    return False
-
 @finances_bp.route('', methods=['GET'])
-@jwt_required()
+@requires(permission='finances.read')
 def get_finances():
-    """Get list of financial transactions."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'read'):
-        return jsonify({'error': 'Permission denied'}), 403
-    
+    """Get list of financial transactions (filters and sort keys in ``app.filters.finance_filters``)."""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
-    type_filter = request.args.get('type')
-    category_filter = request.args.get('category')
-    status_filter = request.args.get('status')
-    year = request.args.get('year', type=int)
-    month = request.args.get('month', type=int)
     
-    query = Finance.query
+    include_sensitive = can(current_claims(), 'finances.read_sensitive')
     
-    if type_filter:
-        query = query.filter(Finance.type == type_filter)
-    
-    if category_filter:
-        query = query.filter(Finance.category == category_filter)
+    try:
+        plan = finance_serializer.plan_from_args(request.args, include_sensitive=include_sensitive)
+    except ValueError as err:
+        return jsonify({'error': 'Invalid fieldset', 'message': str(err)}), 400
+    
+    if 'ids' in request.args:
+        try:
+            ids = parse_ids(request.args['ids'])
+        except FilterError as err:
+            return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
+        
+        transactions, missing = fetch_by_ids(Finance.query.options(*finance_serializer.load_options(plan)), ids)
+        return json_response({'transactions': plan.dump_many(transactions), 'missing': missing})
     
-    if status_filter:
-        query = query.filter(Finance.status == status_filter)
+    try:
+        filters = finance_filters.compile(request.args)
+    except FilterError as err:
+        return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
     
-    if year:
-        query = query.filter(db.extract('year', Finance.transaction_date) == year)
-        
-        if month:
-            query = query.filter(db.extract('month', Finance.transaction_date) == month)
+    query = filters.apply(Finance.query.options(*finance_serializer.load_options(plan)))
     
-    finances = query.order_by(Finance.transaction_date.desc()).paginate(
+    finances = query.paginate(
         page=page, per_page=per_page, error_out=False
     )
     
-    include_sensitive = current_user.is_admin
-    
-    return jsonify({
-        'transactions': [finance.to_dict(include_sensitive=include_sensitive) for finance in finances.items],
+    return json_response({
+        'transactions': plan.dump_many(finances.items),
         'pagination': {
             'page': page,
             'pages': finances.pages,
@@ -110,36 +95,58 @@ def get_finances():
             'has_next': finances.has_next,
             'has_prev': finances.has_prev
         }
-    }), 200
+    })
+
+EXPORT_COLUMNS = ('id', 'transaction_date', 'due_date', 'type', 'category', 'title', 'amount', 'currency', 'status')
+EXPORT_SENSITIVE_COLUMNS = ('payment_method', 'reference_number', 'receipt_number')
+
+@finances_bp.route('/export', methods=['GET'])
+@requires(permission='finances.read')
+def export_finances():
+    """Stream financial transactions as CSV (compressed on the fly when accepted)."""
+    columns = EXPORT_COLUMNS + (EXPORT_SENSITIVE_COLUMNS if can(current_claims(), 'finances.read_sensitive') else ())
+    
+    try:
+        filters = finance_filters.compile(request.args)
+    except FilterError as err:
+        return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
+    
+    query = filters.apply(db.select(*(getattr(Finance, column) for column in columns)))
+    
+    # Rows are fetched and written in batches, so memory use does not grow with the export
+    query = query.execution_options(yield_per=500)
+    
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for rows in db.session.execute(query).partitions():
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    
+    return Response(stream_with_context(generate()), mimetype='text/csv', headers={
+        'Content-Disposition': 'attachment; filename=finances.csv'
+    })
 
 @finances_bp.route('/<int:finance_id>', methods=['GET'])
-@jwt_required()
+@requires(permission='finances.read')
 def get_finance(finance_id):
     """Get specific financial transaction."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'read'):
-        return jsonify({'error': 'Permission denied'}), 403
-    
     finance = Finance.query.get(finance_id)
     if not finance:
         return jsonify({'error': 'Transaction not found'}), 404
     
-    include_sensitive = current_user.is_admin
+    include_sensitive = can(current_claims(), 'finances.read_sensitive')
     
     return jsonify(finance.to_dict(include_sensitive=include_sensitive)), 200
 
 @finances_bp.route('', methods=['POST'])
-@jwt_required()
+@requires(permission='finances.create')
 def create_finance():
     """Create a new financial transaction."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'create'):
-        return jsonify({'error': 'Permission denied'}), 403
-    
     schema = FinanceCreateSchema()
     
     try:
@@ -158,7 +165,7 @@ def create_finance():
         return jsonify({'error': 'Invalid category for expense transaction'}), 400
     
     try:
-        finance = Finance(created_by=current_user_id, **data)
+        finance = Finance(created_by=current_claims().id, **data)
         
         # Generate next occurrence for recurring transactions
         if data.get('is_recurring') and data.get('recurring_frequency'):
@@ -177,21 +184,15 @@ def create_finance():
         return jsonify({'error': 'Transaction creation failed', 'message': str(e)}), 500
 
 @finances_bp.route('/<int:finance_id>', methods=['PUT'])
-@jwt_required()
+@requires(permission='finances.update')
 def update_finance(finance_id):
     """Update financial transaction."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'update'):
-        return jsonify({'error': 'Permission denied'}), 403
-    
     finance = Finance.query.get(finance_id)
     if not finance:
         return jsonify({'error': 'Transaction not found'}), 404
     
     # Only allow updates to pending transactions or by admin
-    if finance.status != 'pending' and not current_user.is_admin:
+    if finance.status != 'pending' and not can(current_claims(), 'finances.update_processed'):
         return jsonify({'error': 'Cannot update approved/completed transactions'}), 403
     
     schema = FinanceUpdateSchema()
@@ -219,15 +220,9 @@ def update_finance(finance_id):
         return jsonify({'error': 'Transaction update failed', 'message': str(e)}), 500
 
 @finances_bp.route('/<int:finance_id>', methods=['DELETE'])
-@jwt_required()
+@requires(permission='finances.delete', error='Admin access required')
 def delete_finance(finance_id):
     """Delete financial transaction (admin only)."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'delete'):
-        return jsonify({'error': 'Admin access required'}), 403
-    
     finance = Finance.query.get(finance_id)
     if not finance:
         return jsonify({'error': 'Transaction not found'}), 404
@@ -243,15 +238,9 @@ def delete_finance(finance_id):
         return jsonify({'error': 'Transaction deletion failed', 'message': str(e)}), 500
 
 @finances_bp.route('/<int:finance_id>/approve', methods=['POST'])
-@jwt_required()
+@requires(permission='finances.approve', error='Admin access required')
 def approve_finance(finance_id):
     """Approve financial transaction (admin only)."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'approve'):
-        return jsonify({'error': 'Admin access required'}), 403
-    
     finance = Finance.query.get(finance_id)
     if not finance:
         return jsonify({'error': 'Transaction not found'}), 404
@@ -260,7 +249,8 @@ def approve_finance(finance_id):
         return jsonify({'error': 'Transaction is not pending approval'}), 400
     
     try:
-        finance.approve(current_user_id)
+        finance.approve(current_claims().id)
+        notify_finance_approved.enqueue(finance.id, idempotency_key=str(finance.id))
         
         return jsonify({
             'message': 'Transaction approved successfully',
@@ -272,15 +262,9 @@ def approve_finance(finance_id):
         return jsonify({'error': 'Transaction approval failed', 'message': str(e)}), 500
 
 @finances_bp.route('/<int:finance_id>/reject', methods=['POST'])
-@jwt_required()
+@requires(permission='finances.approve', error='Admin access required')
 def reject_finance(finance_id):
     """Reject financial transaction (admin only)."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'approve'):
-        return jsonify({'error': 'Admin access required'}), 403
-    
     finance = Finance.query.get(finance_id)
     if not finance:
         return jsonify({'error': 'Transaction not found'}), 404
@@ -301,15 +285,9 @@ def reject_finance(finance_id):
         return jsonify({'error': 'Transaction rejection failed', 'message': str(e)}), 500
 
 @finances_bp.route('/summary', methods=['GET'])
-@jwt_required()
+@requires(permission='finances.read')
 def get_financial_summary():
     """Get financial summary."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'read'):
-        return jsonify({'error': 'Permission denied'}), 403
-    
     year = request.args.get('year', datetime.now().year, type=int)
     month = request.args.get('month', type=int)
     
@@ -337,7 +315,7 @@ def get_financial_summary():
     }), 200
 
 @finances_bp.route('/categories', methods=['GET'])
-@jwt_required()
+@requires()
 def get_categories():
     """Get available finance categories."""
     categories = {
@@ -1,11 +1,14 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, current_app, request, jsonify
 from marshmallow import Schema, fields, ValidationError
-from datetime import datetime
 
-from app import db
-from app.models.user import User
+from app import db, live_events
+from app.filters import FilterError, fetch_by_ids, match_filters, parse_ids, player_stats_filters
 from app.models.match import Match, PlayerStats
+from app.serializers import json_response, match_serializer, player_serializer, player_stats_serializer
+from app.services import squad
+from app.services.live_events import event_stream
+from app.services.tokens import requires
+from app.tasks import notify_squad_announced, refresh_squad_ratings, update_player_rating
 
 matches_bp = Blueprint('matches', __name__)
 
@@ -55,51 +58,70 @@ class PlayerStatsSchema(Schema):
     performance_rating = fields.Float(missing=None)
     notes = fields.Str(missing=None)
 
-def check_permission(current_user, action):
-    """Check if user has permission to perform action."""
-    if action == 'read':
-        return True  # Everyone can read match info
-    
-    if action in ['create', 'update', 'delete']:
-        return current_user.is_admin or current_user.is_coach
-    
-    return False
+class SquadSchema(Schema):
+    player_ids = fields.List(fields.Int(), required=True, validate=lambda x: 0 < len(x) <= 30)
+
+# Player fields listed in squad selections
+SQUAD_FIELDS = ('id', 'full_name', 'jersey_number', 'position', 'rating', 'status')
+
+def squad_entry(candidate, include_reasons=False):
+    entry = player_serializer.plan(fields=SQUAD_FIELDS).dump(candidate.player)
+    entry['attendance_rate'] = candidate.attendance_rate
+    if include_reasons:
+        entry['reasons'] = candidate.reasons
+    return entry
+
+def publish_match_event(match_id, event_type, data):
+    """Push an event to live subscribers; a broker outage must not fail the write."""
+    try:
+        live_events.publish(f'match:{match_id}', event_type, data)
+    except Exception as e:
+        current_app.logger.warning('Could not publish %s event for match %s: %s', event_type, match_id, e)
+
+def live_score(match):
+    return {
+        'match_id': match.id,
+        'opponent': match.opponent,
+        'is_home': match.is_home,
+        'goals_for': match.goals_for,
+        'goals_against': match.goals_against,
+        'result': match.result
+    }
 
 @matches_bp.route('', methods=['GET'])
-@jwt_required()
+@requires(permission='matches.read')
 def get_matches():
-    """Get list of matches."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
+    """Get list of matches (filters and sort keys in ``app.filters.match_filters``)."""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
-    competition_filter = request.args.get('competition')
-    status_filter = request.args.get('status')  # upcoming, finished, all
-    year = request.args.get('year', type=int)
-    
-    query = Match.query
     
-    if competition_filter:
-        query = query.filter(Match.competition == competition_filter)
+    try:
+        plan = match_serializer.plan_from_args(request.args)
+    except ValueError as err:
+        return jsonify({'error': 'Invalid fieldset', 'message': str(err)}), 400
+    
+    if 'ids' in request.args:
+        try:
+            ids = parse_ids(request.args['ids'])
+        except FilterError as err:
+            return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
+        
+        matches, missing = fetch_by_ids(Match.query.options(*match_serializer.load_options(plan)), ids)
+        return json_response({'matches': plan.dump_many(matches), 'missing': missing})
     
-    if year:
-        query = query.filter(db.extract('year', Match.date) == year)
+    try:
+        filters = match_filters.compile(request.args)
+    except FilterError as err:
+        return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
     
-    if status_filter == 'upcoming':
-        query = query.filter(Match.date > datetime.utcnow(), Match.result == 'pending')
-    elif status_filter == 'finished':
-        query = query.filter(Match.result != 'pending')
+    query = filters.apply(Match.query.options(*match_serializer.load_options(plan)))
     
-    matches = query.order_by(Match.date.desc()).paginate(
+    matches = query.paginate(
         page=page, per_page=per_page, error_out=False
     )
     
-    return jsonify({
-        'matches': [match.to_dict() for match in matches.items],
+    return json_response({
+        'matches': plan.dump_many(matches.items),
         'pagination': {
             'page': page,
             'pages': matches.pages,
@@ -108,18 +130,12 @@ def get_matches():
             'has_next': matches.has_next,
             'has_prev': matches.has_prev
         }
-    }), 200
+    })
 
 @matches_bp.route('/<int:match_id>', methods=['GET'])
-@jwt_required()
+@requires(permission='matches.read')
 def get_match(match_id):
     """Get specific match details."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
     match = Match.query.get(match_id)
     if not match:
         return jsonify({'error': 'Match not found'}), 404
@@ -127,15 +143,9 @@ def get_match(match_id):
     return jsonify(match.to_dict(include_stats=True)), 200
 
 @matches_bp.route('', methods=['POST'])
-@jwt_required()
+@requires(permission='matches.create', error='Admin or coach access required')
 def create_match():
     """Create a new match."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'create'):
-        return jsonify({'error': 'Admin or coach access required'}), 403
-    
     schema = MatchCreateSchema()
     
     try:
@@ -158,15 +168,9 @@ def create_match():
         return jsonify({'error': 'Match creation failed', 'message': str(e)}), 500
 
 @matches_bp.route('/<int:match_id>', methods=['PUT'])
-@jwt_required()
+@requires(permission='matches.update', error='Admin or coach access required')
 def update_match(match_id):
     """Update match information."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'update'):
-        return jsonify({'error': 'Admin or coach access required'}), 403
-    
     match = Match.query.get(match_id)
     if not match:
         return jsonify({'error': 'Match not found'}), 404
@@ -178,6 +182,8 @@ def update_match(match_id):
     except ValidationError as err:
         return jsonify({'error': 'Validation failed', 'messages': err.messages}), 400
     
+    score_before = (match.goals_for, match.goals_against, match.result)
+    
     try:
         # Update match fields
         for field, value in data.items():
@@ -190,6 +196,11 @@ def update_match(match_id):
         
         db.session.commit()
         
+        if (match.goals_for, match.goals_against, match.result) != score_before:
+            publish_match_event(match.id, 'score', live_score(match))
+            if match.result != score_before[2]:
+                refresh_squad_ratings.enqueue()
+        
         return jsonify({
             'message': 'Match updated successfully',
             'match': match.to_dict()
@@ -200,15 +211,9 @@ def update_match(match_id):
         return jsonify({'error': 'Match update failed', 'message': str(e)}), 500
 
 @matches_bp.route('/<int:match_id>', methods=['DELETE'])
-@jwt_required()
+@requires(permission='matches.delete', error='Admin access required')
 def delete_match(match_id):
     """Delete match (admin only)."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
-        return jsonify({'error': 'Admin access required'}), 403
-    
     match = Match.query.get(match_id)
     if not match:
         return jsonify({'error': 'Match not found'}), 404
@@ -224,15 +229,9 @@ def delete_match(match_id):
         return jsonify({'error': 'Match deletion failed', 'message': str(e)}), 500
 
 @matches_bp.route('/<int:match_id>/stats', methods=['POST'])
-@jwt_required()
+@requires(permission='matches.update', error='Admin or coach access required')
 def add_player_stats(match_id):
     """Add or update player statistics for a match."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'update'):
-        return jsonify({'error': 'Admin or coach access required'}), 403
-    
     match = Match.query.get(match_id)
     if not match:
         return jsonify({'error': 'Match not found'}), 404
@@ -251,6 +250,9 @@ def add_player_stats(match_id):
             match_id=match_id
         ).first()
         
+        counts_before = {field: (getattr(existing_stats, field) or 0) if existing_stats else 0
+                         for field in ('goals', 'yellow_cards', 'red_cards')}
+        
         if existing_stats:
             # Update existing stats
             for field, value in data.items():
@@ -263,6 +265,19 @@ def add_player_stats(match_id):
             db.session.add(stats)
         
         db.session.commit()
+        update_player_rating.enqueue(stats.player_id)
+        
+        player_name = stats.player.full_name if stats.player else None
+        if (stats.goals or 0) > counts_before['goals']:
+            publish_match_event(match_id, 'goal', {
+                'player_id': stats.player_id, 'player_name': player_name, 'goals': stats.goals
+            })
+        for field, color in (('yellow_cards', 'yellow'), ('red_cards', 'red')):
+            if (getattr(stats, field) or 0) > counts_before[field]:
+                publish_match_event(match_id, 'card', {
+                    'player_id': stats.player_id, 'player_name': player_name,
+                    'color': color, 'count': getattr(stats, field)
+                })
         
         return jsonify({
             'message': 'Player stats updated successfully',
@@ -273,23 +288,59 @@ def add_player_stats(match_id):
         db.session.rollback()
         return jsonify({'error': 'Stats update failed', 'message': str(e)}), 500
 
+@matches_bp.route('/<int:match_id>/live', methods=['GET'])
+@requires(permission='matches.read', locations=['headers', 'query_string'])
+def live_match_feed(match_id):
+    """Stream live score, goal and card events (Server-Sent Events).
+    
+    EventSource cannot send an Authorization header, so the access token
+    may also be passed as ?access_token=. Reconnecting clients send
+    Last-Event-ID (or ?last_event_id=) and only receive the events they missed.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    # Subscribe before reading the score so no event falls between the two
+    subscription = live_events.subscribe(f'match:{match_id}')
+    snapshot = None
+    if last_event_id is None:
+        match = Match.query.get(match_id)
+        if not match:
+            subscription.close()
+            return jsonify({'error': 'Match not found'}), 404
+        snapshot = live_score(match)
+    
+    # The stream needs no request context: the session is released as soon
+    # as the view returns instead of being held for the lifetime of the stream
+    stream = event_stream(subscription, last_event_id, snapshot,
+                          heartbeat=current_app.config.get('LIVE_EVENTS_HEARTBEAT', 15))
+    response = Response(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Also when the client leaves before the stream starts
+    response.call_on_close(subscription.close)
+    return response
+
 @matches_bp.route('/<int:match_id>/stats', methods=['GET'])
-@jwt_required()
+@requires(permission='matches.read')
 def get_match_stats(match_id):
     """Get all player statistics for a match."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
     match = Match.query.get(match_id)
     if not match:
         return jsonify({'error': 'Match not found'}), 404
     
-    stats = PlayerStats.query.filter_by(match_id=match_id).all()
+    try:
+        filters = player_stats_filters.compile(request.args)
+    except FilterError as err:
+        return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
     
-    return jsonify({
+    stats = filters.apply(PlayerStats.query.filter_by(match_id=match_id)).all()
+    
+    return json_response({
         'match_id': match_id,
         'match_info': {
             'opponent': match.opponent,
@@ -297,35 +348,86 @@ def get_match_stats(match_id):
             'score': match.score,
             'result': match.result
         },
-        'player_stats': [stat.to_dict() for stat in stats],
+        'player_stats': player_stats_serializer.dump_many(stats),
         'team_stats': match.get_team_stats()
+    })
+
+@matches_bp.route('/<int:match_id>/squad', methods=['GET'])
+@requires(permission='matches.squad', error='Admin or coach access required')
+def get_squad_pool(match_id):
+    """Get the players available for a match squad, by position."""
+    match = Match.query.get(match_id)
+    if not match:
+        return jsonify({'error': 'Match not found'}), 404
+    
+    position = request.args.get('position')
+    if position and position not in squad.POSITIONS:
+        return jsonify({'error': 'Invalid position'}), 400
+    include_unavailable = request.args.get('include_unavailable', 'false').lower() == 'true'
+    
+    pool, unavailable = squad.available_pool(position, include_unavailable=include_unavailable)
+    
+    data = {
+        'match_id': match_id,
+        'pool': {name: [squad_entry(candidate) for candidate in players] for name, players in pool.items()},
+        'available_count': sum(len(players) for players in pool.values())
+    }
+    if include_unavailable:
+        data['unavailable'] = [squad_entry(candidate, include_reasons=True) for candidate in unavailable]
+    
+    return json_response(data)
+
+@matches_bp.route('/<int:match_id>/squad', methods=['POST'])
+@requires(permission='matches.squad', error='Admin or coach access required')
+def announce_squad(match_id):
+    """Announce a match squad and notify the selected players."""
+    match = Match.query.get(match_id)
+    if not match:
+        return jsonify({'error': 'Match not found'}), 404
+    
+    if match.is_finished:
+        return jsonify({'error': 'Match is already finished'}), 400
+    
+    schema = SquadSchema()
+    
+    try:
+        data = schema.load(request.json)
+    except ValidationError as err:
+        return jsonify({'error': 'Validation failed', 'messages': err.messages}), 400
+    
+    player_ids = list(dict.fromkeys(data['player_ids']))
+    unavailable = squad.unavailable_ids(player_ids)
+    if unavailable:
+        return jsonify({'error': 'Players not available for selection', 'player_ids': unavailable}), 400
+    
+    notify_squad_announced.enqueue(
+        match.id, player_ids, idempotency_key=f"{match.id}:{','.join(map(str, sorted(player_ids)))}"
+    )
+    
+    return jsonify({
+        'message': 'Squad announced successfully',
+        'match_id': match.id,
+        'player_ids': player_ids
     }), 200
 
 @matches_bp.route('/upcoming', methods=['GET'])
-@jwt_required()
+@requires(permission='matches.read')
 def get_upcoming_matches():
     """Get upcoming matches."""
     limit = request.args.get('limit', 5, type=int)
+    matches = Match.get_upcoming_matches(limit)
     
-    matches = Match.query.filter(
-        Match.date > datetime.utcnow(),
-        Match.result == 'pending'
-    ).order_by(Match.date.asc()).limit(limit).all()
-    
-    return jsonify({
-        'upcoming_matches': [match.to_dict() for match in matches]
-    }), 200
+    return json_response({
+        'upcoming_matches': match_serializer.dump_many(matches)
+    })
 
 @matches_bp.route('/results', methods=['GET'])
-@jwt_required()
+@requires(permission='matches.read')
 def get_recent_results():
     """Get recent match results."""
     limit = request.args.get('limit', 5, type=int)
+    matches = Match.get_recent_results(limit)
     
-    matches = Match.query.filter(
-        Match.result != 'pending'
-    ).order_by(Match.date.desc()).limit(limit).all()
-    
-    return jsonify({
-        'recent_results': [match.to_dict() for match in matches]
-    }), 200
+    return json_response({
+        'recent_results': match_serializer.dump_many(matches)
+    })
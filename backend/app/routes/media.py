@@ -0,0 +1,11 @@
+from flask import Blueprint
+
+from app import media_store
+from app.services.media_serving import send_media
+
+media_bp = Blueprint('media', __name__)
+
+@media_bp.route('/<path:filename>', methods=['GET', 'HEAD'])
+def serve_media(filename):
+    """Serve a file from the media store."""
+    return send_media(media_store, filename)
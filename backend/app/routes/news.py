@@ -1,11 +1,16 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, jwt_required
+from flask_jwt_extended import verify_jwt_in_request
 from marshmallow import Schema, fields, ValidationError
+from sqlalchemy.orm import undefer
 from datetime import datetime
 
-from app import db
-from app.models.user import User
+from app import compressor, db
+from app.filters import FilterError, fetch_by_ids, news_filters, parse_ids
 from app.models.news import News
+from app.serializers import json_response, news_serializer
+from app.services.permissions import can
+from app.services.tokens import current_claims, requires
+from app.tasks import notify_news_published
 
 news_bp = Blueprint('news', __name__)
 
@@ -49,68 +54,62 @@ class NewsUpdateSchema(Schema):
     related_player_id = fields.Int(missing=None)
     tags = fields.Str(missing=None)
 
-def check_permission(current_user, action, article=None):
-    """Check if user has permission to perform action."""
-    if action == 'read':
-        return True  # Everyone can read published articles
+def published_news_query(query, filters):
+    """Filter and order a News query for the public article list.
     
-    if action in ['create', 'update', 'delete', 'publish']:
-        if current_user.is_admin:
+    ``filters`` is compiled from the query string by ``app.filters.news_filters``.
+    """
+    query = query.filter_by(published=True).filter(News.published_at <= datetime.utcnow())
+    return filters.apply(query)
+
+def visible_article(claims):
+    """Whether an article is visible: published, or editable by ``claims`` (None when anonymous)."""
+    def visible(article):
+        if article.is_published:
             return True
-        
-        if current_user.is_coach or current_user.is_staff:
-            if action == 'create':
-                return True
-            
-            if action in ['update', 'delete'] and article:
-                return article.author_id == current_user.id
-            
-            if action == 'publish':
-                return False  # Only admin can publish
-        
-        return False
-    
-    return False
+        return claims is not None and can(claims, 'news.update', owned=article.author_id == claims.id)
+    return visible
 
 @news_bp.route('', methods=['GET'])
+@compressor.cached(unless=lambda: 'ids' in request.args)
 def get_news():
     """Get list of news articles (public endpoint)."""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
-    category_filter = request.args.get('category')
-    featured_only = request.args.get('featured', 'false').lower() == 'true'
-    breaking_only = request.args.get('breaking', 'false').lower() == 'true'
-    search = request.args.get('search')
     
-    query = News.query.filter_by(published=True).filter(
-        News.published_at <= datetime.utcnow()
-    )
-    
-    if category_filter:
-        query = query.filter(News.category == category_filter)
-    
-    if featured_only:
-        query = query.filter(News.is_featured == True)
+    try:
+        plan = news_serializer.plan_from_args(request.args)
+    except ValueError as err:
+        return jsonify({'error': 'Invalid fieldset', 'message': str(err)}), 400
     
-    if breaking_only:
-        query = query.filter(News.is_breaking == True)
+    if 'ids' in request.args:
+        try:
+            ids = parse_ids(request.args['ids'])
+        except FilterError as err:
+            return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
+        
+        # Unpublished articles are reported missing unless the caller may edit them
+        try:
+            verify_jwt_in_request(optional=True)
+            claims = current_claims()
+        except Exception:
+            claims = None
+        
+        query = News.query.options(*news_serializer.load_options(plan)).options(
+            undefer(News.published), undefer(News.published_at), undefer(News.author_id))
+        articles, missing = fetch_by_ids(query, ids, visible=visible_article(claims))
+        return json_response({'articles': plan.dump_many(articles), 'missing': missing})
     
-    if search:
-        query = query.filter(
-            db.or_(
-                News.title.ilike(f'%{search}%'),
-                News.content.ilike(f'%{search}%'),
-                News.tags.ilike(f'%{search}%')
-            )
-        )
+    try:
+        filters = news_filters.compile(request.args)
+    except FilterError as err:
+        return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
     
-    news = query.order_by(
-        News.priority.desc(),
-        News.published_at.desc()
-    ).paginate(page=page, per_page=per_page, error_out=False)
+    query = published_news_query(News.query.options(*news_serializer.load_options(plan)), filters)
+    news = query.paginate(page=page, per_page=per_page, error_out=False)
     
-    return jsonify({
-        'articles': [article.to_dict(include_content=False) for article in news.items],
+    return json_response({
+        'articles': plan.dump_many(news.items),
         'pagination': {
             'page': page,
             'pages': news.pages,
@@ -119,7 +118,7 @@ def get_news():
             'has_next': news.has_next,
             'has_prev': news.has_prev
         }
-    }), 200
+    })
 
 @news_bp.route('/<int:news_id>', methods=['GET'])
 def get_news_article(news_id):
@@ -132,15 +131,9 @@ def get_news_article(news_id):
     if not article.is_published:
         # Check if user is authenticated and has permission to view unpublished articles
         try:
-            from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
             verify_jwt_in_request(optional=True)
-            current_user_id = get_jwt_identity()
-            
-            if current_user_id:
-                current_user = User.query.get(current_user_id)
-                if not (current_user and check_permission(current_user, 'update', article)):
-                    return jsonify({'error': 'Article not found'}), 404
-            else:
+            claims = current_claims()
+            if not can(claims, 'news.update', owned=article.author_id == claims.id):
                 return jsonify({'error': 'Article not found'}), 404
         except:
             return jsonify({'error': 'Article not found'}), 404
@@ -164,15 +157,9 @@ def get_news_by_slug(slug):
     return jsonify(article.to_dict(include_content=True)), 200
 
 @news_bp.route('', methods=['POST'])
-@jwt_required()
+@requires(permission='news.create')
 def create_news():
     """Create a new news article."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'create'):
-        return jsonify({'error': 'Permission denied'}), 403
-    
     schema = NewsCreateSchema()
     
     try:
@@ -181,19 +168,19 @@ def create_news():
         return jsonify({'error': 'Validation failed', 'messages': err.messages}), 400
     
     try:
-        # Auto-generate excerpt if not provided
-        if not data.get('excerpt') and data.get('content'):
-            data['excerpt'] = data['content'][:200] + '...' if len(data['content']) > 200 else data['content']
-        
-        article = News(author_id=current_user_id, **data)
+        # Word count, reading time and missing excerpt are computed by the model
+        article = News(author_id=current_claims().id, **data)
         
-        # Auto-publish if user is admin and published flag is True
-        if data.get('published') and current_user.is_admin:
+        # Auto-publish if user may publish and published flag is True
+        if data.get('published') and can(current_claims(), 'news.publish'):
             article.publish()
         
-        db.session.add(article)
+        article.save_with_unique_slug()
         db.session.commit()
         
+        if article.is_published:
+            notify_news_published.enqueue(article.id, idempotency_key=str(article.id))
+        
         return jsonify({
             'message': 'Article created successfully',
             'article': article.to_dict(include_content=True)
@@ -204,20 +191,16 @@ def create_news():
         return jsonify({'error': 'Article creation failed', 'message': str(e)}), 500
 
 @news_bp.route('/<int:news_id>', methods=['PUT'])
-@jwt_required()
+@requires()
 def update_news(news_id):
     """Update news article."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
     article = News.query.get(news_id)
     if not article:
         return jsonify({'error': 'Article not found'}), 404
     
-    if not check_permission(current_user, 'update', article):
+    # Coaches and staff only manage their own articles
+    claims = current_claims()
+    if not can(claims, 'news.update', owned=article.author_id == claims.id):
         return jsonify({'error': 'Permission denied'}), 403
     
     schema = NewsUpdateSchema()
@@ -233,13 +216,13 @@ def update_news(news_id):
             if value is not None and hasattr(article, field):
                 setattr(article, field, value)
         
-        # Update excerpt if content changed
-        if data.get('content') and not data.get('excerpt'):
-            article.excerpt = data['content'][:200] + '...' if len(data['content']) > 200 else data['content']
+        # Recompute text metrics (and the excerpt unless one was given) if content changed
+        if data.get('content'):
+            article.update_text_metrics(regenerate_excerpt=not data.get('excerpt'))
         
         # Regenerate slug if title changed
         if data.get('title'):
-            article.slug = article.generate_slug(data['title'])
+            article.save_with_unique_slug(data['title'])
         
         db.session.commit()
         
@@ -253,20 +236,16 @@ def update_news(news_id):
         return jsonify({'error': 'Article update failed', 'message': str(e)}), 500
 
 @news_bp.route('/<int:news_id>', methods=['DELETE'])
-@jwt_required()
+@requires()
 def delete_news(news_id):
     """Delete news article."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
     article = News.query.get(news_id)
     if not article:
         return jsonify({'error': 'Article not found'}), 404
     
-    if not check_permission(current_user, 'delete', article):
+    # Coaches and staff only manage their own articles
+    claims = current_claims()
+    if not can(claims, 'news.delete', owned=article.author_id == claims.id):
         return jsonify({'error': 'Permission denied'}), 403
     
     try:
@@ -280,15 +259,9 @@ def delete_news(news_id):
         return jsonify({'error': 'Article deletion failed', 'message': str(e)}), 500
 
 @news_bp.route('/<int:news_id>/publish', methods=['POST'])
-@jwt_required()
+@requires(permission='news.publish', error='Admin access required')
 def publish_news(news_id):
     """Publish news article (admin only)."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
-        return jsonify({'error': 'Admin access required'}), 403
-    
     article = News.query.get(news_id)
     if not article:
         return jsonify({'error': 'Article not found'}), 404
@@ -298,6 +271,7 @@ def publish_news(news_id):
     
     try:
         article.publish()
+        notify_news_published.enqueue(article.id, idempotency_key=str(article.id))
         
         return jsonify({
             'message': 'Article published successfully',
@@ -309,15 +283,9 @@ def publish_news(news_id):
         return jsonify({'error': 'Article publication failed', 'message': str(e)}), 500
 
 @news_bp.route('/<int:news_id>/unpublish', methods=['POST'])
-@jwt_required()
+@requires(permission='news.publish', error='Admin access required')
 def unpublish_news(news_id):
     """Unpublish news article (admin only)."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
-        return jsonify({'error': 'Admin access required'}), 403
-    
     article = News.query.get(news_id)
     if not article:
         return jsonify({'error': 'Article not found'}), 404
@@ -338,35 +306,38 @@ def unpublish_news(news_id):
         return jsonify({'error': 'Article unpublication failed', 'message': str(e)}), 500
 
 @news_bp.route('/featured', methods=['GET'])
+@compressor.cached()
 def get_featured_news():
     """Get featured news articles."""
     limit = request.args.get('limit', 5, type=int)
     articles = News.get_featured_articles(limit)
     
-    return jsonify({
-        'featured_articles': [article.to_dict(include_content=False) for article in articles]
-    }), 200
+    return json_response({
+        'featured_articles': news_serializer.dump_many(articles)
+    })
 
 @news_bp.route('/breaking', methods=['GET'])
+@compressor.cached()
 def get_breaking_news():
     """Get breaking news."""
     limit = request.args.get('limit', 3, type=int)
     articles = News.get_breaking_news(limit)
     
-    return jsonify({
-        'breaking_news': [article.to_dict(include_content=False) for article in articles]
-    }), 200
+    return json_response({
+        'breaking_news': news_serializer.dump_many(articles)
+    })
 
 @news_bp.route('/recent', methods=['GET'])
+@compressor.cached()
 def get_recent_news():
     """Get recent news articles."""
     limit = request.args.get('limit', 10, type=int)
     category = request.args.get('category')
     articles = News.get_recent_articles(limit, category)
     
-    return jsonify({
-        'recent_articles': [article.to_dict(include_content=False) for article in articles]
-    }), 200
+    return json_response({
+        'recent_articles': news_serializer.dump_many(articles)
+    })
 
 @news_bp.route('/search', methods=['GET'])
 def search_news():
@@ -379,11 +350,11 @@ def search_news():
     
     articles = News.search_articles(query, limit)
     
-    return jsonify({
-        'search_results': [article.to_dict(include_content=False) for article in articles],
+    return json_response({
+        'search_results': news_serializer.dump_many(articles),
         'query': query,
         'total_results': len(articles)
-    }), 200
+    })
 
 @news_bp.route('/categories', methods=['GET'])
 def get_categories():
@@ -1,11 +1,14 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import Schema, fields, ValidationError
 from datetime import date
 
 from app import db
+from app.filters import FilterError, fetch_by_ids, parse_ids, player_filters
 from app.models.user import User
 from app.models.player import Player
+from app.serializers import json_response, player_serializer, player_stats_serializer
+from app.services.permissions import can
+from app.services.tokens import current_claims, requires
 
 players_bp = Blueprint('players', __name__)
 
@@ -51,60 +54,52 @@ class PlayerUpdateSchema(Schema):
     emergency_contact_phone = fields.Str(missing=None)
     address = fields.Str(missing=None)
 
-def check_permission(current_user, action, target_player=None):
-    """Check if user has permission to perform action."""
-    if current_user.is_admin or current_user.is_coach:
-        return True
-    
-    if action == 'read':
-        return True  # Everyone can read player info
-    
-    if action == 'update' and target_player:
-        # Players can only update their own profile
-        return current_user.is_player and current_user.player_profile and current_user.player_profile.id == target_player.id
-    
-    return False
-
 @players_bp.route('', methods=['GET'])
-@jwt_required()
+@requires(permission='players.read')
 def get_players():
-    """Get list of players."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
+    """Get list of players (filters and sort keys in ``app.filters.player_filters``)."""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
-    position_filter = request.args.get('position')
-    status_filter = request.args.get('status', 'active')
-    search = request.args.get('search')
     
-    query = Player.query.join(User)
+    # Include sensitive data only for authorized users
+    claims = current_claims()
+    include_sensitive = can(claims, 'players.read_sensitive')
     
-    if position_filter:
-        query = query.filter(Player.position == position_filter)
+    try:
+        plan = player_serializer.plan_from_args(request.args, include_sensitive=include_sensitive)
+    except ValueError as err:
+        return jsonify({'error': 'Invalid fieldset', 'message': str(err)}), 400
+    
+    if 'ids' in request.args:
+        try:
+            ids = parse_ids(request.args['ids'])
+        except FilterError as err:
+            return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
+        
+        # As on the detail endpoint, players also see their own sensitive data
+        own_plan = plan
+        if not include_sensitive and claims.player_id in ids:
+            own_plan = player_serializer.plan_from_args(request.args, include_sensitive=True)
+        
+        players, missing = fetch_by_ids(Player.query.options(*player_serializer.load_options(own_plan)), ids)
+        return json_response({
+            'players': [(own_plan if player.id == claims.player_id else plan).dump(player) for player in players],
+            'missing': missing
+        })
     
-    if status_filter:
-        query = query.filter(Player.status == status_filter)
+    try:
+        filters = player_filters.compile(request.args)
+    except FilterError as err:
+        return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
     
-    if search:
-        query = query.filter(
-            (User.first_name.ilike(f'%{search}%')) |
-            (User.last_name.ilike(f'%{search}%')) |
-            (Player.nationality.ilike(f'%{search}%'))
-        )
+    query = filters.apply(Player.query.join(User).options(*player_serializer.load_options(plan)))
     
-    players = query.order_by(Player.jersey_number.asc()).paginate(
+    players = query.paginate(
         page=page, per_page=per_page, error_out=False
     )
     
-    # Include sensitive data only for authorized users
-    include_sensitive = current_user.is_admin or current_user.is_coach
-    
-    return jsonify({
-        'players': [player.to_dict(include_sensitive=include_sensitive) for player in players.items],
+    return json_response({
+        'players': plan.dump_many(players.items),
         'pagination': {
             'page': page,
             'pages': players.pages,
@@ -113,28 +108,18 @@ def get_players():
             'has_next': players.has_next,
             'has_prev': players.has_prev
         }
-    }), 200
+    })
 
 @players_bp.route('/<int:player_id>', methods=['GET'])
-@jwt_required()
+@requires(permission='players.read')
 def get_player(player_id):
     """Get specific player details."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
     player = Player.query.get(player_id)
     if not player:
         return jsonify({'error': 'Player not found'}), 404
     
-    if not check_permission(current_user, 'read', player):
-        return jsonify({'error': 'Permission denied'}), 403
-    
-    include_sensitive = current_user.is_admin or current_user.is_coach or (
-        current_user.is_player and current_user.player_profile and current_user.player_profile.id == player.id
-    )
+    claims = current_claims()
+    include_sensitive = can(claims, 'players.read_sensitive', owned=claims.player_id == player.id)
     
     player_data = player.to_dict(include_sensitive=include_sensitive)
     
@@ -144,15 +129,9 @@ def get_player(player_id):
     return jsonify(player_data), 200
 
 @players_bp.route('', methods=['POST'])
-@jwt_required()
+@requires(permission='players.create', error='Admin or coach access required')
 def create_player():
     """Create a new player profile."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not (current_user.is_admin or current_user.is_coach):
-        return jsonify({'error': 'Admin or coach access required'}), 403
-    
     schema = PlayerCreateSchema()
     
     try:
@@ -194,20 +173,16 @@ def create_player():
         return jsonify({'error': 'Player creation failed', 'message': str(e)}), 500
 
 @players_bp.route('/<int:player_id>', methods=['PUT'])
-@jwt_required()
+@requires()
 def update_player(player_id):
     """Update player information."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
     player = Player.query.get(player_id)
     if not player:
         return jsonify({'error': 'Player not found'}), 404
     
-    if not check_permission(current_user, 'update', player):
+    # Players can only update their own profile
+    claims = current_claims()
+    if not can(claims, 'players.update', owned=claims.player_id == player.id):
         return jsonify({'error': 'Permission denied'}), 403
     
     schema = PlayerUpdateSchema()
@@ -241,15 +216,9 @@ def update_player(player_id):
         return jsonify({'error': 'Player update failed', 'message': str(e)}), 500
 
 @players_bp.route('/<int:player_id>', methods=['DELETE'])
-@jwt_required()
+@requires(permission='players.delete', error='Admin access required')
 def delete_player(player_id):
     """Delete player profile (admin only)."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
-        return jsonify({'error': 'Admin access required'}), 403
-    
     player = Player.query.get(player_id)
     if not player:
         return jsonify({'error': 'Player not found'}), 404
@@ -269,15 +238,9 @@ def delete_player(player_id):
         return jsonify({'error': 'Player deletion failed', 'message': str(e)}), 500
 
 @players_bp.route('/<int:player_id>/stats', methods=['GET'])
-@jwt_required()
+@requires(permission='players.read')
 def get_player_stats(player_id):
     """Get player statistics."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
     player = Player.query.get(player_id)
     if not player:
         return jsonify({'error': 'Player not found'}), 404
@@ -288,17 +251,17 @@ def get_player_stats(player_id):
     season_stats = player.get_season_stats(season_year)
     total_stats = player.calculate_total_stats()
     
-    return jsonify({
+    return json_response({
         'player_id': player_id,
         'player_name': player.full_name,
         'season_year': season_year,
-        'season_stats': [stat.to_dict() for stat in season_stats],
+        'season_stats': player_stats_serializer.dump_many(season_stats),
         'total_stats': total_stats,
         'current_rating': player.rating
-    }), 200
+    })
 
 @players_bp.route('/positions', methods=['GET'])
-@jwt_required()
+@requires(permission='players.read')
 def get_positions():
     """Get available player positions."""
     positions = {
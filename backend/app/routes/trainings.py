@@ -1,11 +1,13 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import Schema, fields, ValidationError
-from datetime import date, time, datetime
+from datetime import date, time
 
 from app import db
-from app.models.user import User
+from app.filters import FilterError, fetch_by_ids, parse_ids, training_filters
 from app.models.training import Training, TrainingAttendance
+from app.serializers import json_response, training_serializer, attendance_serializer
+from app.services.tokens import requires
+from app.tasks import notify_training_scheduled
 
 trainings_bp = Blueprint('trainings', __name__)
 
@@ -52,61 +54,40 @@ class AttendanceSchema(Schema):
     performance_rating = fields.Float(missing=None)
     notes = fields.Str(missing=None)
 
-def check_permission(current_user, action):
-    """Check if user has permission to perform action."""
-    if action == 'read':
-        return True  # Everyone can read training info
-    
-    if action in ['create', 'update', 'delete', 'attendance']:
-        return current_user.is_admin or current_user.is_coach
-    
-    return False
-
 @trainings_bp.route('', methods=['GET'])
-@jwt_required()
+@requires(permission='trainings.read')
 def get_trainings():
-    """Get list of trainings."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
+    """Get list of trainings (filters and sort keys in ``app.filters.training_filters``)."""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
-    type_filter = request.args.get('type')
-    date_from = request.args.get('date_from')
-    date_to = request.args.get('date_to')
-    upcoming_only = request.args.get('upcoming', 'false').lower() == 'true'
-    
-    query = Training.query
     
-    if type_filter:
-        query = query.filter(Training.type == type_filter)
+    try:
+        plan = training_serializer.plan_from_args(request.args)
+    except ValueError as err:
+        return jsonify({'error': 'Invalid fieldset', 'message': str(err)}), 400
     
-    if date_from:
+    if 'ids' in request.args:
         try:
-            from_date = datetime.strptime(date_from, '%Y-%m-%d').date()
-            query = query.filter(Training.date >= from_date)
-        except ValueError:
-            return jsonify({'error': 'Invalid date_from format. Use YYYY-MM-DD'}), 400
+            ids = parse_ids(request.args['ids'])
+        except FilterError as err:
+            return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
+        
+        trainings, missing = fetch_by_ids(Training.query.options(*training_serializer.load_options(plan)), ids)
+        return json_response({'trainings': plan.dump_many(trainings), 'missing': missing})
     
-    if date_to:
-        try:
-            to_date = datetime.strptime(date_to, '%Y-%m-%d').date()
-            query = query.filter(Training.date <= to_date)
-        except ValueError:
-            return jsonify({'error': 'Invalid date_to format. Use YYYY-MM-DD'}), 400
+    try:
+        filters = training_filters.compile(request.args)
+    except FilterError as err:
+        return jsonify({'error': 'Invalid filter', 'message': str(err)}), 400
     
-    if upcoming_only:
-        query = query.filter(Training.date >= date.today())
+    query = filters.apply(Training.query.options(*training_serializer.load_options(plan)))
     
-    trainings = query.order_by(Training.date.desc(), Training.start_time.desc()).paginate(
+    trainings = query.paginate(
         page=page, per_page=per_page, error_out=False
     )
     
-    return jsonify({
-        'trainings': [training.to_dict() for training in trainings.items],
+    return json_response({
+        'trainings': plan.dump_many(trainings.items),
         'pagination': {
             'page': page,
             'pages': trainings.pages,
@@ -115,18 +96,12 @@ def get_trainings():
             'has_next': trainings.has_next,
             'has_prev': trainings.has_prev
         }
-    }), 200
+    })
 
 @trainings_bp.route('/<int:training_id>', methods=['GET'])
-@jwt_required()
+@requires(permission='trainings.read')
 def get_training(training_id):
     """Get specific training details."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
     training = Training.query.get(training_id)
     if not training:
         return jsonify({'error': 'Training not found'}), 404
@@ -134,15 +109,9 @@ def get_training(training_id):
     return jsonify(training.to_dict(include_attendance=True)), 200
 
 @trainings_bp.route('', methods=['POST'])
-@jwt_required()
+@requires(permission='trainings.create', error='Admin or coach access required')
 def create_training():
     """Create a new training session."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'create'):
-        return jsonify({'error': 'Admin or coach access required'}), 403
-    
     schema = TrainingCreateSchema()
     
     try:
@@ -158,6 +127,7 @@ def create_training():
         training = Training(**data)
         db.session.add(training)
         db.session.commit()
+        notify_training_scheduled.enqueue(training.id)
         
         return jsonify({
             'message': 'Training created successfully',
@@ -169,15 +139,9 @@ def create_training():
         return jsonify({'error': 'Training creation failed', 'message': str(e)}), 500
 
 @trainings_bp.route('/<int:training_id>', methods=['PUT'])
-@jwt_required()
+@requires(permission='trainings.update', error='Admin or coach access required')
 def update_training(training_id):
     """Update training information."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'update'):
-        return jsonify({'error': 'Admin or coach access required'}), 403
-    
     training = Training.query.get(training_id)
     if not training:
         return jsonify({'error': 'Training not found'}), 404
@@ -213,15 +177,9 @@ def update_training(training_id):
         return jsonify({'error': 'Training update failed', 'message': str(e)}), 500
 
 @trainings_bp.route('/<int:training_id>', methods=['DELETE'])
-@jwt_required()
+@requires(permission='trainings.delete', error='Admin access required')
 def delete_training(training_id):
     """Delete training (admin only)."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
-        return jsonify({'error': 'Admin access required'}), 403
-    
     training = Training.query.get(training_id)
     if not training:
         return jsonify({'error': 'Training not found'}), 404
@@ -237,15 +195,9 @@ def delete_training(training_id):
         return jsonify({'error': 'Training deletion failed', 'message': str(e)}), 500
 
 @trainings_bp.route('/<int:training_id>/attendance', methods=['POST'])
-@jwt_required()
+@requires(permission='trainings.attendance', error='Admin or coach access required')
 def mark_attendance(training_id):
     """Mark attendance for a training session."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not check_permission(current_user, 'attendance'):
-        return jsonify({'error': 'Admin or coach access required'}), 403
-    
     training = Training.query.get(training_id)
     if not training:
         return jsonify({'error': 'Training not found'}), 404
@@ -270,22 +222,16 @@ def mark_attendance(training_id):
         return jsonify({'error': 'Attendance marking failed', 'message': str(e)}), 500
 
 @trainings_bp.route('/<int:training_id>/attendance', methods=['GET'])
-@jwt_required()
+@requires(permission='trainings.read')
 def get_training_attendance(training_id):
     """Get attendance for a training session."""
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user:
-        return jsonify({'error': 'User not found'}), 404
-    
     training = Training.query.get(training_id)
     if not training:
         return jsonify({'error': 'Training not found'}), 404
     
     attendances = TrainingAttendance.query.filter_by(training_id=training_id).all()
     
-    return jsonify({
+    return json_response({
         'training_id': training_id,
         'training_info': {
             'title': training.title,
@@ -298,25 +244,25 @@ def get_training_attendance(training_id):
             'attendance_count': training.attendance_count,
             'attendance_rate': training.attendance_rate
         },
-        'attendances': [att.to_dict() for att in attendances]
-    }), 200
+        'attendances': attendance_serializer.dump_many(attendances)
+    })
 
 @trainings_bp.route('/upcoming', methods=['GET'])
-@jwt_required()
+@requires(permission='trainings.read')
 def get_upcoming_trainings():
     """Get upcoming training sessions."""
     limit = request.args.get('limit', 5, type=int)
     
     trainings = Training.query.filter(
-        Training.date >= date.today()
+        Training.is_upcoming
     ).order_by(Training.date.asc(), Training.start_time.asc()).limit(limit).all()
     
-    return jsonify({
-        'upcoming_trainings': [training.to_dict() for training in trainings]
-    }), 200
+    return json_response({
+        'upcoming_trainings': training_serializer.dump_many(trainings)
+    })
 
 @trainings_bp.route('/today', methods=['GET'])
-@jwt_required()
+@requires(permission='trainings.read')
 def get_today_trainings():
     """Get today's training sessions."""
     today = date.today()
@@ -0,0 +1,100 @@
+import os
+
+from flask import Blueprint, request, jsonify
+
+from app import db, media_store
+from app.models.user import User
+from app.services.media import UploadError, original_path
+from app.services.tokens import current_claims, requires
+from app.tasks import generate_image_variants
+
+uploads_bp = Blueprint('uploads', __name__)
+
+def get_upload_stream():
+    """Return the stream of the uploaded image.
+
+    Accepts either a multipart form with a ``file`` field or a raw request
+    body with an ``image/*`` content type. The raw form is read straight
+    from the socket without any intermediate copy.
+    """
+    if 'file' in request.files:
+        return request.files['file'].stream
+    if request.mimetype and request.mimetype.startswith('image/'):
+        return request.stream
+    return None
+
+def schedule_variants(stored):
+    """Queue the resized variants of a stored image, once per content hash."""
+    if not media_store.variants_ready(stored.content_hash):
+        generate_image_variants.enqueue(stored.content_hash, stored.extension,
+                                        idempotency_key=stored.content_hash)
+
+@uploads_bp.route('/images', methods=['POST'])
+@requires(permission='uploads.image')
+def upload_image():
+    """Upload an image (news photos, gallery images...)."""
+    stream = get_upload_stream()
+    if stream is None:
+        return jsonify({'error': 'No image provided'}), 400
+    
+    try:
+        stored = media_store.save_image(stream)
+    except UploadError as e:
+        return jsonify({'error': e.message}), e.status_code
+    schedule_variants(stored)
+    
+    return jsonify({
+        'message': 'Image uploaded successfully',
+        'image': media_store.describe(stored)
+    }), 201
+
+@uploads_bp.route('/images/<string:content_hash>', methods=['GET'])
+@requires()
+def get_image(content_hash):
+    """Get stored image information and variant status."""
+    if len(content_hash) != 64 or not all(c in '0123456789abcdef' for c in content_hash):
+        return jsonify({'error': 'Image not found'}), 404
+    
+    for extension in media_store.FORMATS.values():
+        relative_path = original_path(content_hash, extension)
+        if os.path.exists(media_store.path_for(relative_path)):
+            url = media_store.url_for(relative_path)
+            return jsonify({
+                'hash': content_hash,
+                'url': url,
+                'variants_ready': media_store.variants_ready(content_hash),
+                'sources': media_store.image_sources(url)
+            }), 200
+    
+    return jsonify({'error': 'Image not found'}), 404
+
+@uploads_bp.route('/avatar', methods=['PUT'])
+@requires(permission='uploads.avatar')
+def upload_avatar():
+    """Upload and set the current user's avatar."""
+    current_user = User.query.get(current_claims().id)
+    if not current_user:
+        return jsonify({'error': 'Permission denied'}), 403
+    
+    stream = get_upload_stream()
+    if stream is None:
+        return jsonify({'error': 'No image provided'}), 400
+    
+    try:
+        stored = media_store.save_image(stream)
+    except UploadError as e:
+        return jsonify({'error': e.message}), e.status_code
+    schedule_variants(stored)
+    
+    try:
+        current_user.avatar = media_store.url_for(stored.relative_path)
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Avatar updated successfully',
+            'user': current_user.to_dict(include_sensitive=True)
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Avatar update failed', 'message': str(e)}), 500
@@ -0,0 +1,459 @@
+"""
+Precompiled JSON serializers for the API models.
+
+Each model gets a ``ModelSerializer`` describing its fields once. The field
+plan for every combination of flags (``include_sensitive``,
+``include_content``...) is compiled on first use into a tuple of getters, so
+serializing a page of rows is a single pass of attribute lookups. Dates,
+datetimes and Decimals are left to the JSON encoder (orjson when installed,
+the standard library otherwise) instead of being converted field by field.
+
+List endpoints also accept sparse fieldsets: ``?fields=id,title`` restricts
+the output keys and ``?include=related_match`` expands related objects. The
+plan knows which columns each key reads, so unrequested columns are not
+loaded from the database at all (see ``ModelSerializer.load_options``).
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from operator import attrgetter
+
+from flask import current_app
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import load_only, selectinload
+
+from app.models import User, Player, Match, PlayerStats, Training, TrainingAttendance, Finance, News
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _encode_default(value):
+    """Encode the types the JSON backends do not handle natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(payload):
+    """Encode a payload to JSON bytes using the fastest available backend."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=_encode_default, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """Build a JSON response without going through ``jsonify``."""
+    return current_app.response_class(dumps(payload), status=status, mimetype='application/json')
+
+
+# Field helpers
+
+def as_float(name):
+    """Getter returning a numeric column as float (falsy values become None)."""
+    getter = attrgetter(name)
+
+    def get(obj):
+        value = getter(obj)
+        return float(value) if value else None
+    return get
+
+
+def as_time(name, fmt='%H:%M'):
+    """Getter formatting a time column."""
+    getter = attrgetter(name)
+
+    def get(obj):
+        value = getter(obj)
+        return value.strftime(fmt) if value else None
+    return get
+
+
+def related(relationship, **fields):
+    """Getter returning a small dict of fields from a related object, or None.
+
+    ``fields`` maps output keys to attribute names on the related object.
+    """
+    getter = attrgetter(relationship)
+    field_getters = tuple((key, attrgetter(attr)) for key, attr in fields.items())
+
+    def get(obj):
+        target = getter(obj)
+        if target is None:
+            return None
+        return {key: get_field(target) for key, get_field in field_getters}
+    return get
+
+
+def _compile(entries):
+    # Later entries override earlier ones with the same key (e.g. sensitive variants)
+    compiled = {}
+    for entry in entries:
+        if isinstance(entry, str):
+            compiled[entry] = attrgetter(entry)
+        else:
+            key, getter = entry
+            compiled[key] = attrgetter(getter) if isinstance(getter, str) else getter
+    return tuple(compiled.items())
+
+
+def _split_param(value):
+    return [item.strip() for item in value.split(',') if item.strip()] if value else []
+
+
+def _add_path(tree, mapper, names):
+    """Record a ``requires`` path in a tree of ``{relationship: node}``."""
+    node = tree.setdefault(names[0], {'columns': set(), 'children': {}, 'whole': False})
+    target = mapper.relationships[names[0]].mapper
+    if len(names) == 1:
+        node['whole'] = True
+    elif names[1] in target.relationships:
+        _add_path(node['children'], target, names[1:])
+    elif names[1] in target.column_attrs:
+        node['columns'].add(names[1])
+    else:
+        node['whole'] = True
+
+
+def _relationship_loaders(mapper, tree):
+    """``selectinload`` options for a tree of relationships of ``mapper``.
+
+    Returns the options and the columns of ``mapper`` they need loaded (the
+    foreign keys of many-to-one relationships).
+    """
+    options, foreign_keys = [], set()
+    for name, node in sorted(tree.items()):
+        relationship = mapper.relationships[name]
+        if relationship.lazy == 'dynamic':
+            continue
+        foreign_keys.update(column.key for column in relationship.local_columns
+                            if column.key in mapper.column_attrs)
+
+        target = relationship.mapper
+        suboptions, columns = _relationship_loaders(target, node['children'])
+        if not node['whole']:
+            columns.update(node['columns'])
+            columns.update(target.get_property_by_column(column).key for column in target.primary_key)
+            suboptions.append(load_only(*(getattr(target.class_, column) for column in sorted(columns))))
+        loader = selectinload(getattr(mapper.class_, name))
+        options.append(loader.options(*suboptions) if suboptions else loader)
+    return options, foreign_keys
+
+
+class FieldPlan:
+    """A compiled list of output keys and their getters."""
+
+    __slots__ = ('fields', 'optional', 'keys')
+
+    def __init__(self, fields, optional=()):
+        self.fields = fields
+        self.optional = optional
+        self.keys = frozenset(key for key, _ in fields) | frozenset(key for key, _ in optional)
+
+    def dump(self, obj):
+        data = {key: get(obj) for key, get in self.fields}
+        for key, get in self.optional:
+            value = get(obj)
+            if value is not None:
+                data[key] = value
+        return data
+
+    def dump_many(self, objs):
+        fields = self.fields
+        if not self.optional:
+            return [{key: get(obj) for key, get in fields} for obj in objs]
+        return [self.dump(obj) for obj in objs]
+
+
+class ModelSerializer:
+    """Declarative serializer with precompiled per-variant field plans.
+
+    ``fields`` are always emitted. ``variants`` maps a flag name to the
+    extra fields emitted when that flag is set. ``includes`` are related
+    objects that can be expanded with ``?include=``; they are only emitted
+    when their value is not None, and ``default_includes`` are expanded when
+    the client does not ask for anything specific.
+
+    ``requires`` maps computed keys to the attributes they read: columns,
+    relationships, or dotted paths through relationships that end with the
+    column read on the related model (``'author.first_name'``). Keys that
+    are columns of ``model`` require themselves. This is what lets a sparse
+    fieldset load only the columns it needs, related rows included; a path
+    ending on a relationship loads the whole related row.
+    """
+
+    # Upper bound on cached sparse plans (fieldsets come from query strings)
+    max_cached_plans = 256
+
+    def __init__(self, model, fields, variants=None, includes=None, default_includes=(), requires=None):
+        self.model = model
+        self._fields = tuple(fields)
+        self._variants = dict(variants or {})
+        self._includes = dict(includes or {})
+        self._default_includes = tuple(default_includes)
+        self._requires = dict(requires or {})
+        self._plans = {}
+
+    def plan(self, fields=None, include=None, **flags):
+        """Return the compiled plan for a combination of flags and selections.
+
+        ``fields`` restricts the output to the given keys and ``include``
+        lists the relations to expand (None means the default includes).
+        Raises ValueError for unknown fields or includes.
+        """
+        flag_key = frozenset(name for name, enabled in flags.items() if enabled)
+        fields_key = tuple(fields) if fields else None
+        include_key = tuple(include) if include is not None else self._default_includes
+        key = (flag_key, fields_key, include_key)
+
+        plan = self._plans.get(key)
+        if plan is None:
+            unknown = flag_key - set(self._variants)
+            if unknown:
+                raise ValueError(f"Unknown serializer flag(s): {', '.join(sorted(unknown))}")
+
+            entries = list(self._fields)
+            for name in self._variants:
+                if name in flag_key:
+                    entries.extend(self._variants[name])
+            compiled = _compile(entries)
+
+            if fields_key:
+                available = dict(compiled)
+                unknown = [name for name in fields_key if name not in available]
+                if unknown:
+                    raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+                compiled = tuple((name, available[name]) for name in dict.fromkeys(fields_key))
+
+            unknown = [name for name in include_key if name not in self._includes]
+            if unknown:
+                raise ValueError(f"Unknown include(s): {', '.join(unknown)}")
+            optional = _compile((name, self._includes[name]) for name in dict.fromkeys(include_key))
+
+            plan = FieldPlan(compiled, optional)
+            if len(self._plans) < self.max_cached_plans:
+                self._plans[key] = plan
+        return plan
+
+    def plan_from_args(self, args, **flags):
+        """Build a plan from ``?fields=`` and ``?include=`` query parameters."""
+        fields = _split_param(args.get('fields'))
+        include = _split_param(args.get('include')) if 'include' in args else None
+        return self.plan(fields=fields or None, include=include, **flags)
+
+    def load_options(self, plan):
+        """Loader options that fetch only what ``plan`` reads.
+
+        Columns outside the plan are left unloaded (so unrequested ``Text``
+        columns never leave the database) and the relationships it reads are
+        loaded with one extra SELECT each instead of one per row.
+        """
+        mapper = sa_inspect(self.model)
+        columns = {'id'}
+        relationships = {}
+
+        for key in plan.keys:
+            for path in self._requires.get(key, (key,)):
+                name = path.split('.', 1)[0]
+                if name in mapper.column_attrs:
+                    columns.add(name)
+                elif name in mapper.relationships:
+                    _add_path(relationships, mapper, path.split('.'))
+
+        options, foreign_keys = _relationship_loaders(mapper, relationships)
+        columns.update(foreign_keys)
+        options.append(load_only(*(getattr(self.model, name) for name in sorted(columns))))
+        return options
+
+    def dump(self, obj, **flags):
+        return self.plan(**flags).dump(obj)
+
+    def dump_many(self, objs, **flags):
+        return self.plan(**flags).dump_many(objs)
+
+
+# Model serializers
+
+user_serializer = ModelSerializer(
+    User,
+    fields=[
+        'id', 'username',
+        ('email', lambda user: None),
+        'first_name', 'last_name', 'full_name', 'role', 'is_active', 'avatar', 'avatar_sources',
+        ('phone', lambda user: None),
+        'created_at', 'last_login',
+    ],
+    variants={
+        'include_sensitive': ['email', 'phone'],
+    },
+    requires={
+        'email': ('email',),
+        'phone': ('phone',),
+        'full_name': ('first_name', 'last_name'),
+        'avatar_sources': ('avatar',),
+    },
+)
+
+player_serializer = ModelSerializer(
+    Player,
+    fields=[
+        'id', 'user_id', 'full_name', 'jersey_number', 'position', 'age', 'birth_date',
+        'nationality', ('height', as_float('height')), ('weight', as_float('weight')),
+        'preferred_foot', 'status', 'rating', 'joined_date', 'contract_active', 'is_available',
+    ],
+    variants={
+        'include_sensitive': [
+            ('salary', as_float('salary')), ('market_value', as_float('market_value')),
+            'contract_start', 'contract_end', 'blood_type', 'medical_notes',
+            'emergency_contact_name', 'emergency_contact_phone', 'address',
+        ],
+    },
+    includes={
+        'user': related('user_account', id='id', username='username', avatar='avatar',
+                        avatar_sources='avatar_sources'),
+    },
+    requires={
+        'full_name': ('user_account.first_name', 'user_account.last_name'),
+        'age': ('birth_date',),
+        'contract_active': ('contract_start', 'contract_end'),
+        'is_available': ('status',),
+        'user': ('user_account.username', 'user_account.avatar'),
+    },
+)
+
+match_serializer = ModelSerializer(
+    Match,
+    fields=[
+        'id', 'opponent', 'date', 'location', 'is_home', 'home_away', 'competition',
+        'goals_for', 'goals_against', 'score', 'result', 'is_finished', 'is_upcoming',
+        'attendance', 'referee', 'weather', 'temperature', 'match_report', 'created_at',
+    ],
+    requires={
+        'home_away': ('is_home',),
+        'score': ('goals_for', 'goals_against'),
+        'is_finished': ('result',),
+        'is_upcoming': ('date', 'result'),
+    },
+)
+
+player_stats_serializer = ModelSerializer(
+    PlayerStats,
+    fields=[
+        'id', 'player_id', ('player_name', lambda stat: stat.player.full_name if stat.player else None),
+        'match_id', 'minutes_played', 'started', 'substituted_in', 'substituted_out',
+        'goals', 'assists', 'yellow_cards', 'red_cards', 'shots', 'shots_on_target',
+        'shot_accuracy', 'passes_completed', 'passes_attempted', 'pass_accuracy',
+        'tackles', 'interceptions', 'fouls_committed', 'fouls_suffered',
+        'performance_rating', 'notes',
+    ],
+    requires={
+        'player_name': ('player.user_account.first_name', 'player.user_account.last_name'),
+        'shot_accuracy': ('shots', 'shots_on_target'),
+        'pass_accuracy': ('passes_completed', 'passes_attempted'),
+    },
+)
+
+training_serializer = ModelSerializer(
+    Training,
+    fields=[
+        'id', 'title', 'date', ('start_time', as_time('start_time')), ('end_time', as_time('end_time')),
+        'duration_minutes', 'location', 'type', 'intensity', 'objectives', 'description',
+        'equipment_needed', 'weather', 'temperature', 'field_condition', 'completed', 'notes',
+        'coach_feedback', 'is_upcoming', 'is_today', 'attendance_count', 'total_invited',
+        'attendance_rate', 'created_at',
+    ],
+    requires={
+        'duration_minutes': ('start_time', 'end_time'),
+        'is_upcoming': ('date', 'start_time'),
+        'is_today': ('date',),
+        'attendance_count': (),
+        'total_invited': (),
+        'attendance_rate': (),
+    },
+)
+
+attendance_serializer = ModelSerializer(
+    TrainingAttendance,
+    fields=[
+        'id', 'training_id', 'player_id',
+        ('player_name', lambda att: att.player.full_name if att.player else None),
+        'attended', 'status', 'excuse', 'late_arrival', 'early_departure', 'effort_level',
+        'performance_rating', 'notes', 'created_at',
+    ],
+    requires={
+        'player_name': ('player.user_account.first_name', 'player.user_account.last_name'),
+        'status': ('attended', 'late_arrival', 'early_departure', 'excuse'),
+    },
+)
+
+finance_serializer = ModelSerializer(
+    Finance,
+    fields=[
+        'id', 'type', 'category', 'amount', 'signed_amount', 'currency', 'title', 'description',
+        'transaction_date', 'due_date', 'status', 'is_pending', 'is_approved',
+        'is_overdue', 'approval_date', 'is_recurring',
+        'recurring_frequency', 'next_occurrence', 'notes', 'created_at',
+    ],
+    variants={
+        'include_sensitive': [
+            'reference_number', 'payment_method', 'bank_account', 'receipt_number',
+            'created_by', 'approved_by',
+            ('creator_name', lambda finance: finance.creator.full_name if finance.creator else None),
+            ('approver_name', lambda finance: finance.approver.full_name if finance.approver else None),
+            ('player_name', lambda finance: finance.related_player.full_name if finance.related_player else None),
+            ('match_info', lambda finance: f"vs {finance.related_match.opponent}" if finance.related_match else None),
+        ],
+    },
+    includes={
+        'related_player': related('related_player', id='id', name='full_name', position='position'),
+        'related_match': related('related_match', id='id', opponent='opponent', date='date'),
+    },
+    requires={
+        'signed_amount': ('amount', 'type'),
+        'is_pending': ('status',),
+        'is_approved': ('status',),
+        'is_overdue': ('due_date', 'status'),
+        'creator_name': ('creator.first_name', 'creator.last_name'),
+        'approver_name': ('approver.first_name', 'approver.last_name'),
+        'player_name': ('related_player.user_account.first_name', 'related_player.user_account.last_name'),
+        'match_info': ('related_match.opponent',),
+        'related_player': ('related_player.position', 'related_player.user_account.first_name',
+                           'related_player.user_account.last_name'),
+        'related_match': ('related_match.opponent', 'related_match.date'),
+    },
+)
+
+news_serializer = ModelSerializer(
+    News,
+    fields=[
+        'id', 'title', 'slug', 'excerpt', 'category',
+        ('author_name', lambda article: article.author.full_name if article.author else None),
+        'published', 'is_published', 'published_at', 'featured_image', 'featured_image_sources', 'video_url',
+        'views_count', 'likes_count', 'word_count', 'reading_time', 'is_featured', 'is_breaking',
+        'priority', ('tags', 'tag_list'), 'created_at', 'updated_at',
+    ],
+    variants={
+        'include_content': ['content'],
+    },
+    includes={
+        'related_match': related('related_match', id='id', opponent='opponent', date='date'),
+        'related_player': related('related_player', id='id', name='full_name', position='position'),
+    },
+    default_includes=('related_match', 'related_player'),
+    requires={
+        'author_name': ('author.first_name', 'author.last_name'),
+        'is_published': ('published', 'published_at'),
+        'featured_image_sources': ('featured_image',),
+        'related_match': ('related_match.opponent', 'related_match.date'),
+        'related_player': ('related_player.position', 'related_player.user_account.first_name',
+                           'related_player.user_account.last_name'),
+    },
+)
@@ -0,0 +1,87 @@
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_database_url(url):
+    """Swap the sync driver of a database URL for its asyncio counterpart."""
+    scheme, separator, rest = url.partition('://')
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+
+class AsyncDatabase:
+    """Async engine used by the ASGI read path.
+
+    The pool is sized with ``ASYNC_DB_POOL_SIZE``/``ASYNC_DB_MAX_OVERFLOW``
+    rather than by the number of server workers: one event loop serves many
+    concurrent requests and only holds a connection while a query runs.
+
+    Handlers run their ORM code through :meth:`run`, which executes a plain
+    function against a regular ``Session`` bridged onto the async connection.
+    Model helpers, relationship loads and serializers therefore work
+    unchanged, while the driver I/O itself is non-blocking (asyncpg).
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.url = None
+        self.pool_size = 20
+        self.max_overflow = 10
+        self.pool_timeout = 10
+        self.echo = False
+        self.pgbouncer = False
+        self._engine = None
+        self._sessionmaker = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.url = async_database_url(app.config.get('ASYNC_DATABASE_URL') or app.config['SQLALCHEMY_DATABASE_URI'])
+        self.pool_size = int(app.config.get('ASYNC_DB_POOL_SIZE', 20))
+        self.max_overflow = int(app.config.get('ASYNC_DB_MAX_OVERFLOW', 10))
+        self.pool_timeout = float(app.config.get('ASYNC_DB_POOL_TIMEOUT', 10))
+        self.echo = bool(app.config.get('SQLALCHEMY_ECHO', False))
+        self.pgbouncer = bool(app.config.get('DB_PGBOUNCER', False))
+        app.extensions['async_db'] = self
+
+    @property
+    def engine(self):
+        """The engine, created lazily inside the running event loop."""
+        if self._engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            options = {'echo': self.echo, 'pool_pre_ping': True}
+            if self.pgbouncer and not self.url.startswith('sqlite'):
+                # Transaction pooling: PgBouncer owns the pool and asyncpg
+                # must not cache prepared statements across transactions
+                from sqlalchemy.pool import NullPool
+                options.update(poolclass=NullPool, connect_args={
+                    'statement_cache_size': 0, 'prepared_statement_cache_size': 0})
+            elif not self.url.startswith('sqlite'):
+                options.update(pool_size=self.pool_size, max_overflow=self.max_overflow,
+                               pool_timeout=self.pool_timeout)
+            self._engine = create_async_engine(self.url, **options)
+        return self._engine
+
+    @property
+    def sessionmaker(self):
+        if self._sessionmaker is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker
+            self._sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+        return self._sessionmaker
+
+    async def run(self, func, *args, **kwargs):
+        """Run ``func(session, *args, **kwargs)`` with a session on the async engine."""
+        async with self.sessionmaker() as session:
+            return await session.run_sync(func, *args, **kwargs)
+
+    async def dispose(self):
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._sessionmaker = None
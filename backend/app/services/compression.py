@@ -0,0 +1,302 @@
+import threading
+import time
+import zlib
+from functools import wraps
+
+from flask import current_app, request
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+WRITE_METHODS = frozenset(('POST', 'PUT', 'PATCH', 'DELETE'))
+DEFAULT_MIMETYPES = ('application/json', 'text/csv', 'text/plain', 'text/html', 'text/css',
+                     'application/javascript')
+
+
+class CompressionMetrics:
+    """Per-process counters for compressed responses."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.responses = {}
+            self.bytes_in = 0
+            self.bytes_out = 0
+            self.precompressed = 0
+            self.skipped_small = 0
+
+    def record(self, encoding, size, compressed_size, precompressed=False):
+        with self._lock:
+            self.responses[encoding] = self.responses.get(encoding, 0) + 1
+            self.bytes_in += size
+            self.bytes_out += compressed_size
+            self.precompressed += precompressed
+
+    def record_skipped(self):
+        with self._lock:
+            self.skipped_small += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'responses': dict(self.responses),
+                'precompressed_hits': self.precompressed,
+                'skipped_small': self.skipped_small,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'bytes_saved': self.bytes_in - self.bytes_out,
+                'ratio': round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None
+            }
+
+
+compression_metrics = CompressionMetrics()
+
+
+def available_encodings():
+    """Encodings this process can produce, in order of preference."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding, encodings):
+    """Best of ``encodings`` for an ``Accept-Encoding`` header, or None."""
+    if not accept_encoding:
+        return None
+    return parse_accept_header(accept_encoding).best_match(encodings)
+
+
+def compress(body, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    return compressor.compress(body) + compressor.flush()
+
+
+class ResponseCache:
+    """Small in-process TTL cache of response bodies, keyed per blueprint."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key, value, ttl):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: e for k, e in self._entries.items() if e[0] >= now}
+                while len(self._entries) >= self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[key] = (now + ttl, value)
+
+    def invalidate(self, namespace):
+        with self._lock:
+            self._entries = {k: e for k, e in self._entries.items() if k[0] != namespace}
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+
+class CachedBody:
+    """A response body stored with its compressed variants."""
+
+    __slots__ = ('body', 'mimetype', 'variants')
+
+    def __init__(self, body, mimetype, variants):
+        self.body = body
+        self.mimetype = mimetype
+        self.variants = variants
+
+
+class ResponseCompressor:
+    """Compress responses according to the client's ``Accept-Encoding``.
+
+    Brotli is preferred when the ``brotli`` package is installed, gzip
+    otherwise. Bodies smaller than ``COMPRESS_MIN_SIZE`` bytes go out as-is
+    (headers and CPU would cost more than they save), and only the
+    ``COMPRESS_MIMETYPES`` are touched, so images, media files and the
+    live-event streams are never compressed. Streamed responses (the CSV
+    exports) are compressed chunk by chunk as they are generated.
+
+    Views decorated with ``cached()`` keep their body for
+    ``COMPRESS_CACHE_TTL`` seconds together with its compressed variants,
+    built once at the highest levels, so cache hits never compress again.
+    A successful write to a blueprint drops that blueprint's cached bodies
+    in this process; other workers catch up when the TTL expires.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.min_size = 500
+        self.level = 6
+        self.brotli_quality = 4
+        self.mimetypes = frozenset(DEFAULT_MIMETYPES)
+        self.encodings = available_encodings()
+        self.cache_ttl = 30
+        self.cache = ResponseCache()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = bool(app.config.get('COMPRESS_ENABLED', True))
+        self.min_size = int(app.config.get('COMPRESS_MIN_SIZE', 500))
+        self.level = int(app.config.get('COMPRESS_LEVEL', 6))
+        self.brotli_quality = int(app.config.get('COMPRESS_BROTLI_QUALITY', 4))
+        self.mimetypes = frozenset(app.config.get('COMPRESS_MIMETYPES') or DEFAULT_MIMETYPES)
+        self.cache_ttl = int(app.config.get('COMPRESS_CACHE_TTL', 30))
+        self.cache = ResponseCache(int(app.config.get('COMPRESS_CACHE_MAX_ENTRIES', 256)))
+        app.extensions['compressor'] = self
+
+        if self.enabled or self.cache_ttl:
+            app.after_request(self.after_request)
+
+    def level_for(self, encoding, precompress=False):
+        if encoding == 'br':
+            return 11 if precompress else self.brotli_quality
+        return 9 if precompress else self.level
+
+    # Bodies
+
+    def compress_body(self, body, mimetype, accept_encoding):
+        """Compress a complete body; returns ``(body, encoding or None)``."""
+        if not self.enabled or mimetype not in self.mimetypes:
+            return body, None
+        if len(body) < self.min_size:
+            compression_metrics.record_skipped()
+            return body, None
+        encoding = negotiate(accept_encoding, self.encodings)
+        if encoding is None:
+            return body, None
+        compressed = compress(body, encoding, self.level_for(encoding))
+        compression_metrics.record(encoding, len(body), len(compressed))
+        return compressed, encoding
+
+    def precompress(self, body):
+        """Compressed variants of a body worth caching, by encoding."""
+        if not self.enabled or len(body) < self.min_size:
+            return {}
+        variants = {}
+        for encoding in self.encodings:
+            compressed = compress(body, encoding, self.level_for(encoding, precompress=True))
+            if len(compressed) < len(body):
+                variants[encoding] = compressed
+        return variants
+
+    def compress_stream(self, chunks, encoding):
+        """Compress an iterable of chunks, flushing after each one."""
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            process, flush, finish = compressor.process, compressor.flush, compressor.finish
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+            process, finish = compressor.compress, compressor.flush
+            flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)  # noqa: E731
+
+        size = compressed_size = 0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                if not chunk:
+                    continue
+                data = process(chunk) + flush()
+                size += len(chunk)
+                compressed_size += len(data)
+                yield data
+            data = finish()
+            compressed_size += len(data)
+            yield data
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+            compression_metrics.record(encoding, size, compressed_size)
+
+    # Responses
+
+    def after_request(self, response):
+        if request.method in WRITE_METHODS and response.status_code < 400 and request.blueprint:
+            self.cache.invalidate(request.blueprint)
+
+        if (not self.enabled or response.mimetype not in self.mimetypes
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        accept_encoding = request.headers.get('Accept-Encoding')
+
+        variants = getattr(response, 'precompressed', None)
+        if variants is not None:
+            encoding = negotiate(accept_encoding, tuple(variants))
+            if encoding is not None:
+                body = response.get_data()
+                response.set_data(variants[encoding])
+                compression_metrics.record(encoding, len(body), len(variants[encoding]), precompressed=True)
+                self._mark_encoded(response, encoding)
+            return response
+
+        if response.is_streamed:
+            encoding = negotiate(accept_encoding, self.encodings)
+            if encoding is not None:
+                response.response = self.compress_stream(response.response, encoding)
+                response.headers.pop('Content-Length', None)
+                self._mark_encoded(response, encoding)
+            return response
+
+        body, encoding = self.compress_body(response.get_data(), response.mimetype, accept_encoding)
+        if encoding is not None:
+            response.set_data(body)
+            self._mark_encoded(response, encoding)
+        return response
+
+    def _mark_encoded(self, response, encoding):
+        response.headers['Content-Encoding'] = encoding
+        # The bytes differ from the uncompressed representation
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+    # Cache
+
+    def cached(self, ttl=None, unless=None):
+        """Cache a public GET view's 200 responses, precompressed.
+
+        Requests for which ``unless()`` is true (responses depending on the
+        caller) bypass the cache.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                lifetime = self.cache_ttl if ttl is None else ttl
+                if not lifetime or (unless is not None and unless()):
+                    return view(*args, **kwargs)
+
+                key = (request.blueprint, request.full_path)
+                entry = self.cache.get(key)
+                if entry is None:
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    body = response.get_data()
+                    entry = CachedBody(body, response.mimetype, self.precompress(body))
+                    self.cache.set(key, entry, lifetime)
+
+                response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+                response.precompressed = entry.variants
+                return response
+            return wrapper
+        return decorator
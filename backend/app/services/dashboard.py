@@ -0,0 +1,140 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from flask import current_app, request
+
+from app.services.compression import WRITE_METHODS, ResponseCache
+from app.services.permissions import can
+
+
+class Section:
+    """A dashboard section: ``loader()`` returns its JSON-ready payload."""
+
+    __slots__ = ('name', 'loader', 'blueprint', 'permission', 'ttl')
+
+    def __init__(self, name, loader, blueprint, permission, ttl):
+        self.name = name
+        self.loader = loader
+        self.blueprint = blueprint
+        self.permission = permission
+        self.ttl = ttl
+
+
+class Dashboard:
+    """Assemble a composite response from independent, cached sections.
+
+    Sections are registered with ``@dashboard.section(...)``. For a request,
+    the sections the caller may see are read from their cache or loaded on a
+    shared pool of ``DASHBOARD_WORKERS`` threads, each in its own application
+    context and so with its own database session (``DASHBOARD_WORKERS = 0``
+    loads them one after the other in the request). Every section has its own
+    TTL (``DASHBOARD_SECTION_TTLS`` overrides the registered ones) and a
+    successful write to its blueprint invalidates it. A section that fails or
+    is not ready after ``DASHBOARD_TIMEOUT`` seconds is returned as ``None``
+    with its status; the other sections are served anyway.
+    """
+
+    def __init__(self, app=None):
+        self.sections = {}
+        self.workers = 4
+        self.timeout = 5.0
+        self.ttls = {}
+        self.cache = ResponseCache()
+        self._executor = None
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.workers = int(app.config.get('DASHBOARD_WORKERS', 4))
+        self.timeout = float(app.config.get('DASHBOARD_TIMEOUT', 5))
+        self.ttls = dict(app.config.get('DASHBOARD_SECTION_TTLS') or {})
+        self.cache = ResponseCache()
+        app.extensions['dashboard'] = self
+        app.after_request(self.after_request)
+
+    def section(self, name, blueprint, permission=None, ttl=60):
+        """Register a section loader; ``permission`` restricts who sees it."""
+        def decorator(loader):
+            self.sections[name] = Section(name, loader, blueprint, permission, ttl)
+            return loader
+        return decorator
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix='dashboard')
+        return self._executor
+
+    def visible(self, principal, names=None):
+        """Sections ``principal`` may see, in registration order (or ``names``)."""
+        sections = [self.sections[name] for name in names] if names else list(self.sections.values())
+        return [section for section in sections
+                if section.permission is None or can(principal, section.permission)]
+
+    def build(self, principal, names=None):
+        """Load the visible sections; returns ``(payloads, statuses)``.
+
+        ``statuses`` maps each section to ``{'status': 'cached' | 'loaded' |
+        'error' | 'timeout', 'ms': elapsed}``.
+        """
+        app = current_app._get_current_object()
+        payloads, statuses, pending = {}, {}, {}
+
+        for section in self.visible(principal, names):
+            start = time.perf_counter()
+            cached = self.cache.get((section.blueprint, section.name))
+            if cached is not None:
+                payloads[section.name] = cached
+                statuses[section.name] = {'status': 'cached', 'ms': elapsed_ms(start)}
+            elif self.workers:
+                pending[self.executor.submit(self._load, app, section)] = section
+            else:
+                self._collect(section, self._load(app, section), payloads, statuses)
+
+        done, _ = wait(pending, timeout=self.timeout)
+        for future, section in pending.items():
+            if future in done:
+                self._collect(section, future.result(), payloads, statuses)
+            else:
+                # Still running: it fills the cache for the next request when done
+                payloads[section.name] = None
+                statuses[section.name] = {'status': 'timeout', 'ms': round(self.timeout * 1000, 1)}
+        return payloads, statuses
+
+    def _load(self, app, section):
+        """Run a loader in its own app context (and database session)."""
+        start = time.perf_counter()
+        with app.app_context():
+            try:
+                payload = section.loader()
+            except Exception:
+                app.logger.exception('Dashboard section %s failed', section.name)
+                return None, elapsed_ms(start)
+        self.cache.set((section.blueprint, section.name), payload, self.ttls.get(section.name, section.ttl))
+        return payload, elapsed_ms(start)
+
+    @staticmethod
+    def _collect(section, result, payloads, statuses):
+        payload, ms = result
+        payloads[section.name] = payload
+        statuses[section.name] = {'status': 'loaded' if payload is not None else 'error', 'ms': ms}
+
+    # Invalidation
+
+    def after_request(self, response):
+        if request.method in WRITE_METHODS and response.status_code < 400 and request.blueprint:
+            self.cache.invalidate(request.blueprint)
+        return response
+
+    def clear(self):
+        self.cache.clear()
+
+
+def elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
@@ -0,0 +1,142 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+class PoolMetrics:
+    """Per-process counters for connection checkouts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_checkout(self, wait):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'connections_opened': self.connects,
+                'wait_avg_ms': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3)
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedPoolMixin:
+    """Time how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedNullPool(InstrumentedPoolMixin, NullPool):
+    pass
+
+
+def engine_options(config):
+    """Build ``SQLALCHEMY_ENGINE_OPTIONS`` from the ``DB_*`` settings.
+
+    Regular mode keeps a bounded pool per process (``DB_POOL_SIZE`` +
+    ``DB_MAX_OVERFLOW`` connections at most, so ``workers x that`` must stay
+    under Postgres ``max_connections``), recycles old connections and checks
+    them before use.
+
+    ``DB_PGBOUNCER`` mode targets PgBouncer in transaction pooling: PgBouncer
+    does the pooling, so the app uses ``NullPool``; server-side prepared
+    statements are disabled and the statement timeout is applied per
+    transaction (``SET LOCAL``) since session state does not survive between
+    transactions.
+    """
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+
+    if url.get_backend_name() == 'sqlite':
+        # Flask-SQLAlchemy picks the SQLite pool itself
+        return options
+
+    options['pool_pre_ping'] = bool(config.get('DB_POOL_PRE_PING', True))
+    connect_args = dict(options.get('connect_args') or {})
+    statement_timeout = int(config.get('DB_STATEMENT_TIMEOUT') or 0)
+
+    if config.get('DB_PGBOUNCER'):
+        options['poolclass'] = InstrumentedNullPool
+        driver = url.get_driver_name()
+        if driver == 'psycopg':
+            connect_args['prepare_threshold'] = None
+        elif driver == 'asyncpg':
+            connect_args['statement_cache_size'] = 0
+            connect_args['prepared_statement_cache_size'] = 0
+    else:
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=int(config.get('DB_POOL_SIZE', 5)),
+            max_overflow=int(config.get('DB_MAX_OVERFLOW', 10)),
+            pool_timeout=float(config.get('DB_POOL_TIMEOUT', 30)),
+            pool_recycle=int(config.get('DB_POOL_RECYCLE', 1800))
+        )
+        if statement_timeout and url.get_backend_name() == 'postgresql':
+            connect_args['options'] = f'-c statement_timeout={statement_timeout}'
+
+    if connect_args:
+        options['connect_args'] = connect_args
+    return options
+
+
+def instrument_engine(engine, config):
+    """Attach metrics and per-transaction settings to an engine."""
+    event.listen(engine.pool, 'connect', lambda dbapi_connection, record: pool_metrics.record_connect())
+
+    statement_timeout = int(config.get('DB_STATEMENT_TIMEOUT') or 0)
+    if config.get('DB_PGBOUNCER') and statement_timeout and engine.dialect.name == 'postgresql':
+        @event.listens_for(engine, 'begin')
+        def set_statement_timeout(connection):
+            connection.exec_driver_sql(f'SET LOCAL statement_timeout = {statement_timeout}')
+
+
+def pool_status(engine):
+    """Current pool occupancy plus the process-wide checkout metrics."""
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(size=pool.size(), checked_out=pool.checkedout(),
+                      overflow=pool.overflow(), idle=pool.checkedin())
+    status.update(pool_metrics.to_dict())
+    return status
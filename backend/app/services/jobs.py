@@ -0,0 +1,276 @@
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """A unit of work: a registered task name plus its arguments."""
+
+    def __init__(self, name, args=None, kwargs=None, id=None, attempts=0,
+                 idempotency_key=None, run_at=None):
+        self.id = id or uuid.uuid4().hex
+        self.name = name
+        self.args = list(args or [])
+        self.kwargs = dict(kwargs or {})
+        self.attempts = attempts
+        self.idempotency_key = idempotency_key
+        self.run_at = run_at
+
+    def to_json(self):
+        return json.dumps({
+            'id': self.id,
+            'name': self.name,
+            'args': self.args,
+            'kwargs': self.kwargs,
+            'attempts': self.attempts,
+            'idempotency_key': self.idempotency_key,
+            'run_at': self.run_at
+        })
+
+    @classmethod
+    def from_json(cls, payload):
+        return cls(**json.loads(payload))
+
+
+class Task:
+    """A function registered with the job queue."""
+
+    def __init__(self, queue, func, name, max_retries, backoff):
+        self.queue = queue
+        self.func = func
+        self.name = name
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, idempotency_key=None, delay=None, eta=None, **kwargs):
+        """Queue a call to this task. See :meth:`JobQueue.enqueue`."""
+        return self.queue.enqueue(self.name, *args, idempotency_key=idempotency_key,
+                                  delay=delay, eta=eta, **kwargs)
+
+
+class JobQueue:
+    """Background job queue for slow side effects (mail, images, recomputations).
+
+    Request handlers commit their own changes, enqueue the follow-up work and
+    return; a worker runs the job later inside an application context.
+    Backends, selected with ``JOB_QUEUE_BACKEND``:
+
+    * ``redis``: jobs are pushed to a Redis list and run by ``worker.py``.
+      Delayed jobs and retries wait in a sorted set scored by run time.
+    * ``thread``: jobs run on an in-process thread pool (development).
+    * ``eager``: jobs run synchronously when enqueued (tests). Delays are
+      ignored and retries happen immediately; once they are exhausted the
+      error is re-raised to the caller (``JOB_EAGER_PROPAGATES``).
+
+    Failed jobs are retried with exponential backoff (``backoff * 2 ** n``
+    seconds); on Redis, jobs out of retries go to a dead-letter list. Jobs
+    enqueued with an idempotency key are accepted once per
+    ``JOB_IDEMPOTENCY_TTL`` seconds; duplicates are dropped. A job out of
+    retries releases its key, so the same work can be queued again.
+    """
+
+    BACKENDS = ('redis', 'thread', 'eager')
+
+    def __init__(self, app=None):
+        self.app = None
+        self.backend = 'thread'
+        self.max_retries = 3
+        self.backoff = 2.0
+        self.idempotency_ttl = 24 * 3600
+        self.workers = 4
+        self.eager_propagates = True
+        self.prefix = 'esc:jobs'
+        self.redis_url = None
+        self.tasks = {}
+        self._redis = None
+        self._executor = None
+        self._idempotency_keys = {}
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.backend = app.config.get('JOB_QUEUE_BACKEND', 'thread')
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f'Unknown job queue backend: {self.backend}')
+        self.max_retries = int(app.config.get('JOB_MAX_RETRIES', 3))
+        self.backoff = float(app.config.get('JOB_RETRY_BACKOFF', 2.0))
+        self.idempotency_ttl = int(app.config.get('JOB_IDEMPOTENCY_TTL', 24 * 3600))
+        self.workers = int(app.config.get('JOB_WORKERS', 4))
+        self.eager_propagates = bool(app.config.get('JOB_EAGER_PROPAGATES', True))
+        self.prefix = app.config.get('JOB_QUEUE_PREFIX', 'esc:jobs')
+        self.redis_url = app.config.get('REDIS_URL')
+        self._idempotency_keys = {}
+        app.extensions['job_queue'] = self
+
+    # Registration
+
+    def task(self, name=None, max_retries=None, backoff=None):
+        """Decorator registering a function as a task."""
+        def decorator(func):
+            task = Task(self, func, name or func.__name__, max_retries, backoff)
+            self.tasks[task.name] = task
+            return task
+        return decorator
+
+    # Enqueueing
+
+    def enqueue(self, name, *args, idempotency_key=None, delay=None, eta=None, **kwargs):
+        """Queue a task by name.
+
+        ``delay`` (seconds) or ``eta`` (a datetime) schedule the job for later.
+        Returns the job id, or None when the idempotency key was already used.
+        """
+        if name not in self.tasks:
+            raise KeyError(f'Unknown task: {name}')
+
+        run_at = None
+        if eta is not None:
+            run_at = eta.timestamp()
+        elif delay:
+            run_at = time.time() + delay
+
+        if idempotency_key and not self._claim(f'{name}:{idempotency_key}'):
+            return None
+
+        job = Job(name, args, kwargs, idempotency_key=idempotency_key, run_at=run_at)
+        self._dispatch(job)
+        return job.id
+
+    def _claim(self, key):
+        if self.backend == 'redis':
+            return bool(self.redis.set(f'{self.prefix}:idem:{key}', 1, nx=True, ex=self.idempotency_ttl))
+
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            expires = self._idempotency_keys.get(key)
+            if expires is not None and expires > now:
+                return False
+            self._idempotency_keys[key] = now + self.idempotency_ttl
+            return True
+
+    def _release(self, key):
+        if self.backend == 'redis':
+            self.redis.delete(f'{self.prefix}:idem:{key}')
+        else:
+            with self._lock:
+                self._idempotency_keys.pop(key, None)
+
+    def _prune(self, now):
+        # Drop expired keys now and then so memory stays bounded
+        if now < self._next_prune:
+            return
+        self._next_prune = now + 60
+        self._idempotency_keys = {key: expires for key, expires in self._idempotency_keys.items()
+                                  if expires > now}
+
+    def _dispatch(self, job):
+        if self.backend == 'eager':
+            self.run(job)
+            return
+
+        delay = max(0.0, job.run_at - time.time()) if job.run_at else 0.0
+
+        if self.backend == 'redis':
+            if delay:
+                self.redis.zadd(f'{self.prefix}:scheduled', {job.to_json(): job.run_at})
+            else:
+                self.redis.lpush(f'{self.prefix}:queue', job.to_json())
+        elif delay:
+            timer = threading.Timer(delay, self.executor.submit, args=(self.run, job))
+            timer.daemon = True
+            timer.start()
+        else:
+            self.executor.submit(self.run, job)
+
+    # Running
+
+    def run(self, job):
+        """Run a job in an application context, retrying on failure."""
+        task = self.tasks.get(job.name)
+        if task is None:
+            self.app.logger.error('Dropping job %s: unknown task %s', job.id, job.name)
+            return False
+
+        job.attempts += 1
+        try:
+            with self.app.app_context():
+                task.func(*job.args, **job.kwargs)
+            return True
+        except Exception as e:
+            max_retries = self.max_retries if task.max_retries is None else task.max_retries
+            if job.attempts > max_retries:
+                self.app.logger.error('Job %s (%s) failed after %d attempts: %s',
+                                      job.id, job.name, job.attempts, e)
+                if job.idempotency_key:
+                    self._release(f'{job.name}:{job.idempotency_key}')
+                if self.backend == 'redis':
+                    self.redis.lpush(f'{self.prefix}:dead', job.to_json())
+                elif self.backend == 'eager' and self.eager_propagates:
+                    raise
+                return False
+
+            backoff = self.backoff if task.backoff is None else task.backoff
+            delay = backoff * 2 ** (job.attempts - 1)
+            self.app.logger.warning('Job %s (%s) failed, retry %d in %.1fs: %s',
+                                    job.id, job.name, job.attempts, delay, e)
+            if self.backend == 'eager':
+                return self.run(job)
+            job.run_at = time.time() + delay
+            self._dispatch(job)
+            return False
+
+    def work(self, burst=False, poll_interval=1.0):
+        """Worker loop for the Redis backend.
+
+        Moves due scheduled jobs onto the queue, then blocks on the queue.
+        With ``burst`` the loop returns once no job is ready.
+        """
+        queue_key = f'{self.prefix}:queue'
+        while True:
+            self.promote_scheduled()
+            item = self.redis.brpop(queue_key, timeout=max(1, int(poll_interval)))
+            if item is None:
+                if burst:
+                    return
+                continue
+            self.run(Job.from_json(item[1]))
+
+    def promote_scheduled(self):
+        """Move scheduled jobs whose time has come onto the queue."""
+        scheduled_key = f'{self.prefix}:scheduled'
+        moved = 0
+        for payload in self.redis.zrangebyscore(scheduled_key, 0, time.time(), start=0, num=100):
+            # zrem succeeds for exactly one worker, so each job is promoted once
+            if self.redis.zrem(scheduled_key, payload):
+                self.redis.lpush(f'{self.prefix}:queue', payload)
+                moved += 1
+        return moved
+
+    # Backends
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url or 'redis://localhost:6379/0')
+        return self._redis
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix='jobs')
+        return self._executor
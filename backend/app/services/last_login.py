@@ -0,0 +1,115 @@
+import atexit
+import threading
+from datetime import datetime
+
+from sqlalchemy import case, update
+
+
+class LastLoginRecorder:
+    """Write-behind queue for user last-login timestamps.
+
+    Logins only record the timestamp in memory. Pending timestamps are
+    coalesced per user (the most recent one wins) and written out by a
+    background timer, one UPDATE statement per batch of users. A full batch
+    is written right away, and a failed flush re-arms the timer to retry.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.flush_interval = 5.0
+        self.batch_size = 500
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        self._exit_hook = False
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = float(app.config.get('LAST_LOGIN_FLUSH_INTERVAL', 5.0))
+        self.batch_size = int(app.config.get('LAST_LOGIN_BATCH_SIZE', 500))
+        app.extensions['last_login_recorder'] = self
+        # One exit hook per recorder, however many apps it is bound to
+        if not self._exit_hook:
+            atexit.register(self.flush)
+            self._exit_hook = True
+
+    @property
+    def pending_count(self):
+        """Number of users waiting to be written."""
+        return len(self._pending)
+
+    def record(self, user_id, when=None):
+        """Queue a last-login timestamp for a user."""
+        when = when or datetime.utcnow()
+
+        with self._lock:
+            current = self._pending.get(user_id)
+            if current is None or when > current:
+                self._pending[user_id] = when
+            full = len(self._pending) >= self.batch_size
+            self._arm_timer()
+
+        # A zero interval disables write-behind (useful for CLI and tests)
+        if self.flush_interval <= 0 or full:
+            self.flush()
+
+    def flush(self):
+        """Write all pending timestamps to the database."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not pending or self.app is None:
+            return 0
+
+        with self.app.app_context():
+            try:
+                self._write(pending)
+            except Exception:
+                # Put the timestamps back so the next flush retries them,
+                # without overwriting newer logins recorded meanwhile.
+                with self._lock:
+                    for user_id, when in pending.items():
+                        current = self._pending.get(user_id)
+                        if current is None or when > current:
+                            self._pending[user_id] = when
+                    self._arm_timer()
+                raise
+
+        return len(pending)
+
+    def _arm_timer(self):
+        """Schedule a flush if none is due (call with the lock held)."""
+        if self.flush_interval > 0 and self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            if self.app is not None:
+                self.app.logger.warning('Last login flush failed: %s', e)
+
+    def _write(self, pending):
+        from app import db
+        from app.models.user import User
+
+        items = sorted(pending.items())
+        # Use a dedicated connection so the flush never commits a request session
+        with db.engine.begin() as connection:
+            for start in range(0, len(items), self.batch_size):
+                batch = dict(items[start:start + self.batch_size])
+                connection.execute(
+                    update(User.__table__)
+                    .where(User.__table__.c.id.in_(list(batch)))
+                    .values(last_login=case(batch, value=User.__table__.c.id))
+                )
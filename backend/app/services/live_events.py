@@ -0,0 +1,250 @@
+import json
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+
+# Numbers, stores and publishes an event in one step, so concurrent
+# publishers cannot push or publish ids out of order.
+PUBLISH_SCRIPT = """
+local id = redis.call('INCR', KEYS[1])
+local payload = '{"id": ' .. id .. ', "type": ' .. ARGV[1] .. ', "data": ' .. ARGV[2] .. '}'
+redis.call('RPUSH', KEYS[2], payload)
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[3]), -1)
+redis.call('PUBLISH', KEYS[3], payload)
+return id
+"""
+
+
+class LiveEvent:
+    """An event on a channel, numbered so clients can resume after it."""
+
+    def __init__(self, id, type, data):
+        self.id = id
+        self.type = type
+        self.data = data
+
+    def to_json(self):
+        return json.dumps({'id': self.id, 'type': self.type, 'data': self.data})
+
+    @classmethod
+    def from_json(cls, payload):
+        return cls(**json.loads(payload))
+
+    def to_sse(self):
+        return f'id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n'
+
+
+class Subscription:
+    """One client's view of a channel: a bounded queue fed by the broker.
+
+    ``start_id`` is the channel's last event id when the subscription was
+    registered: state read after subscribing includes at least that event.
+    """
+
+    def __init__(self, broker, channel, max_queue):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.overflowed = False
+        self.start_id = 0
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # A client this far behind reconnects and resumes from history
+            self.overflowed = True
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LiveEventBroker:
+    """Publish/subscribe hub for live match events.
+
+    Each event gets an increasing id per channel and the last
+    ``LIVE_EVENTS_HISTORY`` events are kept, so a client reconnecting with
+    ``Last-Event-ID`` only receives what it missed.
+
+    With ``LIVE_EVENTS_BACKEND=redis`` events are published on Redis pub/sub
+    and every process holds a single Redis subscription, fanning events out
+    to its local clients in memory. The ``memory`` backend keeps everything
+    in-process (development, single process). Subscriptions only use
+    ``queue``/``threading`` primitives, so they cooperate with gevent workers
+    where thousands of idle streams cost a greenlet each instead of a thread.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.backend = 'memory'
+        self.history_size = 200
+        self.max_queue = 100
+        self.prefix = 'esc:live'
+        self.redis_url = None
+        self._redis = None
+        self._publish_script = None
+        self._listener = None
+        self._subscribers = defaultdict(set)
+        self._history = defaultdict(lambda: deque(maxlen=self.history_size))
+        self._sequences = defaultdict(int)
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.backend = app.config.get('LIVE_EVENTS_BACKEND', 'memory')
+        self.history_size = int(app.config.get('LIVE_EVENTS_HISTORY', 200))
+        self.max_queue = int(app.config.get('LIVE_EVENTS_MAX_QUEUE', 100))
+        self.prefix = app.config.get('LIVE_EVENTS_PREFIX', 'esc:live')
+        self.redis_url = app.config.get('REDIS_URL')
+        self._history = defaultdict(lambda: deque(maxlen=self.history_size))
+        self._sequences = defaultdict(int)
+        app.extensions['live_events'] = self
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url or 'redis://localhost:6379/0')
+        return self._redis
+
+    def _publish_redis(self, key, type, data):
+        """Run PUBLISH_SCRIPT for channel ``key``; returns the event id."""
+        if self._publish_script is None:
+            self._publish_script = self.redis.register_script(PUBLISH_SCRIPT)
+        script = self._publish_script
+        return int(script(keys=[f'{key}:seq', f'{key}:history', key],
+                          args=[json.dumps(type), json.dumps(data), self.history_size]))
+
+    # Publishing
+
+    def publish(self, channel, type, data):
+        """Publish an event and return it (with its id)."""
+        if self.backend == 'redis':
+            key = f'{self.prefix}:{channel}'
+            return LiveEvent(self._publish_redis(key, type, data), type, data)
+
+        with self._lock:
+            self._sequences[channel] += 1
+            event = LiveEvent(self._sequences[channel], type, data)
+            self._history[channel].append(event)
+        self._fan_out(channel, event)
+        return event
+
+    def _fan_out(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+    # Subscribing
+
+    def subscribe(self, channel):
+        """Register a subscription; read the channel's state only after this."""
+        if self.backend == 'redis':
+            self._ensure_listener()
+        subscription = Subscription(self, channel, self.max_queue)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+            if self.backend != 'redis':
+                subscription.start_id = self._sequences[channel]
+        if self.backend == 'redis':
+            subscription.start_id = int(self.redis.get(f'{self.prefix}:{channel}:seq') or 0)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                return len(self._subscribers.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def history(self, channel, after_id=0):
+        """Events on a channel with an id greater than ``after_id``."""
+        if self.backend == 'redis':
+            payloads = self.redis.lrange(f'{self.prefix}:{channel}:history', 0, -1)
+            events = [LiveEvent.from_json(payload) for payload in payloads]
+        else:
+            with self._lock:
+                events = list(self._history.get(channel, ()))
+        return [event for event in events if event.id > after_id]
+
+    def _ensure_listener(self):
+        if self._listener is not None and self._listener.is_alive():
+            return
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='live-events', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        """Single Redis subscription per process, fanned out locally."""
+        pattern = f'{self.prefix}:*'
+        offset = len(self.prefix) + 1
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(pattern)
+                for message in pubsub.listen():
+                    channel = message['channel']
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    self._fan_out(channel[offset:], LiveEvent.from_json(message['data']))
+            except Exception as e:
+                if self.app is not None:
+                    self.app.logger.warning('Live events listener reconnecting: %s', e)
+                time.sleep(1)
+
+
+def event_stream(subscription, last_event_id=None, snapshot=None, heartbeat=15.0, retry_ms=3000):
+    """Generate a Server-Sent Events stream for a subscription.
+
+    A client resuming with ``last_event_id`` gets the events it missed; a new
+    client gets ``snapshot`` (the current state) as its first event, then
+    every event after ``subscription.start_id``. Read the snapshot after
+    ``broker.subscribe()`` so no event falls between the two; one already in
+    the snapshot may be sent again, which is harmless as events carry
+    absolute values. Comment lines are sent every ``heartbeat`` seconds to
+    keep proxies from closing idle connections.
+    """
+    broker, channel = subscription.broker, subscription.channel
+    try:
+        yield f'retry: {retry_ms}\n\n'
+
+        if last_event_id is None:
+            last_id = subscription.start_id
+            if snapshot is not None:
+                yield LiveEvent(last_id, 'snapshot', snapshot).to_sse()
+        else:
+            last_id = last_event_id
+        # Events published before the subscription was registered reach
+        # this stream only through the history
+        for event in broker.history(channel, last_id):
+            yield event.to_sse()
+            last_id = event.id
+
+        while not subscription.overflowed:
+            event = subscription.get(timeout=heartbeat)
+            if event is None:
+                yield ': keepalive\n\n'
+            elif event.id > last_id:
+                last_id = event.id
+                yield event.to_sse()
+    finally:
+        subscription.close()
@@ -0,0 +1,215 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+
+
+class UploadError(Exception):
+    """Raised when an uploaded file is rejected."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class StoredImage:
+    """An image saved in the content-addressed store."""
+
+    def __init__(self, content_hash, extension, size, width, height, created):
+        self.content_hash = content_hash
+        self.extension = extension
+        self.size = size
+        self.width = width
+        self.height = height
+        self.created = created  # False when the content was already stored
+
+    @property
+    def relative_path(self):
+        return original_path(self.content_hash, self.extension)
+
+
+def original_path(content_hash, extension):
+    """Path of an original, relative to the media root."""
+    return f'originals/{content_hash[:2]}/{content_hash}.{extension}'
+
+
+def variant_path(content_hash, name, extension):
+    """Path of a resized variant, relative to the media root."""
+    return f'variants/{content_hash[:2]}/{content_hash}/{name}.{extension}'
+
+
+class MediaStore:
+    """Content-addressed storage for uploaded images.
+
+    Uploads are streamed to disk in chunks while being hashed, so memory use
+    does not depend on the file size. Files are stored once per SHA-256 hash
+    (re-uploading the same photo is free). Resized JPEG and WebP variants
+    are generated by the ``generate_image_variants`` background job.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+    VARIANT_FORMATS = (('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+                       ('webp', 'WEBP', {'quality': 80, 'method': 4}))
+
+    _url_re = re.compile(r'/originals/[0-9a-f]{2}/(?P<hash>[0-9a-f]{64})\.(?P<ext>[a-z]+)$')
+
+    def __init__(self, app=None):
+        self.app = None
+        self.root = None
+        self.url_prefix = '/media'
+        self.sizes = {'thumb': 320, 'medium': 960}
+        self.max_size = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.root = os.path.join(app.instance_path, app.config['UPLOAD_FOLDER'])
+        self.url_prefix = app.config.get('MEDIA_URL', '/media').rstrip('/')
+        self.sizes = dict(app.config.get('UPLOAD_IMAGE_SIZES', self.sizes))
+        self.max_size = app.config.get('MAX_CONTENT_LENGTH')
+        os.makedirs(os.path.join(self.root, 'tmp'), exist_ok=True)
+        app.extensions['media_store'] = self
+
+    def path_for(self, relative_path):
+        return os.path.join(self.root, relative_path)
+
+    def url_for(self, relative_path):
+        return f'{self.url_prefix}/{relative_path}'
+
+    # Storing
+
+    def save_image(self, stream):
+        """Stream an image to the store (variants are left to the job queue)."""
+        from PIL import Image, UnidentifiedImageError
+
+        tmp_dir = os.path.join(self.root, 'tmp')
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix='.upload')
+        digest = hashlib.sha256()
+        size = 0
+
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                while True:
+                    chunk = stream.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if self.max_size and size > self.max_size:
+                        raise UploadError('File too large', 413)
+                    digest.update(chunk)
+                    tmp_file.write(chunk)
+
+            if size == 0:
+                raise UploadError('Empty file')
+
+            # Only the header is parsed here; pixels are decoded by the workers
+            try:
+                with Image.open(tmp_path) as image:
+                    extension = self.FORMATS.get(image.format)
+                    width, height = image.size
+            except (UnidentifiedImageError, OSError):
+                raise UploadError('File is not a supported image')
+
+            if extension is None:
+                raise UploadError('Unsupported image format')
+
+            content_hash = digest.hexdigest()
+            final_path = self.path_for(original_path(content_hash, extension))
+            created = not os.path.exists(final_path)
+
+            if created:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return StoredImage(content_hash, extension, size, width, height, created)
+
+    # Variants
+
+    def variants_ready(self, content_hash):
+        return all(
+            os.path.exists(self.path_for(variant_path(content_hash, name, extension)))
+            for name in self.sizes
+            for extension, _, _ in self.VARIANT_FORMATS
+        )
+
+    def generate_variants(self, content_hash, extension):
+        """Resize an original into every configured size and format."""
+        from PIL import Image, ImageOps
+
+        with Image.open(self.path_for(original_path(content_hash, extension))) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.split()[-1])
+                image = background
+            elif image.mode != 'RGB':
+                image = image.convert('RGB')
+
+            # Largest first so each smaller size is resampled from a smaller image
+            for name, width in sorted(self.sizes.items(), key=lambda item: -item[1]):
+                if image.width > width:
+                    image = image.resize((width, round(image.height * width / image.width)),
+                                         Image.LANCZOS)
+                for variant_extension, image_format, options in self.VARIANT_FORMATS:
+                    target = self.path_for(variant_path(content_hash, name, variant_extension))
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    tmp_target = f'{target}.{os.getpid()}.{threading.get_ident()}.tmp'
+                    image.save(tmp_target, image_format, **options)
+                    os.replace(tmp_target, target)
+
+    # URLs
+
+    def parse_url(self, url):
+        """Return (content_hash, extension) for a store URL, or None."""
+        if not url or not url.startswith(self.url_prefix + '/'):
+            return None
+        match = self._url_re.search(url)
+        if not match:
+            return None
+        return match.group('hash'), match.group('ext')
+
+    def image_sources(self, url):
+        """Responsive image sources for a stored original URL.
+
+        Returns None for URLs that do not point into the store (e.g. external
+        links saved before uploads existed).
+        """
+        parsed = self.parse_url(url)
+        if parsed is None:
+            return None
+        content_hash, _ = parsed
+
+        ordered = sorted(self.sizes.items(), key=lambda item: item[1])
+        sources = {'src': url}
+        for variant_extension, _, _ in self.VARIANT_FORMATS:
+            key = 'srcset' if variant_extension == 'jpg' else f'{variant_extension}_srcset'
+            sources[key] = ', '.join(
+                f'{self.url_for(variant_path(content_hash, name, variant_extension))} {width}w'
+                for name, width in ordered
+            )
+        for name, _ in ordered:
+            sources[name] = self.url_for(variant_path(content_hash, name, 'jpg'))
+        return sources
+
+    def describe(self, stored):
+        """API representation of a stored image."""
+        url = self.url_for(stored.relative_path)
+        return {
+            'hash': stored.content_hash,
+            'url': url,
+            'size': stored.size,
+            'width': stored.width,
+            'height': stored.height,
+            'duplicate': not stored.created,
+            'variants_ready': self.variants_ready(stored.content_hash),
+            'sources': self.image_sources(url)
+        }
@@ -0,0 +1,114 @@
+"""
+Efficient delivery of files from the media store.
+
+Three delivery modes, selected with ``MEDIA_ACCEL``:
+
+* ``nginx``: the response only carries an ``X-Accel-Redirect`` header and
+  nginx streams the file itself (including byte ranges). The upload folder
+  must be exposed as an internal location, e.g.::
+
+      location /protected-media/ {
+          internal;
+          alias /var/www/uploads/;
+      }
+
+* ``sendfile``: same idea with ``X-Sendfile`` for Apache/lighttpd.
+* unset: the file is sent by the WSGI server through ``wsgi.file_wrapper``
+  (gunicorn uses ``os.sendfile``, so the bytes never enter Python), with
+  byte-range support for video scrubbing.
+
+Content-addressed paths never change content, so they are served with a
+one-year ``immutable`` cache policy and the content hash as a strong ETag.
+"""
+
+import mimetypes
+import os
+import re
+
+from flask import abort, current_app, redirect, request, send_file
+from werkzeug.security import safe_join
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_content_addressed_re = re.compile(
+    r'^(?:originals/[0-9a-f]{2}/(?P<original>[0-9a-f]{64})\.[a-z0-9]+'
+    r'|variants/[0-9a-f]{2}/(?P<variant>[0-9a-f]{64})/(?P<name>[a-z0-9_-]+)\.[a-z0-9]+)$'
+)
+
+
+def content_etag(relative_path):
+    """Strong ETag for a content-addressed path, or None."""
+    match = _content_addressed_re.match(relative_path)
+    if not match:
+        return None
+    if match.group('original'):
+        return match.group('original')
+    return f"{match.group('variant')}-{match.group('name')}"
+
+
+def find_original(store, content_hash):
+    """Relative path of the original for a content hash, if it exists."""
+    directory = store.path_for(f'originals/{content_hash[:2]}')
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return None
+    for name in names:
+        if name.startswith(content_hash + '.'):
+            return f'originals/{content_hash[:2]}/{name}'
+    return None
+
+
+def send_media(store, relative_path):
+    """Build the response for a file in the media store."""
+    path = safe_join(store.root, relative_path)
+    if path is None or relative_path.startswith('tmp/'):
+        abort(404)
+
+    etag = content_etag(relative_path)
+    max_age = IMMUTABLE_MAX_AGE if etag else int(current_app.config.get('MEDIA_MAX_AGE', 3600))
+
+    # Content-addressed files cannot change: answer revalidations without
+    # touching the disk.
+    if etag and etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+        return _cache_headers(response, etag, max_age)
+
+    if not os.path.isfile(path):
+        # Variants are generated in the background: until they exist, point
+        # the client at the original without letting anyone cache the detour.
+        match = _content_addressed_re.match(relative_path)
+        original = find_original(store, match.group('variant')) if match and match.group('variant') else None
+        if original is None:
+            abort(404)
+        response = redirect(store.url_for(original), code=307)
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    accel = current_app.config.get('MEDIA_ACCEL')
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    if accel == 'nginx':
+        prefix = current_app.config.get('MEDIA_ACCEL_PREFIX', '/protected-media').rstrip('/')
+        response = current_app.response_class(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = f'{prefix}/{relative_path}'
+    elif accel == 'sendfile':
+        response = current_app.response_class(mimetype=mimetype)
+        response.headers['X-Sendfile'] = path
+    else:
+        # conditional=True handles If-None-Match / If-Modified-Since and Range
+        response = send_file(path, mimetype=mimetype, conditional=True,
+                             etag=etag or True, max_age=max_age)
+
+    response.headers['Accept-Ranges'] = 'bytes'
+    return _cache_headers(response, etag, max_age)
+
+
+def _cache_headers(response, etag, max_age):
+    if etag:
+        response.set_etag(etag)
+        response.cache_control.immutable = True
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response
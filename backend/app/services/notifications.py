@@ -0,0 +1,176 @@
+import smtplib
+import threading
+import time
+from collections import defaultdict
+from string import Template
+
+from flask import current_app
+from flask_mail import Message
+
+
+class NotificationTemplate:
+    """An email whose shared parts are rendered once per dispatch.
+
+    Templates use ``$name`` placeholders. :meth:`render` fills in the context
+    shared by every recipient (training date, article title...) and leaves
+    the per-recipient placeholders (``$first_name``...) for :meth:`personalize`,
+    which is a single cheap substitution per message.
+    """
+
+    def __init__(self, subject, body, html=None):
+        self.subject = subject
+        self.body = body
+        self.html = html
+
+    def render(self, **context):
+        # Escape "$" in shared values so personalize() leaves them untouched
+        context = {key: str(value).replace('$', '$$') for key, value in context.items()}
+        return NotificationTemplate(
+            Template(self.subject).safe_substitute(context),
+            Template(self.body).safe_substitute(context),
+            Template(self.html).safe_substitute(context) if self.html else None
+        )
+
+    def personalize(self, **context):
+        return (
+            Template(self.subject).safe_substitute(context),
+            Template(self.body).safe_substitute(context),
+            Template(self.html).safe_substitute(context) if self.html else None
+        )
+
+
+class Recipient:
+    """An email address plus the values substituted into its copy."""
+
+    def __init__(self, email, **context):
+        self.email = email
+        self.context = context
+
+    @property
+    def provider(self):
+        return self.email.rsplit('@', 1)[-1].lower()
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.email, first_name=user.first_name, last_name=user.last_name,
+                   full_name=user.full_name, username=user.username)
+
+
+class DispatchResult:
+    """Outcome of a dispatch: how many messages went out and who failed."""
+
+    def __init__(self):
+        self.sent = 0
+        self.batches = 0
+        self.failed = []
+
+    def to_dict(self):
+        return {'sent': self.sent, 'batches': self.batches, 'failed': self.failed}
+
+
+class RateLimiter:
+    """Minimum spacing between messages sent to the same provider."""
+
+    def __init__(self, default_rate=0, rates=None):
+        if isinstance(rates, str):
+            # "gmail.com=20,yahoo.fr=5" as found in environment variables
+            rates = dict(item.split('=', 1) for item in rates.split(',') if '=' in item)
+        self.default_rate = default_rate
+        self.rates = {provider.strip().lower(): float(rate) for provider, rate in (rates or {}).items()}
+        self._next_send = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def wait(self, provider):
+        rate = self.rates.get(provider, self.default_rate)
+        if not rate or rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            send_at = max(now, self._next_send[provider])
+            self._next_send[provider] = send_at + 1.0 / rate
+
+        delay = send_at - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class NotificationDispatcher:
+    """Sends one notification to many recipients efficiently.
+
+    Recipients are grouped by provider (the domain of their address) and
+    split into batches of ``MAIL_BATCH_SIZE``. Each batch reuses a single SMTP
+    connection from ``mail.connect()`` instead of a handshake and login per
+    message. Sends to a provider are spaced according to
+    ``MAIL_PROVIDER_RATE_LIMITS`` (messages/second, falling back to
+    ``MAIL_DEFAULT_RATE_LIMIT``; 0 disables the limit).
+
+    For local testing point ``MAIL_SERVER``/``MAIL_PORT`` at an SMTP stand-in,
+    e.g. ``python -m aiosmtpd -n -l localhost:1025``.
+    """
+
+    def __init__(self, mail=None, app=None):
+        self.mail = mail
+        self.app = None
+        self.batch_size = 50
+        self.rate_limiter = RateLimiter()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.batch_size = max(1, int(app.config.get('MAIL_BATCH_SIZE', 50)))
+        self.rate_limiter = RateLimiter(
+            float(app.config.get('MAIL_DEFAULT_RATE_LIMIT', 0)),
+            app.config.get('MAIL_PROVIDER_RATE_LIMITS')
+        )
+        app.extensions['notification_dispatcher'] = self
+
+    def batches(self, recipients):
+        """Group recipients by provider, then cut each group into batches."""
+        by_provider = defaultdict(list)
+        seen = set()
+        for recipient in recipients:
+            email = recipient.email.lower()
+            if email in seen:
+                continue
+            seen.add(email)
+            by_provider[recipient.provider].append(recipient)
+
+        for provider, group in by_provider.items():
+            for start in range(0, len(group), self.batch_size):
+                yield provider, group[start:start + self.batch_size]
+
+    def dispatch(self, template, recipients, sender=None, **context):
+        """Render ``template`` with ``context`` and send it to every recipient."""
+        result = DispatchResult()
+        if 'mail' not in current_app.extensions:
+            current_app.logger.info('Mail is not configured (MAIL_SERVER), skipping notification')
+            return result
+
+        rendered = template.render(**context)
+
+        for provider, batch in self.batches(recipients):
+            result.batches += 1
+            handled = 0
+            try:
+                with self.mail.connect() as connection:
+                    for recipient in batch:
+                        subject, body, html = rendered.personalize(**recipient.context)
+                        self.rate_limiter.wait(provider)
+                        try:
+                            connection.send(Message(subject=subject, recipients=[recipient.email],
+                                                    body=body, html=html, sender=sender))
+                            result.sent += 1
+                        except smtplib.SMTPRecipientsRefused:
+                            result.failed.append(recipient.email)
+                        handled += 1
+            except (smtplib.SMTPException, OSError) as e:
+                # The connection is gone: the rest of the batch was not sent
+                result.failed.extend(recipient.email for recipient in batch[handled:])
+                if self.app is not None:
+                    self.app.logger.warning('SMTP batch to %s failed: %s', provider, e)
+
+        return result
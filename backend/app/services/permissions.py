@@ -0,0 +1,109 @@
+"""
+Permission policy for every blueprint.
+
+``POLICY`` is the single source of truth: each permission maps to the roles
+granted it. API permissions are named ``<resource>.<action>``; a ``:own``
+variant grants the action only on objects the caller owns (their player
+profile, their articles). The older general permissions of
+``User.has_permission`` (``read``, ``write``, ``manage_users``...) live in
+the same table.
+
+The table is compiled once at import into one bit per permission and one
+integer mask per role, so a check is a dict lookup and a bitwise AND. Views
+use ``@requires(permission=...)`` (``app.services.tokens``), which resolves
+the bit when the route is declared, or ``can()`` for ownership-dependent
+checks inside the view.
+"""
+
+ROLES = ('admin', 'coach', 'staff', 'player', 'supporter')
+EVERYONE = ROLES
+
+POLICY = {
+    # General permissions (User.has_permission)
+    'read': EVERYONE,
+    'write': ('admin', 'coach', 'staff'),
+    'delete': ('admin',),
+    'manage_users': ('admin',),
+    'manage_finances': ('admin',),
+    'manage_players': ('coach',),
+    'manage_trainings': ('coach',),
+    'update_profile': ('player',),
+
+    'users.read': ('admin',),
+
+    'players.read': EVERYONE,
+    'players.read_sensitive': ('admin', 'coach'),
+    'players.read_sensitive:own': ('player',),
+    'players.create': ('admin', 'coach'),
+    'players.update': ('admin', 'coach'),
+    'players.update:own': ('player',),
+    'players.delete': ('admin',),
+
+    'matches.read': EVERYONE,
+    'matches.create': ('admin', 'coach'),
+    'matches.update': ('admin', 'coach'),
+    'matches.delete': ('admin',),
+    'matches.squad': ('admin', 'coach'),
+
+    'trainings.read': EVERYONE,
+    'trainings.create': ('admin', 'coach'),
+    'trainings.update': ('admin', 'coach'),
+    'trainings.attendance': ('admin', 'coach'),
+    'trainings.delete': ('admin',),
+
+    'finances.read': ('admin', 'coach', 'staff'),
+    'finances.read_sensitive': ('admin',),
+    'finances.create': ('admin', 'staff'),
+    'finances.update': ('admin', 'staff'),
+    'finances.update_processed': ('admin',),  # Transactions no longer pending
+    'finances.delete': ('admin',),
+    'finances.approve': ('admin',),
+
+    'news.create': ('admin', 'coach', 'staff'),
+    'news.update': ('admin',),
+    'news.update:own': ('coach', 'staff'),  # Also lets them see their drafts
+    'news.delete': ('admin',),
+    'news.delete:own': ('coach', 'staff'),
+    'news.publish': ('admin',),
+
+    'uploads.image': ('admin', 'coach', 'staff'),
+    'uploads.avatar': EVERYONE,
+}
+
+
+def _compile(policy):
+    unknown = {role for roles in policy.values() for role in roles} - set(ROLES)
+    if unknown:
+        raise ValueError(f'Unknown roles in permission policy: {sorted(unknown)}')
+    bits = {permission: 1 << index for index, permission in enumerate(policy)}
+    masks = {role: sum(bit for permission, bit in bits.items() if role in policy[permission]) for role in ROLES}
+    grants = {role: frozenset(permission for permission in policy if role in policy[permission]) for role in ROLES}
+    return bits, masks, grants
+
+
+PERMISSION_BITS, ROLE_MASKS, ROLE_PERMISSIONS = _compile(POLICY)
+
+
+def permission_bit(permission):
+    """Bit of a permission, raising ``ValueError`` for names not in the policy."""
+    try:
+        return PERMISSION_BITS[permission]
+    except KeyError:
+        raise ValueError(f'Unknown permission {permission!r}') from None
+
+
+def allows(role, permission):
+    """Whether ``role`` is granted ``permission`` (unknown names are denied)."""
+    return bool(ROLE_MASKS.get(role, 0) & PERMISSION_BITS.get(permission, 0))
+
+
+def can(principal, permission, owned=False):
+    """Whether ``principal`` (token claims or a ``User``) may perform ``permission``.
+
+    ``owned`` says whether the object belongs to the principal, which
+    enables the permission's ``:own`` variant.
+    """
+    mask = ROLE_MASKS.get(principal.role, 0)
+    if mask & permission_bit(permission):
+        return True
+    return bool(owned and mask & PERMISSION_BITS.get(permission + ':own', 0))
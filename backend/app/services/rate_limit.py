@@ -0,0 +1,293 @@
+import math
+import threading
+import time
+
+from flask import g, jsonify, request
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+# Sliding window counter: the previous window's count, weighted by how much
+# of it still overlaps the sliding window, plus the current window's count
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[2]) + current >= tonumber(ARGV[1]) then
+    return {0, current, previous}
+end
+redis.call('INCR', KEYS[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return {1, current + 1, previous}
+"""
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], ARGV[4])
+return {allowed, tostring(tokens)}
+"""
+
+
+class RateLimitExceeded:
+    """The rule a request broke and when the client may retry."""
+
+    def __init__(self, rule, retry_after):
+        self.rule = rule
+        self.retry_after = retry_after
+
+
+def exceeded_payload(exceeded):
+    return {
+        'error': 'Too many requests',
+        'message': f'Rate limit of {exceeded.rule.spec} exceeded'
+    }
+
+
+def exceeded_headers(exceeded):
+    return [
+        ('Retry-After', str(max(1, math.ceil(exceeded.retry_after)))),
+        ('X-RateLimit-Limit', str(exceeded.rule.limit)),
+        ('X-RateLimit-Remaining', '0'),
+    ]
+
+
+class Rule:
+    """``"<count>/<period> [per ip|user]"``, e.g. ``"5/minute"``, ``"100/hour per user"``.
+
+    ``per user`` keys on the JWT identity and falls back to the client IP
+    for anonymous requests.
+    """
+
+    def __init__(self, spec, name):
+        rate, _, scope = spec.partition(' per ')
+        count, _, period = rate.strip().partition('/')
+        multiplier, _, unit = period.strip().rpartition(' ')
+        self.spec = spec
+        self.name = name
+        self.limit = int(count)
+        self.period = int(multiplier or 1) * PERIODS[unit.rstrip('s')]
+        self.scope = scope.strip() or 'ip'
+        if self.scope not in ('ip', 'user'):
+            raise ValueError(f'Unknown rate limit scope in {spec!r}')
+
+
+def sliding_window_retry_after(rule, current, previous, elapsed):
+    """Seconds until the weighted count drops below the limit."""
+    if current >= rule.limit or not previous:
+        return rule.period - elapsed
+    # previous * (1 - (elapsed + t) / period) + current < limit
+    return max(0.0, rule.period * (1 - (rule.limit - current) / previous) - elapsed)
+
+
+class MemoryStorage:
+    """Per-process counters (development, single worker)."""
+
+    def __init__(self):
+        self._counters = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+
+    def sliding_window(self, key, rule, window, weight):
+        with self._lock:
+            self._prune()
+            current = self._counters.get((key, window), (0, 0))[0]
+            previous = self._counters.get((key, window - 1), (0, 0))[0]
+            if previous * weight + current >= rule.limit:
+                return False, current, previous
+            self._counters[(key, window)] = (current + 1, (window + 2) * rule.period)
+            return True, current + 1, previous
+
+    def token_bucket(self, key, rule, now):
+        rate = rule.limit / rule.period
+        with self._lock:
+            self._prune()
+            tokens, updated = self._buckets.get(key, (rule.limit, now))
+            tokens = min(rule.limit, tokens + max(0.0, now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            return allowed, tokens
+
+    def _prune(self):
+        # Drop finished windows and idle buckets now and then so memory stays bounded
+        now = time.time()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + 60
+        self._counters = {window: state for window, state in self._counters.items() if state[1] > now}
+        self._buckets = {key: state for key, state in self._buckets.items() if now - state[1] < 86400}
+
+
+class RedisStorage:
+    """Counters shared by every worker, updated atomically with Lua scripts."""
+
+    def __init__(self, url):
+        import redis
+        self.redis = redis.Redis.from_url(url)
+        self._sliding_window = self.redis.register_script(SLIDING_WINDOW_SCRIPT)
+        self._token_bucket = self.redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def sliding_window(self, key, rule, window, weight):
+        allowed, current, previous = self._sliding_window(
+            keys=[f'{key}:{window}', f'{key}:{window - 1}'],
+            args=[rule.limit, weight, rule.period * 2000])
+        return bool(allowed), int(current), int(previous)
+
+    def token_bucket(self, key, rule, now):
+        allowed, tokens = self._token_bucket(
+            keys=[key], args=[rule.limit, rule.limit / rule.period, now, rule.period * 1000])
+        return bool(allowed), float(tokens)
+
+
+class RequestRateLimiter:
+    """Throttle requests per client before they reach the view.
+
+    ``RATELIMITS`` maps an endpoint (``'auth.login'``) or a blueprint
+    (``'news'``) to a list of rules; endpoint rules replace the blueprint's.
+    Rules are parsed once at start-up, and a check is a dict lookup plus one
+    counter update (one Redis round trip with ``RATELIMIT_STORAGE=redis``),
+    so rejected requests never reach password hashing or the database.
+
+    ``RATELIMIT_STRATEGY`` is ``sliding-window`` (smooth fixed-window
+    counters) or ``token-bucket`` (allows bursts up to the limit). Rejections
+    get a 429 with ``Retry-After``. Behind a reverse proxy set
+    ``RATELIMIT_PROXY_COUNT`` so the client IP is read from
+    ``X-Forwarded-For``. If Redis is unreachable requests are let through.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = True
+        self.strategy = 'sliding-window'
+        self.proxy_count = 0
+        self.prefix = 'esc:ratelimit'
+        self.rules = {}
+        self.storage = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = bool(app.config.get('RATELIMIT_ENABLED', True))
+        self.strategy = app.config.get('RATELIMIT_STRATEGY', 'sliding-window')
+        self.proxy_count = int(app.config.get('RATELIMIT_PROXY_COUNT', 0))
+        self.prefix = app.config.get('RATELIMIT_PREFIX', 'esc:ratelimit')
+        self.rules = {
+            target: [Rule(spec, f'{target}:{index}') for index, spec in enumerate(specs)]
+            for target, specs in (app.config.get('RATELIMITS') or {}).items()
+        }
+        if self.strategy not in ('sliding-window', 'token-bucket'):
+            raise ValueError(f'Unknown RATELIMIT_STRATEGY {self.strategy!r}')
+
+        if app.config.get('RATELIMIT_STORAGE', 'memory') == 'redis':
+            self.storage = RedisStorage(app.config.get('REDIS_URL') or 'redis://localhost:6379/0')
+        else:
+            self.storage = MemoryStorage()
+        app.extensions['rate_limiter'] = self
+
+        if self.enabled and self.rules:
+            app.before_request(self.check_request)
+            app.after_request(self.add_headers)
+
+    # Request hooks
+
+    def check_request(self):
+        rules = self.rules_for(request.endpoint, request.blueprint)
+        if not rules or request.method == 'OPTIONS':
+            return None
+
+        identity = self.jwt_identity() if any(rule.scope == 'user' for rule in rules) else None
+        exceeded, g.rate_limit = self.evaluate(rules, self.client_ip(), identity)
+        if exceeded:
+            return self.too_many_requests(exceeded)
+        return None
+
+    def add_headers(self, response):
+        state = g.get('rate_limit')
+        if state:
+            rule, remaining = state
+            response.headers['X-RateLimit-Limit'] = str(rule.limit)
+            response.headers['X-RateLimit-Remaining'] = str(max(0, remaining))
+        return response
+
+    def too_many_requests(self, exceeded):
+        response = jsonify(exceeded_payload(exceeded))
+        response.status_code = 429
+        response.headers.extend(exceeded_headers(exceeded))
+        return response
+
+    # Keys and counters
+
+    def rules_for(self, endpoint, blueprint):
+        return self.rules.get(endpoint) or self.rules.get(blueprint)
+
+    def evaluate(self, rules, ip, identity=None):
+        """Count a request against ``rules``.
+
+        Returns ``(RateLimitExceeded or None, (rule, remaining) closest to
+        its limit)``. Storage errors let the request through.
+        """
+        closest = None
+        for rule in rules:
+            if rule.scope == 'user' and identity is not None:
+                key = f'{self.prefix}:{rule.name}:user:{identity}'
+            else:
+                key = f'{self.prefix}:{rule.name}:ip:{ip}'
+            try:
+                allowed, remaining, retry_after = self.hit(rule, key)
+            except Exception as e:
+                self.app.logger.warning('Rate limit storage unavailable: %s', e)
+                return None, None
+            if not allowed:
+                return RateLimitExceeded(rule, retry_after), None
+            if closest is None or remaining < closest[1]:
+                closest = (rule, remaining)
+        return None, closest
+
+    def client_ip(self, access_route=None, remote_addr=None):
+        """Client address, skipping ``RATELIMIT_PROXY_COUNT`` trusted proxies."""
+        if access_route is None:
+            access_route, remote_addr = request.access_route, request.remote_addr
+        if self.proxy_count and len(access_route) >= self.proxy_count:
+            return access_route[-self.proxy_count]
+        return remote_addr
+
+    def jwt_identity(self):
+        """Identity of the request's access or refresh token (None without a valid one)."""
+        from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+        try:
+            # Either token type: 'auth.refresh' rules are per user too
+            verify_jwt_in_request(optional=True, verify_type=False)
+            return get_jwt_identity()
+        except Exception:
+            return None
+
+    def hit(self, rule, key, now=None):
+        """Count one request; returns (allowed, remaining, retry_after seconds)."""
+        now = time.time() if now is None else now
+        if self.strategy == 'token-bucket':
+            allowed, tokens = self.storage.token_bucket(key, rule, now)
+            retry_after = 0.0 if allowed else (1 - tokens) * rule.period / rule.limit
+            return allowed, math.floor(tokens), retry_after
+
+        window, offset = divmod(now, rule.period)
+        window = int(window)
+        weight = 1 - offset / rule.period
+        allowed, current, previous = self.storage.sliding_window(key, rule, window, weight)
+        remaining = rule.limit - (previous * weight + current)
+        retry_after = 0.0 if allowed else sliding_window_retry_after(rule, current, previous, offset)
+        return allowed, math.floor(remaining), retry_after
@@ -0,0 +1,102 @@
+"""
+Player form ratings, recomputed for the whole squad in one pass.
+
+A player's rating is a weighted average of the ``performance_rating`` of
+their last ``RATING_FORM_MATCHES`` rated appearances in finished matches:
+
+* recent form counts more: the weight decays by ``1 - RATING_FORM_ALPHA``
+  per older match (exponentially weighted average);
+* each appearance is weighted by its share of ``RATING_FULL_MINUTES``, so a
+  ten-minute cameo moves the rating less than a full match;
+* a rating is scaled by up to ``RATING_OPPONENT_FACTOR / 2`` either way
+  according to the opponent's strength, the share of points it took from
+  the club in finished matches (shrunk towards 0.5 by
+  ``RATING_OPPONENT_PRIOR`` virtual matches).
+
+Appearances without a rating (or without minutes) are ignored rather than
+counted as zeros, and players without any keep their current rating.
+
+The appearances of every player, ranked per player with the opponent's
+strength joined in, come from a single query; the weighted averages are
+accumulated in one pass over the rows and stored with one bulk UPDATE.
+"""
+
+from flask import current_app
+from sqlalchemy import case, func, select, update
+
+from app import db
+from app.models import Match, Player, PlayerStats
+
+
+def opponent_strength(prior):
+    """Subquery of ``(opponent, strength)``, strength in [0, 1] (0.5 = average)."""
+    points_taken = case((Match.result == 'loss', 3), (Match.result == 'draw', 1), else_=0)
+    strength = (func.sum(points_taken) + 1.5 * prior) / (3.0 * (func.count(Match.id) + prior))
+    return select(Match.opponent, strength.label('strength')).where(
+        Match.is_finished
+    ).group_by(Match.opponent).subquery('opponent_strength')
+
+
+def appearances(player_ids=None, window=10, prior=2.0):
+    """Rated appearances ``(player_id, rating, minutes, strength, rank)``, newest first.
+
+    ``rank`` is 1 for a player's most recent match; only the last
+    ``window`` appearances of each player are returned.
+    """
+    strength = opponent_strength(prior)
+    rank = func.row_number().over(partition_by=PlayerStats.player_id,
+                                  order_by=(Match.date.desc(), Match.id.desc()))
+    ranked = select(
+        PlayerStats.player_id, PlayerStats.performance_rating.label('rating'),
+        PlayerStats.minutes_played.label('minutes'), strength.c.strength, rank.label('rank')
+    ).join(Match, PlayerStats.match_id == Match.id).join(
+        strength, strength.c.opponent == Match.opponent
+    ).where(
+        PlayerStats.performance_rating.isnot(None),
+        PlayerStats.minutes_played > 0,
+        Match.is_finished
+    )
+    if player_ids is not None:
+        ranked = ranked.where(PlayerStats.player_id.in_(player_ids))
+    ranked = ranked.subquery('ranked')
+
+    return db.session.execute(
+        select(ranked.c.player_id, ranked.c.rating, ranked.c.minutes, ranked.c.strength, ranked.c.rank)
+        .where(ranked.c.rank <= window)
+    ).all()
+
+
+def form_ratings(player_ids=None):
+    """``{player_id: rating}`` for the players with rated appearances (all by default)."""
+    config = current_app.config
+    window = int(config.get('RATING_FORM_MATCHES', 10))
+    decay = 1.0 - float(config.get('RATING_FORM_ALPHA', 0.3))
+    full_minutes = float(config.get('RATING_FULL_MINUTES', 90))
+    opponent_factor = float(config.get('RATING_OPPONENT_FACTOR', 0.2))
+    prior = float(config.get('RATING_OPPONENT_PRIOR', 2))
+
+    # Weights per rank are the same for everyone: computed once
+    decay_weights = [decay ** rank for rank in range(window)]
+    totals = {}
+    for player_id, rating, minutes, strength, rank in appearances(player_ids, window, prior):
+        weight = decay_weights[rank - 1] * min(minutes, full_minutes) / full_minutes
+        adjusted = min(max(rating * (1 + opponent_factor * (strength - 0.5)), 0.0), 10.0)
+        total = totals.setdefault(player_id, [0.0, 0.0])
+        total[0] += weight * adjusted
+        total[1] += weight
+
+    return {player_id: round(weighted / weights, 2) for player_id, (weighted, weights) in totals.items()}
+
+
+def refresh(player_ids=None):
+    """Recompute and store form ratings (whole squad by default).
+
+    Returns the new ratings; all of them are written with one bulk UPDATE
+    and a single commit.
+    """
+    ratings = form_ratings(player_ids)
+    if ratings:
+        db.session.execute(update(Player), [{'id': player_id, 'rating': rating}
+                                            for player_id, rating in ratings.items()])
+        db.session.commit()
+    return ratings
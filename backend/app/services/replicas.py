@@ -0,0 +1,192 @@
+import itertools
+import threading
+import time
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+READ_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+WRITE_METHODS = frozenset(('POST', 'PUT', 'PATCH', 'DELETE'))
+DEFAULT_BLUEPRINTS = ('auth', 'players', 'matches', 'trainings', 'finances', 'news')
+
+# Zero when the replica has replayed everything it received, otherwise the
+# age of the last replayed transaction (an idle primary must not look lagging)
+POSTGRES_LAG_QUERY = text(
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+)
+
+
+def replica_binds(urls):
+    """``SQLALCHEMY_BINDS`` entries for the replica URLs."""
+    return {f'replica:{index}': url for index, url in enumerate(urls)}
+
+
+def current_replica():
+    """Bind key of the replica serving the current request, if any."""
+    if has_request_context():
+        return g.get('db_replica')
+    return None
+
+
+class RoutingSession(Session):
+    """Session sending the reads of replica-routed requests to the replica.
+
+    Flushes and bulk INSERT/UPDATE/DELETE always use the primary, and once a
+    request has written anything its remaining reads stay on the primary too.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = current_replica()
+        if replica is not None and bind is None:
+            if self._flushing or getattr(clause, 'is_dml', False):
+                g.db_replica = None
+            else:
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Route read-only API requests to read replicas.
+
+    GET requests to the ``REPLICA_BLUEPRINTS`` are served from one of the
+    ``DATABASE_REPLICA_URLS`` (round robin). Everything else uses the
+    primary, as do:
+
+    * clients that wrote in the last ``REPLICA_READ_YOUR_WRITES`` seconds
+      (keyed by JWT identity, or IP for anonymous clients), so a list fetched
+      right after a POST/PUT includes the change. With
+      ``REPLICA_STICKY_BACKEND=redis`` the window is shared by all workers;
+    * replicas lagging more than ``REPLICA_MAX_LAG`` seconds or unreachable,
+      checked at most every ``REPLICA_LAG_CHECK_INTERVAL`` seconds.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.replicas = []
+        self.blueprints = frozenset(DEFAULT_BLUEPRINTS)
+        self.sticky_window = 5.0
+        self.max_lag = 5.0
+        self.check_interval = 2.0
+        self.backend = 'memory'
+        self.redis_url = None
+        self._redis = None
+        self._cycle = None
+        self._lags = {}
+        self._writes = {}
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.replicas = list(replica_binds(app.config.get('DATABASE_REPLICA_URLS') or []))
+        self.blueprints = frozenset(app.config.get('REPLICA_BLUEPRINTS', DEFAULT_BLUEPRINTS))
+        self.sticky_window = float(app.config.get('REPLICA_READ_YOUR_WRITES', 5))
+        self.max_lag = float(app.config.get('REPLICA_MAX_LAG', 5))
+        self.check_interval = float(app.config.get('REPLICA_LAG_CHECK_INTERVAL', 2))
+        self.backend = app.config.get('REPLICA_STICKY_BACKEND', 'memory')
+        self.redis_url = app.config.get('REDIS_URL')
+        self._cycle = itertools.cycle(self.replicas)
+        self._lags = {}
+        self._writes = {}
+        app.extensions['replica_router'] = self
+
+        if self.replicas:
+            app.before_request(self.route_request)
+            app.after_request(self.record_write)
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url or 'redis://localhost:6379/0')
+        return self._redis
+
+    # Request hooks
+
+    def route_request(self):
+        if request.method not in READ_METHODS or request.blueprint not in self.blueprints:
+            return
+        if self.wrote_recently(self.client_key()):
+            return
+        g.db_replica = self.choose_replica()
+
+    def record_write(self, response):
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            self.mark_write(self.client_key())
+        return response
+
+    def client_key(self):
+        from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+        except Exception:
+            identity = None
+        return f'user:{identity}' if identity is not None else f'ip:{request.remote_addr}'
+
+    # Read-your-writes window
+
+    def mark_write(self, key):
+        if self.sticky_window <= 0:
+            return
+        if self.backend == 'redis':
+            self.redis.set(f'esc:primary:{key}', 1, px=int(self.sticky_window * 1000))
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._writes) > 10000:
+                self._writes = {k: until for k, until in self._writes.items() if until > now}
+            self._writes[key] = now + self.sticky_window
+
+    def wrote_recently(self, key):
+        if self.sticky_window <= 0:
+            return False
+        if self.backend == 'redis':
+            return bool(self.redis.exists(f'esc:primary:{key}'))
+        return self._writes.get(key, 0) > time.monotonic()
+
+    # Replica health
+
+    def choose_replica(self):
+        """Next replica within the lag budget, or None for the primary."""
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if self.lag(replica) <= self.max_lag:
+                return replica
+        return None
+
+    def lag(self, replica):
+        now = time.monotonic()
+        checked_at, lag = self._lags.get(replica, (None, None))
+        if checked_at is None or now - checked_at >= self.check_interval:
+            from app import db
+            try:
+                lag = self.measure_lag(db.engines[replica])
+            except Exception as e:
+                self.app.logger.warning('Replica %s unavailable: %s', replica, e)
+                lag = float('inf')
+            self._lags[replica] = (now, lag)
+        return lag
+
+    def measure_lag(self, engine):
+        """Replication delay of a replica in seconds."""
+        with engine.connect() as connection:
+            if engine.dialect.name == 'postgresql':
+                return float(connection.execute(POSTGRES_LAG_QUERY).scalar() or 0)
+            connection.execute(text('SELECT 1'))
+            return 0.0
+
+    def status(self):
+        status = {}
+        for replica in self.replicas:
+            lag = self._lags.get(replica, (None, None))[1]
+            status[replica] = {
+                'lag_seconds': lag if lag != float('inf') else None,
+                'in_rotation': lag is None or lag <= self.max_lag
+            }
+        return status
@@ -0,0 +1,90 @@
+"""
+Squad selection: which players a coach can pick for a match.
+
+Availability is computed by the database through the ``Player`` hybrid
+properties (status, contract dates, card suspensions, recent training
+attendance), so the whole pool, grouped by position, comes from a single
+query instead of loading every player and filtering on Python properties.
+"""
+
+from flask import current_app
+from sqlalchemy.orm import contains_eager
+
+from app import db
+from app.models import Player
+
+POSITIONS = tuple(Player.__table__.c.position.type.enums)
+
+
+class SquadCandidate:
+    """A player with the availability flags read in the same query."""
+
+    __slots__ = ('player', 'available', 'contract_running', 'suspended', 'attendance_rate')
+
+    def __init__(self, player, available, contract_running, suspended, attendance_rate):
+        self.player = player
+        self.available = bool(available)
+        self.contract_running = bool(contract_running)
+        self.suspended = bool(suspended)
+        self.attendance_rate = float(attendance_rate) if attendance_rate is not None else None
+
+    @property
+    def reasons(self):
+        """Why the player cannot be selected (empty when selectable)."""
+        reasons = []
+        if not self.available:
+            reasons.append(self.player.status)
+        if not self.contract_running:
+            reasons.append('no_active_contract')
+        if self.suspended:
+            reasons.append('card_suspension')
+        if self.attendance_rate is not None and self.attendance_rate < current_app.config.get('SQUAD_MIN_ATTENDANCE', 0.5):
+            reasons.append('low_training_attendance')
+        return reasons
+
+    @property
+    def selectable(self):
+        return not self.reasons
+
+
+def candidates(position=None, player_ids=None, include_unavailable=False):
+    """Players with their availability flags, one query.
+
+    Unless ``include_unavailable`` is set, only selectable players are
+    returned (filtered by ``Player.is_selectable`` in SQL).
+    """
+    query = db.session.query(
+        Player, Player.is_available, Player.contract_running, Player.is_suspended, Player.recent_attendance_rate
+    ).join(Player.user_account).options(contains_eager(Player.user_account)).filter(Player.status != 'retired')
+
+    if position:
+        query = query.filter(Player.position == position)
+    if player_ids is not None:
+        query = query.filter(Player.id.in_(player_ids))
+    if not include_unavailable:
+        query = query.filter(Player.is_selectable)
+
+    query = query.order_by(Player.position, Player.rating.desc(), Player.jersey_number, Player.id)
+    return [SquadCandidate(*row) for row in query]
+
+
+def available_pool(position=None, include_unavailable=False):
+    """Selectable candidates grouped by position (in ``POSITIONS`` order).
+
+    Returns ``(pool, unavailable)``; ``unavailable`` lists the other
+    players with their reasons when ``include_unavailable`` is set.
+    """
+    pool = {name: [] for name in POSITIONS if position in (None, name)}
+    unavailable = []
+    for candidate in candidates(position=position, include_unavailable=include_unavailable):
+        if candidate.selectable:
+            pool[candidate.player.position].append(candidate)
+        else:
+            unavailable.append(candidate)
+    return pool, unavailable
+
+
+def unavailable_ids(player_ids):
+    """The ids of ``player_ids`` that cannot be selected (unknown ids included)."""
+    selectable = {candidate.player.id for candidate in candidates(player_ids=player_ids)}
+    return [player_id for player_id in player_ids if player_id not in selectable]
@@ -0,0 +1,182 @@
+import threading
+import time
+from functools import wraps
+
+from flask import g, jsonify
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+
+from app.services.permissions import ROLE_MASKS, allows, permission_bit
+
+
+def token_claims(user):
+    """Authorization claims embedded in a user's access tokens.
+
+    ``issued_at`` is a fractional timestamp, so a token issued right after
+    a revocation is told apart from one issued just before in the same
+    second (the registered ``iat`` claim stays an integer NumericDate).
+    """
+    player = user.player_profile if user.role == 'player' else None
+    return {
+        'role': user.role,
+        'player_id': player.id if player is not None else None,
+        'is_active': user.is_active,
+        'issued_at': time.time(),
+    }
+
+
+class TokenClaims:
+    """The caller as described by the access token, without a user query.
+
+    Offers the ``is_admin``/``is_coach``... flags of ``User`` so the
+    blueprints' permission checks accept either.
+    """
+
+    __slots__ = ('id', 'role', 'player_id', 'is_active')
+
+    def __init__(self, payload):
+        self.id = payload.get('sub')
+        self.role = payload.get('role')
+        self.player_id = payload.get('player_id')
+        self.is_active = bool(payload.get('is_active'))
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def is_coach(self):
+        return self.role == 'coach'
+
+    @property
+    def is_player(self):
+        return self.role == 'player'
+
+    @property
+    def is_staff(self):
+        return self.role == 'staff'
+
+    def has_permission(self, permission):
+        return allows(self.role, permission)
+
+
+def current_claims():
+    """Claims of the verified access token of the current request."""
+    claims = g.get('token_claims')
+    if claims is None:
+        claims = g.token_claims = TokenClaims(get_jwt())
+    return claims
+
+
+def requires(*roles, permission=None, error='Permission denied', locations=None):
+    """Authorize a view from the access token claims alone.
+
+    ``@requires()`` accepts any active user, ``@requires('admin', 'coach')``
+    one of the roles and ``@requires(permission='finances.approve')`` any
+    role the policy (``app.services.permissions``) grants the permission;
+    others get a 403 with ``error``. The permission's bit is looked up
+    here, once, so unknown names fail when the route is declared. Tokens
+    issued before the claims existed get a 401 so the client refreshes them.
+    ``locations`` overrides where the token is looked for (``JWT_TOKEN_LOCATION``).
+    """
+    bit = permission_bit(permission) if permission else 0
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request(locations=locations)
+            claims = current_claims()
+            if claims.role is None:
+                return jsonify({'error': 'Token outdated', 'message': 'Refresh the access token'}), 401
+            if not claims.is_active:
+                return jsonify({'error': 'Account is deactivated'}), 401
+            if (roles and claims.role not in roles) or (bit and not ROLE_MASKS.get(claims.role, 0) & bit):
+                return jsonify({'error': error}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TokenRevocation:
+    """Revoked tokens (logout) and users whose claims changed.
+
+    Changing a user's role, active flag or player profile revokes every
+    access token issued to them until then, so outdated claims stop being
+    honoured; the client refreshes and gets a token built from the
+    database again. Refresh tokens stay valid (refresh re-reads the user).
+
+    Entries expire with the tokens they cover. With
+    ``TOKEN_REVOCATION_BACKEND=redis`` they are shared by every worker and
+    a check is a single ``MGET``.
+    """
+
+    def __init__(self, app=None):
+        self.backend = 'memory'
+        self.redis_url = None
+        self.access_expires = 3600
+        self._redis = None
+        self._tokens = {}
+        self._users = {}
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.backend = app.config.get('TOKEN_REVOCATION_BACKEND', 'memory')
+        self.redis_url = app.config.get('REDIS_URL')
+        expires = app.config.get('JWT_ACCESS_TOKEN_EXPIRES')
+        self.access_expires = int(expires.total_seconds()) if expires else 3600
+        self._tokens = {}
+        self._users = {}
+        app.extensions['token_revocation'] = self
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url or 'redis://localhost:6379/0')
+        return self._redis
+
+    def revoke_token(self, jti, expires_at):
+        ttl = max(1, int(expires_at - time.time()))
+        if self.backend == 'redis':
+            self.redis.set(f'esc:revoked:jti:{jti}', 1, ex=ttl)
+            return
+        with self._lock:
+            self._prune()
+            self._tokens[jti] = time.time() + ttl
+
+    def revoke_user(self, user_id):
+        """Revoke the access tokens issued to a user so far."""
+        revoked_at = time.time()
+        if self.backend == 'redis':
+            self.redis.set(f'esc:revoked:user:{user_id}', revoked_at, ex=self.access_expires)
+            return
+        with self._lock:
+            self._prune()
+            self._users[str(user_id)] = revoked_at
+
+    def is_revoked(self, payload):
+        user_id = payload.get('sub')
+        if self.backend == 'redis':
+            token, revoked_at = self.redis.mget(f'esc:revoked:jti:{payload["jti"]}',
+                                                f'esc:revoked:user:{user_id}')
+            revoked_at = float(revoked_at) if revoked_at is not None else None
+        else:
+            token = self._tokens.get(payload['jti'])
+            revoked_at = self._users.get(str(user_id))
+        if token is not None:
+            return True
+        if revoked_at is None or payload.get('type') != 'access':
+            return False
+        # Without issued_at, a token issued in the second of the revocation counts as revoked
+        return payload.get('issued_at', payload['iat']) < revoked_at
+
+    def _prune(self):
+        now = time.time()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + 60
+        self._tokens = {jti: expires for jti, expires in self._tokens.items() if expires > now}
+        self._users = {user: at for user, at in self._users.items() if at + self.access_expires > now}
@@ -0,0 +1,117 @@
+"""
+Background tasks run by the job queue.
+
+Handlers enqueue these after committing, so slow side effects (SMTP,
+image resizing, rating recomputation) never add to request latency.
+"""
+
+from flask import current_app
+from flask_mail import Message
+
+from app import job_queue, mail, media_store, notification_dispatcher
+from app.models import User, Player, Match, Training, Finance, News
+from app.services import ratings
+from app.services.notifications import NotificationTemplate, Recipient
+
+NEWS_PUBLISHED = NotificationTemplate(
+    subject='[ESC] $title',
+    body='Hello $first_name,\n\n$title\n\n$excerpt\n'
+)
+
+TRAINING_SCHEDULED = NotificationTemplate(
+    subject='[ESC] Training: $title on $date',
+    body=('Hello $first_name,\n\nA $type training session is scheduled on $date '
+          'from $start_time to $end_time at $location.\n\n$description\n')
+)
+
+SQUAD_ANNOUNCED = NotificationTemplate(
+    subject='[ESC] Squad announced: $fixture',
+    body=('Hello $first_name,\n\nYou have been selected for $fixture on $date '
+          'at $location.\n')
+)
+
+def active_player_users(player_ids=None):
+    """Active users with a player profile, optionally restricted to some players."""
+    query = User.query.join(Player, Player.user_id == User.id).filter(User.is_active.is_(True))
+    if player_ids is not None:
+        query = query.filter(Player.id.in_(player_ids))
+    return query.all()
+
+@job_queue.task()
+def update_player_rating(player_id):
+    """Recompute a player's rating after new match statistics."""
+    return ratings.refresh([player_id]).get(player_id)
+
+@job_queue.task()
+def refresh_squad_ratings():
+    """Recompute every player's rating after a match result (opponent strengths change)."""
+    return len(ratings.refresh())
+
+@job_queue.task()
+def generate_image_variants(content_hash, extension):
+    """Resize an uploaded image into the configured variants."""
+    if media_store.variants_ready(content_hash):
+        return False
+    media_store.generate_variants(content_hash, extension)
+    return True
+
+@job_queue.task()
+def notify_news_published(news_id):
+    """Email active users about a newly published article."""
+    article = News.query.get(news_id)
+    if not article or not article.is_published:
+        return None
+
+    users = User.query.filter(User.is_active.is_(True)).all()
+    result = notification_dispatcher.dispatch(
+        NEWS_PUBLISHED, [Recipient.from_user(user) for user in users],
+        title=article.title, excerpt=article.excerpt or ''
+    )
+    return result.to_dict()
+
+@job_queue.task()
+def notify_training_scheduled(training_id):
+    """Email every active player about a new training session."""
+    training = Training.query.get(training_id)
+    if not training:
+        return None
+
+    result = notification_dispatcher.dispatch(
+        TRAINING_SCHEDULED, [Recipient.from_user(user) for user in active_player_users()],
+        title=training.title, type=training.type, location=training.location,
+        date=training.date.strftime('%d/%m/%Y'),
+        start_time=training.start_time.strftime('%H:%M'),
+        end_time=training.end_time.strftime('%H:%M'),
+        description=training.description or ''
+    )
+    return result.to_dict()
+
+@job_queue.task()
+def notify_squad_announced(match_id, player_ids):
+    """Email the selected players about a match squad."""
+    match = Match.query.get(match_id)
+    if not match or not player_ids:
+        return None
+
+    fixture = f'ESC vs {match.opponent}' if match.is_home else f'{match.opponent} vs ESC'
+    result = notification_dispatcher.dispatch(
+        SQUAD_ANNOUNCED, [Recipient.from_user(user) for user in active_player_users(player_ids)],
+        fixture=fixture, location=match.location, date=match.date.strftime('%d/%m/%Y %H:%M')
+    )
+    return result.to_dict()
+
+@job_queue.task()
+def notify_finance_approved(finance_id):
+    """Tell the creator of a transaction that it was approved."""
+    finance = Finance.query.get(finance_id)
+    if not finance or not finance.creator or finance.status != 'approved':
+        return
+    if 'mail' not in current_app.extensions:
+        return
+
+    mail.send(Message(
+        subject=f'[ESC] Transaction approved: {finance.title}',
+        recipients=[finance.creator.email],
+        body=(f"Your transaction \"{finance.title}\" ({finance.amount} {finance.currency}) "
+              f"was approved on {finance.approval_date:%Y-%m-%d}.")
+    ))
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for the ESC Football App
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 2
+
+Public news and match reads are served by async handlers; every other
+route is served by the regular Flask application.
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.asgi import create_asgi_app
+
+flask_app = create_app(os.getenv('FLASK_ENV', 'production'))
+application = create_asgi_app(flask_app)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+ASGI vs WSGI benchmark for the public read endpoints.
+
+Seeds a database (a SQLite file unless --database-url is given), then
+starts in turn:
+
+* the current deployment: gunicorn with sync workers (``run:app``),
+* the ASGI deployment: uvicorn serving ``asgi:application``,
+
+and drives each with N concurrent keep-alive clients for a fixed duration,
+reporting requests/s and latency percentiles. Sync gunicorn workers close
+the connection after every response, so its clients reconnect as browsers
+would.
+
+Usage:
+    python -m benchmarks.bench_asgi [--clients 500] [--duration 10] [--workers 4]
+                                    [--path /api/news/recent?limit=10]
+
+The load generator is a single asyncio process sharing the machine with
+the servers, so absolute numbers are pessimistic; compare the two rows.
+The async path pays off when requests wait on I/O (a networked PostgreSQL,
+slow clients): point --database-url at a scratch PostgreSQL database to
+measure that. With SQLite on a single core both modes are CPU-bound.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def seed(database_url, articles):
+    from app import create_app, db
+    from app.models import User, News
+
+    app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': database_url})
+    with app.app_context():
+        db.create_all()
+        author = User(username='bench', email='bench@esc.tn', password='bench',
+                      first_name='Bench', last_name='Mark', role='admin')
+        db.session.add(author)
+        db.session.commit()
+        for i in range(articles):
+            article = News(title=f'Article {i}', content='Lorem ipsum dolor sit amet. ' * 80,
+                           author_id=author.id, category='club_news')
+            article.published = True
+            article.published_at = datetime.utcnow()
+            db.session.add(article)
+            article.save_with_unique_slug()
+        db.session.commit()
+
+
+async def client(host, port, path, deadline, latencies, errors):
+    request = f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n'.encode()
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b'\r\n\r\n')
+            headers = head.decode('latin-1').lower()
+            length = int(headers.split('content-length:')[1].split('\r\n')[0])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if 'connection: close' in headers:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, IndexError, ValueError):
+            errors.append(1)
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def load(host, port, path, clients, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(client(host, port, path, deadline, latencies, errors) for _ in range(clients)))
+    return latencies, len(errors)
+
+
+def report(label, latencies, errors, duration):
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float('nan')
+
+    print(f'  {label:<26} {len(latencies) / duration:9,.0f} req/s  p50 {percentile(0.50):7.1f} ms  '
+          f'p95 {percentile(0.95):7.1f} ms  p99 {percentile(0.99):7.1f} ms  errors {errors}')
+
+
+def wait_for(port, timeout=30):
+    import socket
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not start')
+
+
+def run_server(command, port, env, args):
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(port)
+        asyncio.run(load('127.0.0.1', port, args.path, 20, 1))  # warm up
+        return asyncio.run(load('127.0.0.1', port, args.path, args.clients, args.duration))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--articles', type=int, default=200)
+    parser.add_argument('--path', default='/api/news/recent?limit=10')
+    parser.add_argument('--database-url', help='Scratch database to seed (default: temporary SQLite file)')
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if not database_url:
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='esc-asgi-bench-'), 'bench.db')
+    seed(database_url, args.articles)
+
+    env = dict(os.environ, DATABASE_URL=database_url, FLASK_ENV='production', RATELIMIT_ENABLED='False')
+    print(f'{args.clients} keep-alive clients, {args.duration:.0f}s, GET {args.path}')
+
+    latencies, errors = run_server(
+        [sys.executable, '-m', 'gunicorn', '--bind', '127.0.0.1:5101', '--workers', str(args.workers),
+         '--log-level', 'warning', 'run:app'], 5101, env, args)
+    report(f'gunicorn sync x{args.workers}', latencies, errors, args.duration)
+
+    latencies, errors = run_server(
+        [sys.executable, '-m', 'uvicorn', 'asgi:application', '--port', '5102', '--workers', str(args.workers),
+         '--log-level', 'warning', '--no-access-log'], 5102, env, args)
+    report(f'uvicorn ASGI x{args.workers}', latencies, errors, args.duration)
+
+
+if __name__ == '__main__':
+    main()
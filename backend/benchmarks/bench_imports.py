@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Import-time report for each process type, driven by ``python -X importtime``.
+
+Every scenario runs in a fresh interpreter, the way the process really
+starts:
+
+* ``wsgi``:    gunicorn/uwsgi importing ``run:app`` (all blueprints),
+* ``worker``:  ``worker.py`` building its app (tasks, no HTTP routes),
+* ``cli``:     ``flask init-db`` and friends (models only),
+* ``cli db``:  ``flask db upgrade`` (adds Flask-Migrate/Alembic).
+
+For each one the report shows the total import time, the modules loaded,
+the wall time until the app is ready and the top-level packages costing the
+most, so a new eager import shows up as a new line here. ``--check`` exits
+non-zero when a scenario goes over its cold-start budget: the time until
+the app is ready, in ms, measured on a single-core container (scale with
+``--budget-scale`` on slower machines). Module bodies that run code at import
+(``run.py`` creating the app) count as import time.
+
+Usage:
+    python -m benchmarks.bench_imports [--runs 5] [--top 8] [--check]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = [
+    ('wsgi', 'import run', {}),
+    ('worker', 'import worker; worker.create_worker_app()', {}),
+    ('cli', "import sys; sys.argv = ['flask', 'init-db']; from app import create_app; create_app()",
+     {'FLASK_RUN_FROM_CLI': 'true'}),
+    ('cli db', "import sys; sys.argv = ['flask', 'db', 'upgrade']; from app import create_app; create_app()",
+     {'FLASK_RUN_FROM_CLI': 'true'}),
+]
+
+# Cold-start budgets: ms until the app is ready
+BUDGETS = {
+    'wsgi': 800,
+    'worker': 750,
+    'cli': 700,
+    'cli db': 950,
+}
+
+
+def parse_importtime(stderr):
+    """Return (total µs, modules, self µs per top-level package)."""
+    total = 0
+    modules = 0
+    by_package = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules += 1
+        package = name.strip().split('.')[0]
+        by_package[package] += int(self_us)
+        if name[1:] == name.strip():  # not nested under another import
+            total += int(cumulative_us)
+    return total, modules, by_package
+
+
+def sample(code, extra_env):
+    env = dict(os.environ, DATABASE_URL='sqlite://', PYTHONDONTWRITEBYTECODE='1', **extra_env)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return (wall,) + parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8)
+    parser.add_argument('--check', action='store_true', help='Exit with status 1 when over budget')
+    parser.add_argument('--budget-scale', type=float, default=1.0)
+    args = parser.parse_args()
+
+    over_budget = []
+    for label, code, extra_env in SCENARIOS:
+        samples = [sample(code, extra_env) for _ in range(args.runs)]
+        wall = statistics.median(s[0] for s in samples) * 1000
+        imports = statistics.median(s[1] for s in samples) / 1000
+        budget = BUDGETS[label] * args.budget_scale
+        packages = defaultdict(list)
+        for s in samples:
+            for package, self_us in s[3].items():
+                packages[package].append(self_us)
+
+        status = 'ok' if wall <= budget else 'OVER BUDGET'
+        print(f'{label}: ready after {wall:.0f} ms (budget {budget:.0f} ms, {status}), '
+              f'imports {imports:.0f} ms, {samples[-1][2]} modules')
+        ranked = sorted(packages.items(), key=lambda item: -statistics.median(item[1]))
+        for package, values in ranked[:args.top]:
+            print(f'    {package:<24} {statistics.median(values) / 1000:7.1f} ms')
+        if wall > budget:
+            over_budget.append(label)
+
+    if args.check and over_budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Media serving benchmark: send_from_directory vs the media store endpoint.
+
+Stores a generated image in a temporary media root and measures requests/s
+through the WSGI stack for:
+
+* the plain ``send_from_directory`` view the app used before,
+* the media endpoint sending the file itself (``wsgi.file_wrapper``),
+* the media endpoint in ``MEDIA_ACCEL=nginx`` mode (headers only),
+* a browser revalidation (``If-None-Match`` -> 304) and a byte-range request.
+
+The Cache-Control header of each response is printed too: with the
+immutable policy, browsers skip the request entirely on repeat views.
+
+Usage:
+    python -m benchmarks.bench_media [--size-kb 1024] [--repeat 500]
+"""
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from flask import send_from_directory
+
+from app import create_app, media_store
+
+
+def make_image(size_kb):
+    """A JPEG of roughly size_kb kilobytes (random pixels compress badly)."""
+    from PIL import Image
+
+    side = 256
+    while True:
+        image = Image.frombytes('RGB', (side, side), os.urandom(side * side * 3))
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=95)
+        if buffer.tell() >= size_kb * 1024:
+            buffer.seek(0)
+            return buffer
+        side *= 2 if buffer.tell() * 4 < size_kb * 1024 else 1
+        side += 64
+
+
+def measure(label, client, url, repeat, headers=None):
+    response = client.get(url, headers=headers)
+    response.close()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = client.get(url, headers=headers)
+        body = response.get_data()
+        response.close()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f'  {label:<30} {elapsed * 1e6:9.1f} us/req  {1 / elapsed:9,.0f} req/s  '
+          f'{response.status_code}  {len(body):>9,} bytes  '
+          f"Cache-Control: {response.headers.get('Cache-Control', '-')}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-kb', type=int, default=1024)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    instance = tempfile.mkdtemp(prefix='esc-media-bench-')
+    try:
+        app = create_app('testing')
+        app.instance_path = instance
+        media_store.init_app(app)
+
+        app.add_url_rule('/naive/<path:filename>', 'naive_media',
+                         lambda filename: send_from_directory(media_store.root, filename))
+
+        with app.app_context():
+            stored = media_store.save_image(make_image(args.size_kb))
+        path = stored.relative_path
+        url = media_store.url_for(path)
+        print(f'File: {path} ({stored.size:,} bytes)')
+
+        client = app.test_client()
+        baseline = measure('send_from_directory', client, f'/naive/{path}', args.repeat)
+        optimized = measure('media endpoint (file_wrapper)', client, url, args.repeat)
+
+        app.config['MEDIA_ACCEL'] = 'nginx'
+        accel = measure('media endpoint (X-Accel)', client, url, args.repeat)
+        app.config['MEDIA_ACCEL'] = None
+
+        measure('revalidation (304)', client, url, args.repeat,
+                headers={'If-None-Match': f'"{stored.content_hash}"'})
+        measure('range 0-65535 (206)', client, url, args.repeat,
+                headers={'Range': 'bytes=0-65535'})
+
+        print(f'  speedup file_wrapper: {baseline / optimized:.2f}x, X-Accel: {baseline / accel:.2f}x')
+    finally:
+        shutil.rmtree(instance, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
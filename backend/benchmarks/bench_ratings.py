@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Rating refresh benchmark: one player at a time vs the whole squad at once.
+
+Builds a squad with a season of rated appearances in an in-memory SQLite
+database, then compares refreshing every player the way the match
+statistics task used to (load the player's last ten statistics, average
+them, commit) with ``ratings.refresh()``, which loads every rated
+appearance in one query and writes all ratings with one bulk UPDATE.
+
+Usage:
+    python -m benchmarks.bench_ratings [--players 30] [--matches 38] [--repeat 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import User, Player, Match, PlayerStats
+from app.services import ratings
+
+OPPONENTS = ('CA', 'EST', 'ESS', 'CSS', 'USM', 'ST', 'CAB', 'USBG', 'ASM', 'JSK')
+
+
+def seed(players, matches):
+    """A squad with a season of matches, most players rated in most of them."""
+    users = [User(username=f'player{i}', email=f'player{i}@esc.tn', password='bench',
+                  first_name='Player', last_name=str(i), role='player') for i in range(players)]
+    db.session.add_all(users)
+    db.session.flush()
+    squad = [Player(user_id=user.id, position='CM', birth_date=date(1998, 5, 1), nationality='Tunisia')
+             for user in users]
+    db.session.add_all(squad)
+
+    fixtures = [Match(opponent=OPPONENTS[i % len(OPPONENTS)], date=datetime.now() - timedelta(days=7 * (i + 1)),
+                      location='Stade de Chorbane', result=('win', 'draw', 'loss')[i % 3]) for i in range(matches)]
+    db.session.add_all(fixtures)
+    db.session.flush()
+
+    db.session.add_all(
+        PlayerStats(player_id=player.id, match_id=match.id, minutes_played=90 if (i + j) % 3 else 30,
+                    performance_rating=None if (i + j) % 7 == 0 else 5 + (i * j) % 5)
+        for i, player in enumerate(squad) for j, match in enumerate(fixtures) if (i + j) % 4
+    )
+    db.session.commit()
+
+
+def per_player():
+    """The previous algorithm: each player's last ten statistics, one commit each."""
+    for player in Player.query.all():
+        recent_stats = player.stats.order_by(PlayerStats.id.desc()).limit(10).all()
+        if not recent_stats:
+            continue
+        total_rating = sum(stat.performance_rating for stat in recent_stats if stat.performance_rating)
+        if total_rating > 0:
+            player.rating = total_rating / len(recent_stats)
+            db.session.commit()
+
+
+def measure(label, func, repeat):
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    func()  # warm up
+    event.listen(db.engine, 'before_cursor_execute', count)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        db.session.expire_all()
+        func()
+    elapsed = (time.perf_counter() - start) / repeat
+    event.remove(db.engine, 'before_cursor_execute', count)
+
+    print(f'  {label:<20} {elapsed * 1000:8.2f} ms  {len(statements) // repeat:>5} statements')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=30)
+    parser.add_argument('--matches', type=int, default=38)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed(args.players, args.matches)
+
+        print(f'{args.players} players, {args.matches} matches:')
+        baseline = measure('per player', per_player, args.repeat)
+        optimized = measure('squad refresh', ratings.refresh, args.repeat)
+        print(f'  speedup: {baseline / optimized:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
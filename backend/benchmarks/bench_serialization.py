@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark: to_dict + jsonify vs precompiled serializers.
+
+Builds 1,000-row pages of Finance and PlayerStats in an in-memory SQLite
+database and measures rows/second for both paths.
+
+Usage:
+    python -m benchmarks.bench_serialization [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from flask import jsonify
+from sqlalchemy.orm import joinedload
+
+from app import create_app, db
+from app.models import User, Player, Match, PlayerStats, Finance
+from app.serializers import dumps, orjson, finance_serializer, player_stats_serializer
+
+
+def seed(rows):
+    """Create one page worth of Finance and PlayerStats rows."""
+    admin = User(username='bench', email='bench@esc.tn', password='bench',
+                 first_name='Bench', last_name='Mark', role='admin')
+    db.session.add(admin)
+    db.session.flush()
+
+    player = Player(user_id=admin.id, position='ST', birth_date=date(1998, 5, 1), nationality='Tunisia')
+    db.session.add(player)
+    db.session.flush()
+
+    start = datetime(2024, 1, 1, 16, 0)
+    matches = [Match(opponent=f'Opponent {i}', date=start + timedelta(days=i), location='Stade de Chorbane')
+               for i in range(rows)]
+    db.session.add_all(matches)
+    db.session.flush()
+
+    db.session.add_all(
+        PlayerStats(player_id=player.id, match_id=match.id, minutes_played=90, goals=i % 3,
+                    assists=i % 2, shots=5, shots_on_target=3, passes_completed=40,
+                    passes_attempted=50, performance_rating=6.5 + (i % 4) / 2)
+        for i, match in enumerate(matches)
+    )
+    db.session.add_all(
+        Finance(type='income' if i % 2 else 'expense',
+                category='sponsorship' if i % 2 else 'equipment',
+                amount=Decimal('1250.50') + i, title=f'Transaction {i}',
+                transaction_date=date(2024, 1, 1) + timedelta(days=i % 365),
+                due_date=date(2024, 2, 1), created_by=admin.id, description='Benchmark row')
+        for i in range(rows)
+    )
+    db.session.commit()
+
+
+def measure(label, func, rows, repeat):
+    func()  # warm up (compiles plans, loads lazy attributes)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        size = len(func())
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f'  {label:<28} {elapsed * 1000:8.2f} ms/page  {rows / elapsed:12,.0f} rows/s  {size:>9,} bytes')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context(), app.test_request_context():
+        db.create_all()
+        seed(args.rows)
+
+        finances = Finance.query.options(
+            joinedload(Finance.creator), joinedload(Finance.approver),
+            joinedload(Finance.related_player), joinedload(Finance.related_match)
+        ).all()
+        stats = PlayerStats.query.options(joinedload(PlayerStats.player)).all()
+
+        print(f"JSON backend: {'orjson' if orjson else 'json (stdlib)'}")
+        for name, items, serializer, flags in (
+            ('Finance', finances, finance_serializer, {'include_sensitive': True}),
+            ('PlayerStats', stats, player_stats_serializer, {}),
+        ):
+            print(f'{name} ({len(items)} rows):')
+            baseline = measure('to_dict + jsonify', lambda: jsonify(
+                [item.to_dict(**flags) for item in items]).get_data(), len(items), args.repeat)
+            optimized = measure('serializer + dumps', lambda: dumps(
+                serializer.dump_many(items, **flags)), len(items), args.repeat)
+            print(f'  speedup: {baseline / optimized:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
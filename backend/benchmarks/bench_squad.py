@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Squad selection benchmark: Python availability checks vs one SQL query.
+
+Builds a squad of players with match statistics and training attendance
+in an in-memory SQLite database, then compares loading every player and
+filtering on the Python side of the ``Player`` hybrids (what clients did
+with ``is_available``/``contract_active``) with ``squad.available_pool()``,
+which filters on their SQL side.
+
+Usage:
+    python -m benchmarks.bench_squad [--players 60] [--matches 30] [--repeat 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import User, Player, Match, PlayerStats, Training, TrainingAttendance
+from app.services import squad
+
+POSITIONS = ('GK', 'CB', 'LB', 'RB', 'CDM', 'CM', 'CAM', 'LW', 'RW', 'ST')
+
+
+def seed(players, matches):
+    """A squad with a season of matches and two weeks of trainings."""
+    today = date.today()
+    users = [User(username=f'player{i}', email=f'player{i}@esc.tn', password='bench',
+                  first_name='Player', last_name=str(i), role='player') for i in range(players)]
+    db.session.add_all(users)
+    db.session.flush()
+
+    squad_players = [
+        Player(user_id=user.id, position=POSITIONS[i % len(POSITIONS)], birth_date=date(1998, 5, 1),
+               nationality='Tunisia', jersey_number=i + 1, rating=6 + (i % 30) / 10,
+               status='injured' if i % 12 == 0 else 'active',
+               contract_start=today - timedelta(days=300),
+               contract_end=today + timedelta(days=-10 if i % 15 == 0 else 400))
+        for i, user in enumerate(users)
+    ]
+    db.session.add_all(squad_players)
+
+    fixtures = [Match(opponent=f'Opponent {i}', date=datetime.now() - timedelta(days=7 * (i + 1)),
+                      location='Stade de Chorbane', result='win') for i in range(matches)]
+    db.session.add_all(fixtures)
+    trainings = [Training(title=f'Session {i}', date=today - timedelta(days=i + 1), start_time=dt_time(9),
+                          end_time=dt_time(11), location='Field') for i in range(10)]
+    db.session.add_all(trainings)
+    db.session.flush()
+
+    db.session.add_all(
+        PlayerStats(player_id=player.id, match_id=match.id, minutes_played=90,
+                    yellow_cards=1 if (i + j) % 4 == 0 else 0, red_cards=1 if (i + j) % 40 == 0 else 0)
+        for i, player in enumerate(squad_players) for j, match in enumerate(fixtures)
+    )
+    db.session.add_all(
+        TrainingAttendance(training.id, player.id, attended=(i + j) % 5 != 0 and i % 9 != 0)
+        for i, player in enumerate(squad_players) for j, training in enumerate(trainings)
+    )
+    db.session.commit()
+
+
+def python_pool():
+    """Load every player and filter on the Python side of the hybrids."""
+    pool = {}
+    for player in Player.query.all():
+        if player.is_selectable:
+            pool.setdefault(player.position, []).append(player)
+    return pool
+
+
+def sql_pool():
+    """Selectable players from a single query on the SQL side of the hybrids."""
+    pool, _ = squad.available_pool()
+    return {name: [candidate.player for candidate in candidates] for name, candidates in pool.items()}
+
+
+def measure(label, func, repeat):
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    func()  # warm up
+    event.listen(db.engine, 'before_cursor_execute', count)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        db.session.expire_all()
+        pool = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    event.remove(db.engine, 'before_cursor_execute', count)
+
+    selected = sum(len(players) for players in pool.values())
+    print(f'  {label:<20} {elapsed * 1000:8.2f} ms  {len(statements) // repeat:>5} queries  {selected:>4} selectable')
+    return elapsed, {player.id for players in pool.values() for player in players}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=60)
+    parser.add_argument('--matches', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed(args.players, args.matches)
+
+        print(f'{args.players} players, {args.matches} matches:')
+        baseline, expected = measure('python filtering', python_pool, args.repeat)
+        optimized, selected = measure('sql hybrids', sql_pool, args.repeat)
+        assert selected == expected, 'SQL and Python availability disagree'
+        print(f'  speedup: {baseline / optimized:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark: import of the ``app`` package plus ``create_app``.
+
+Each sample is a fresh interpreter (so nothing is cached in ``sys.modules``),
+timing the package import and app creation separately for:
+
+* ``testing``: the config the test suite uses,
+* ``testing``, no blueprints: what a worker or CLI command needs,
+* ``development`` without mail/CORS settings.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 15]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app(sys.argv[1], json.loads(sys.argv[2]))
+created = time.perf_counter()
+print(json.dumps({'import': imported - start, 'create_app': created - imported,
+                  'modules': len(sys.modules)}))
+'''
+
+SCENARIOS = [
+    ('testing', 'testing', {}),
+    ('testing, no blueprints', 'testing', {'BLUEPRINTS': []}),
+    ('development, no mail/CORS', 'development', {'MAIL_SERVER': None, 'CORS_ORIGINS': []}),
+]
+
+
+def sample(config_name, overrides):
+    env = dict(os.environ, DATABASE_URL='sqlite://', PYTHONDONTWRITEBYTECODE='1')
+    output = subprocess.run([sys.executable, '-c', PROBE, config_name, json.dumps(overrides)],
+                            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args()
+
+    print(f'median of {args.runs} fresh interpreters')
+    for label, config_name, overrides in SCENARIOS:
+        samples = [sample(config_name, overrides) for _ in range(args.runs)]
+        imports = statistics.median(s['import'] for s in samples) * 1000
+        creates = statistics.median(s['create_app'] for s in samples) * 1000
+        print(f'  {label:<28} import {imports:7.1f} ms  create_app {creates:7.1f} ms  '
+              f'total {imports + creates:7.1f} ms  modules {samples[-1]["modules"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""news text metrics and list filter indexes
+
+Adds News.word_count and News.reading_time, and an index on every column
+the list filters treat as indexed (``index=True``, see app.filters).
+Databases created by ``flask init-db`` after these were declared already
+have them, and database/init.sql's create_performance_indexes() creates
+the same indexes under these names, so each change is only applied where
+it is missing. Run ``flask backfill-news-metrics`` afterwards to fill the
+counts of existing articles.
+
+Revision ID: a953c6e69b05
+Revises:
+Create Date: 2026-10-19 03:50:44.894706
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a953c6e69b05'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# Same names as database/init.sql
+INDEXES = {
+    'users': ('role', 'created_at'),
+    'players': ('position', 'status', 'nationality'),
+    'matches': ('date', 'competition', 'result', 'opponent'),
+    'trainings': ('date', 'type', 'completed'),
+    'finances': ('transaction_date', 'type', 'category', 'status'),
+    'news': ('published', 'published_at', 'category', 'is_featured', 'is_breaking'),
+}
+
+
+def news_columns():
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns('news')}
+
+
+def indexed_columns(table):
+    """Columns already leading an index of ``table``, whatever its name."""
+    return {index['column_names'][0] for index in sa.inspect(op.get_bind()).get_indexes(table)
+            if index['column_names']}
+
+
+def upgrade():
+    existing = news_columns()
+    with op.batch_alter_table('news') as batch_op:
+        if 'word_count' not in existing:
+            batch_op.add_column(sa.Column('word_count', sa.Integer(), server_default='0', nullable=False))
+        if 'reading_time' not in existing:
+            batch_op.add_column(sa.Column('reading_time', sa.Integer(), server_default='1', nullable=False))
+
+    for table, columns in INDEXES.items():
+        existing = indexed_columns(table)
+        for column in columns:
+            if column not in existing:
+                op.create_index(f'idx_{table}_{column}', table, [column])
+
+
+def downgrade():
+    for table, columns in INDEXES.items():
+        existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+        for column in columns:
+            if f'idx_{table}_{column}' in existing:
+                op.drop_index(f'idx_{table}_{column}', table_name=table)
+
+    existing = news_columns()
+    with op.batch_alter_table('news') as batch_op:
+        for name in ('reading_time', 'word_count'):
+            if name in existing:
+                batch_op.drop_column(name)
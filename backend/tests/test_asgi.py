@@ -0,0 +1,111 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import httpx
+from flask_jwt_extended import create_access_token
+
+from app import async_db, create_app, db, token_revocation
+from app.asgi import create_asgi_app
+from app.models import Match, News, User
+from app.services.tokens import token_claims
+
+
+class AsgiParityTest(unittest.TestCase):
+    """The async handlers answer like the Flask views they stand in for."""
+
+    def setUp(self):
+        handle, self.database = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.database}',
+                                          'RATELIMIT_ENABLED': True,
+                                          'RATELIMITS': {'news.get_featured_news': ['2/minute']}})
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='coach', email='coach@esc.tn', password='Secret123',
+                        first_name='Co', last_name='Ach', role='coach')
+            db.session.add(user)
+            db.session.flush()
+            for index in range(12):
+                db.session.add(News(title=f'Report {index}', content='Match report ' * 30, author_id=user.id,
+                                    category='match_report' if index % 2 else 'club_news', published=True,
+                                    published_at=datetime.utcnow() - timedelta(hours=index),
+                                    is_featured=index < 3, is_breaking=index == 0))
+            db.session.add(Match(opponent='Next', date=datetime.now() + timedelta(days=3), location='Chorbane'))
+            db.session.add(Match(opponent='Last', date=datetime.now() - timedelta(days=3), location='Chorbane',
+                                 result='win', goals_for=2, goals_against=1))
+            db.session.commit()
+            self.user_id = user.id
+            self.token = create_access_token(identity=user.id, additional_claims=token_claims(user))
+        self.application = create_asgi_app(self.app)
+
+    def tearDown(self):
+        asyncio.run(async_db.dispose())
+        with self.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        os.remove(self.database)
+
+    def asgi_get(self, *requests):
+        async def fetch():
+            transport = httpx.ASGITransport(app=self.application, client=('10.0.0.1', 1234))
+            async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+                return [await client.get(path, headers=headers) for path, headers in requests]
+        return asyncio.run(fetch())
+
+    def assert_same(self, path, headers=None):
+        headers = headers or {}
+        asgi, = self.asgi_get((path, headers))
+        flask = self.client.get(path, headers=headers, environ_base={'REMOTE_ADDR': '10.0.0.2'})
+        self.assertEqual((asgi.status_code, asgi.json()), (flask.status_code, flask.get_json()), path)
+
+    def test_public_news(self):
+        for path in ('/api/news', '/api/news?page=2&per_page=5', '/api/news?category=match_report',
+                     '/api/news?fields=id,title', '/api/news?fields=nope', '/api/news?sort=nope',
+                     '/api/news/featured', '/api/news/breaking', '/api/news/recent?limit=4&category=club_news'):
+            self.assert_same(path)
+
+    def test_authenticated_matches(self):
+        bearer = {'Authorization': f'Bearer {self.token}'}
+        for path in ('/api/matches/upcoming', '/api/matches/results?limit=1'):
+            self.assert_same(path, bearer)
+            self.assert_same(path)
+            self.assert_same(path, {'Authorization': 'Bearer nope'})
+
+        with self.app.app_context():
+            expired = create_access_token(identity=self.user_id, expires_delta=timedelta(seconds=-1),
+                                          additional_claims={'role': 'coach', 'is_active': True})
+        self.assert_same('/api/matches/upcoming', {'Authorization': f'Bearer {expired}'})
+
+        token_revocation.revoke_user(self.user_id)
+        self.assert_same('/api/matches/upcoming', bearer)
+
+    def test_rate_limits(self):
+        responses = self.asgi_get(*[('/api/news/featured', {})] * 3)
+        self.assertEqual([response.status_code for response in responses], [200, 200, 429])
+        flask = [self.client.get('/api/news/featured', environ_base={'REMOTE_ADDR': '10.0.0.2'}) for _ in range(3)]
+        self.assertEqual(responses[2].json(), flask[2].get_json())
+        self.assertEqual(responses[2].headers['Retry-After'], flask[2].headers['Retry-After'])
+
+    def test_redis_checks_run_off_the_event_loop(self):
+        threads = []
+
+        def is_revoked(payload):
+            threads.append(threading.current_thread())
+            return False
+
+        token_revocation.backend = 'redis'
+        self.addCleanup(setattr, token_revocation, 'backend', 'memory')
+        with mock.patch.object(token_revocation, 'is_revoked', side_effect=is_revoked):
+            response, = self.asgi_get(('/api/matches/upcoming', {'Authorization': f'Bearer {self.token}'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from datetime import date, datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import Match, News, Player, User
+from app.services.tokens import token_claims
+
+
+class BatchLookupTest(unittest.TestCase):
+    """``?ids=`` loads many rows in one query, in request order."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            self.seed()
+
+    def seed(self):
+        self.users = {}
+        for role in ('admin', 'coach', 'player'):
+            user = User(username=role, email=f'{role}@esc.tn', password='Secret123',
+                        first_name=role.title(), last_name='User', role=role)
+            db.session.add(user)
+            db.session.flush()
+            self.users[role] = user.id
+        self.player_ids = []
+        for i in range(3):
+            user = User.query.get(self.users['player']) if i == 0 else User(
+                username=f'player{i}', email=f'player{i}@esc.tn', password='Secret123',
+                first_name='Player', last_name=str(i), role='player')
+            db.session.add(user)
+            db.session.flush()
+            player = Player(user_id=user.id, position='ST', birth_date=date(2000, 1, 1), nationality='TN',
+                            jersey_number=i + 1, salary=1000)
+            db.session.add(player)
+            db.session.flush()
+            self.player_ids.append(player.id)
+        self.match_ids = []
+        for i in range(3):
+            match = Match(opponent=f'Opponent {i}', date=datetime(2024, 5, i + 1), location='Chorbane')
+            db.session.add(match)
+            db.session.flush()
+            self.match_ids.append(match.id)
+        self.news_ids = []
+        for i, (published, author) in enumerate(((True, 'admin'), (False, 'coach'), (False, 'admin'))):
+            article = News(title=f'Article {i}', content='Content ' * 20, author_id=self.users[author],
+                           published=published, published_at=datetime.utcnow() - timedelta(hours=1))
+            db.session.add(article)
+            db.session.flush()
+            self.news_ids.append(article.id)
+        db.session.commit()
+        self.tokens = {role: create_access_token(identity=id, additional_claims=token_claims(User.query.get(id)))
+                       for role, id in self.users.items()}
+
+    def get(self, url, role=None):
+        headers = {'Authorization': f'Bearer {self.tokens[role]}'} if role else {}
+        return self.client.get(url, headers=headers)
+
+    def test_order_missing_ids_and_one_query(self):
+        statements = []
+        with self.app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+        ids = [self.match_ids[2], 999, self.match_ids[0], self.match_ids[2]]
+        response = self.get(f"/api/matches?ids={','.join(map(str, ids))}", 'coach')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual([match['id'] for match in data['matches']], [self.match_ids[2], self.match_ids[0]])
+        self.assertEqual(data['missing'], [999])
+        self.assertEqual(len([statement for statement in statements if 'FROM matches' in statement]), 1)
+
+        for query in ('ids=', 'ids=1,x', 'ids=' + ','.join(map(str, range(101)))):
+            with self.subTest(query=query):
+                self.assertEqual(self.get(f'/api/matches?{query}', 'coach').status_code, 400)
+
+    def test_per_row_permissions(self):
+        ids = ','.join(map(str, self.player_ids))
+        players = self.get(f'/api/players?ids={ids}', 'player').get_json()['players']
+        # Players see their own salary only, admins everyone's
+        self.assertEqual(['salary' in player for player in players], [True, False, False])
+        players = self.get(f'/api/players?ids={ids}', 'admin').get_json()['players']
+        self.assertTrue(all('salary' in player for player in players))
+
+        ids = ','.join(map(str, self.news_ids))
+        visible = {None: [self.news_ids[0]], 'player': [self.news_ids[0]],
+                   'coach': self.news_ids[:2], 'admin': self.news_ids}
+        for role, expected in visible.items():
+            with self.subTest(role=role):
+                data = self.get(f'/api/news?ids={ids}', role).get_json()
+                self.assertEqual([article['id'] for article in data['articles']], expected)
+                self.assertEqual(data['missing'], [id for id in self.news_ids if id not in expected])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import gzip
+import unittest
+from datetime import date, datetime
+from unittest.mock import patch
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import Finance, News, User
+from app.services import compression
+from app.services.compression import compression_metrics
+from app.services.tokens import token_claims
+
+
+class CompressionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing', {'COMPRESS_CACHE_TTL': 30})
+        self.client = self.app.test_client()
+        compression_metrics.reset()
+
+        with self.app.app_context():
+            db.create_all()
+            admin = User(username='admin', email='admin@esc.tn', password='Secret123', first_name='Ad', last_name='Min', role='admin')
+            db.session.add(admin)
+            db.session.flush()
+            for index in range(20):
+                db.session.add(News(title=f'Match report {index}', slug=f'match-report-{index}',
+                                    content='The team played well and won the match. ' * 5,
+                                    category='match_report', author_id=admin.id, published=True,
+                                    published_at=datetime.utcnow()))
+                db.session.add(Finance(type='expense', category='equipment', amount=120, title=f'Balls {index}',
+                                       transaction_date=date(2024, 1, 1), created_by=admin.id))
+            db.session.commit()
+            self.token = create_access_token(identity=admin.id, additional_claims=token_claims(admin))
+
+    def test_gzip_is_negotiated_and_small_bodies_are_skipped(self):
+        response = self.client.get('/api/news', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(len(gzip.decompress(response.data)), len(self.client.get('/api/news').data))
+        self.assertNotIn('Content-Encoding', self.client.get('/api/news').headers)
+
+        response = self.client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(compression_metrics.to_dict()['skipped_small'], 1)
+
+    def test_cached_responses_are_compressed_once(self):
+        with patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            first = self.client.get('/api/news', headers={'Accept-Encoding': 'gzip'})
+            compressions = compress.call_count
+            second = self.client.get('/api/news', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(compress.call_count, compressions)
+        self.assertEqual(first.data, second.data)
+        self.assertGreater(compression_metrics.to_dict()['bytes_saved'], 0)
+        self.assertEqual(compression_metrics.to_dict()['precompressed_hits'], 2)
+
+    def test_writes_drop_the_blueprint_cache(self):
+        headers = {'Accept-Encoding': 'gzip'}
+        self.assertIn(b'Match report 0"', gzip.decompress(self.client.get('/api/news?per_page=50', headers=headers).data))
+        response = self.client.delete('/api/news/1', headers={'Authorization': f'Bearer {self.token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b'Match report 0"', gzip.decompress(self.client.get('/api/news?per_page=50', headers=headers).data))
+
+    def test_exports_are_compressed_while_streaming(self):
+        response = self.client.get('/api/finances/export', headers={
+            'Authorization': f'Bearer {self.token}', 'Accept-Encoding': 'gzip'})
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response.headers)
+        lines = gzip.decompress(response.data).decode().splitlines()
+        self.assertEqual(len(lines), 21)
+        self.assertTrue(lines[0].startswith('id,transaction_date'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import Match, News, User
+from app.services.tokens import token_claims
+
+
+class DashboardTest(unittest.TestCase):
+
+    def setUp(self):
+        # A database file, so the section threads get their own connections
+        handle, self.database = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.app = create_app('testing', {'DASHBOARD_WORKERS': 3,
+                                          'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.database}'})
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            self.tokens = {}
+            for role in ('coach', 'player'):
+                user = User(username=role, email=f'{role}@esc.tn', password='Secret123',
+                            first_name=role.title(), last_name='User', role=role)
+                db.session.add(user)
+                db.session.flush()
+                self.tokens[role] = create_access_token(identity=user.id, additional_claims=token_claims(user))
+            db.session.add(Match(opponent='Next', date=datetime.now() + timedelta(days=3), location='Chorbane'))
+            db.session.add(Match(opponent='Last', date=datetime.now() - timedelta(days=3), location='Chorbane',
+                                 result='win', goals_for=2, goals_against=0))
+            db.session.add(News(title='Breaking news', content='Content ' * 20, author_id=user.id, published=True,
+                                published_at=datetime.utcnow() - timedelta(hours=1), is_breaking=True))
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        os.remove(self.database)
+
+    def get(self, role, query=''):
+        return self.client.get(f'/api/dashboard{query}', headers={'Authorization': f'Bearer {self.tokens[role]}'})
+
+    def test_sections_by_permission_and_cache(self):
+        data = self.get('coach').get_json()
+        self.assertEqual(set(data['meta']['sections']),
+                         {'upcoming_matches', 'recent_results', 'today_trainings', 'featured_news',
+                          'breaking_news', 'finance_summary'})
+        self.assertEqual({section['status'] for section in data['meta']['sections'].values()}, {'loaded'})
+        self.assertEqual([match['opponent'] for match in data['upcoming_matches']], ['Next'])
+        self.assertEqual([match['opponent'] for match in data['recent_results']], ['Last'])
+        self.assertEqual([article['title'] for article in data['breaking_news']], ['Breaking news'])
+
+        # Players do not see the finances
+        data = self.get('player').get_json()
+        self.assertNotIn('finance_summary', data)
+        self.assertEqual(data['meta']['sections']['upcoming_matches']['status'], 'cached')
+
+        # A write invalidates the sections of its blueprint only
+        response = self.client.post('/api/trainings', headers={'Authorization': f"Bearer {self.tokens['coach']}"},
+                                    json={'title': 'Session', 'date': date.today().isoformat(), 'start_time': '23:00',
+                                          'end_time': '23:30', 'location': 'Field'})
+        self.assertEqual(response.status_code, 201)
+        data = self.get('coach', '?sections=today_trainings,upcoming_matches').get_json()
+        self.assertEqual(data['meta']['sections']['today_trainings']['status'], 'loaded')
+        self.assertEqual(data['meta']['sections']['upcoming_matches']['status'], 'cached')
+        self.assertEqual([training['title'] for training in data['today_trainings']], ['Session'])
+        self.assertNotIn('recent_results', data)
+
+    def test_partial_results(self):
+        with mock.patch.object(Match, 'get_upcoming_matches', side_effect=RuntimeError('down')), \
+                self.assertLogs(self.app.logger, 'ERROR'):
+            data = self.get('coach').get_json()
+        self.assertIsNone(data['upcoming_matches'])
+        self.assertEqual(data['meta']['sections']['upcoming_matches']['status'], 'error')
+        self.assertEqual(data['meta']['sections']['recent_results']['status'], 'loaded')
+
+        self.assertEqual(self.get('coach', '?sections=weather').status_code, 400)
+
+    def test_sections_run_concurrently(self):
+        def slow(limit):
+            time.sleep(0.3)
+            return []
+
+        with mock.patch.object(Match, 'get_upcoming_matches', side_effect=slow), \
+                mock.patch.object(Match, 'get_recent_results', side_effect=slow):
+            data = self.get('coach').get_json()
+        self.assertGreaterEqual(data['meta']['sections']['recent_results']['ms'], 300)
+        self.assertLess(data['meta']['total_ms'], 550)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+from datetime import date, datetime, time, timedelta
+
+from flask_jwt_extended import create_access_token
+from werkzeug.datastructures import MultiDict
+
+from app import create_app, db
+from app.filters import FilterError, finance_filters, player_filters
+from app.models import Finance, Match, News, Player, Training, User
+from app.services.tokens import token_claims
+
+
+class QueryFilterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.admin = User(username='admin', email='admin@esc.tn', password='Secret123',
+                          first_name='Ad', last_name='Min', role='admin')
+        db.session.add(self.admin)
+        db.session.flush()
+        squad = [('Ben Ali', 'ST', 7.5, 20, 'active'), ('Ben_Salah', 'GK', 6.0, 24, 'active'),
+                 ('Bennour', 'ST', 7.5, 31, 'active'), ('Trabelsi', 'CB', 8.0, 22, 'injured')]
+        for number, (last_name, position, rating, age, status) in enumerate(squad, start=1):
+            user = User(username=f'player{number}', email=f'player{number}@esc.tn', password='Secret123',
+                        first_name='Player', last_name=last_name, role='player')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Player(user_id=user.id, position=position, rating=rating, jersey_number=number,
+                                  birth_date=date.today() - timedelta(days=365 * age + 30), nationality='TN',
+                                  status=status))
+        for day in (date(2024, 1, 31), date(2024, 2, 1), date(2024, 2, 29), date(2024, 3, 1)):
+            db.session.add(Finance(type='expense', category='equipment', amount=10, title=str(day),
+                                   transaction_date=day, created_by=self.admin.id))
+        db.session.add_all(Match(opponent=f'Opponent {i}', location='Chorbane', date=datetime(2024, 5, i + 1, 16),
+                                 result='win') for i in range(3))
+        for title, featured, breaking in (('abc cup', True, False), ('abc derby', True, True), ('Transfer', False, False)):
+            db.session.add(News(title=title, content=title, author_id=self.admin.id, published=True,
+                                published_at=datetime(2024, 1, 1), is_featured=featured, is_breaking=breaking))
+        for title, day in (('Past', date(2024, 1, 1)), ('Next', date.today() + timedelta(days=7))):
+            db.session.add(Training(title=title, date=day, start_time=time(9), end_time=time(11), location='Chorbane'))
+        db.session.commit()
+        token = create_access_token(identity=self.admin.id, additional_claims=token_claims(self.admin))
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def players(self, query):
+        response = self.client.get(f'/api/players?{query}', headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return [player['jersey_number'] for player in response.get_json()['players']]
+
+    def test_operators_and_multi_key_sort(self):
+        self.assertEqual(self.players(''), [1, 2, 3])  # status=active by default
+        self.assertEqual(self.players('status='), [1, 2, 3, 4])
+        self.assertEqual(self.players('position=ST&position=GK&sort=-rating,-jersey_number'), [3, 1, 2])
+        self.assertEqual(self.players('position__in=ST,CB&status__in=active,injured&sort=-rating,jersey_number'),
+                         [4, 1, 3])
+        self.assertEqual(self.players('age__range=20,24&sort=-age'), [2, 1])
+        self.assertEqual(self.players('age_min=21&age_max=31'), self.players('age__min=21&age__max=31'))
+        # LIKE wildcards in the prefix are literals
+        self.assertEqual(self.players('last_name__prefix=Ben_'), [2])
+        self.assertEqual(self.players('last_name__prefix=Ben'), [1, 2, 3])
+
+    def test_invalid_parameters_are_rejected(self):
+        for query in ('height__min=180', 'position=XX', 'nationality__range=A,B', 'sort=salary',
+                      'jersey_number__min=ten', 'contract_active=maybe'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/players?{query}', headers=self.headers)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json()['error'], 'Invalid filter')
+
+    def test_unindexed_predicate_budget(self):
+        self.assertEqual(self.players('position=ST&age__max=25'), [1])
+        response = self.client.get('/api/players?age__max=25&rating__min=7', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('age', response.get_json()['message'])
+
+        self.app.config['FILTER_UNINDEXED_POLICY'] = 'warn'
+        with self.assertLogs(self.app.logger, 'WARNING'):
+            self.assertEqual(self.players('age__max=25&rating__min=7'), [1])
+
+        compiled = player_filters.compile(MultiDict({'position': 'ST', 'status': 'active', 'jersey_number': '1'}))
+        self.assertEqual(compiled.unindexed, [])
+
+    def test_baseline_news_and_training_parameters(self):
+        def titles(path, key):
+            response = self.client.get(path, headers=self.headers)
+            self.assertEqual(response.status_code, 200, response.get_json())
+            return sorted(item['title'] for item in response.get_json()[key])
+
+        self.assertEqual(titles('/api/news?featured=true&search=abc', 'articles'), ['abc cup', 'abc derby'])
+        self.assertEqual(titles('/api/news?breaking=true&featured=true', 'articles'), ['abc derby'])
+        # false (or anything but true) means no filter, as before
+        self.assertEqual(titles('/api/news?featured=false&breaking=no', 'articles'), ['Transfer', 'abc cup', 'abc derby'])
+        self.assertEqual(titles('/api/trainings?upcoming=true', 'trainings'), ['Next'])
+        self.assertEqual(titles('/api/trainings?upcoming=false', 'trainings'), ['Next', 'Past'])
+        self.assertEqual(len(self.client.get('/api/matches?status=bogus', headers=self.headers).get_json()['matches']), 3)
+
+    def test_payment_method_is_not_filterable(self):
+        db.session.add(Finance(type='expense', category='equipment', amount=10, title='cash', payment_method='cash',
+                               transaction_date=date(2024, 2, 2), created_by=self.admin.id))
+        db.session.commit()
+        response = self.client.get('/api/finances?payment_method=cash', headers=self.headers)
+        self.assertEqual(len(response.get_json()['transactions']), 5)
+        response = self.client.get('/api/finances?payment_method__in=cash', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('payment_method', response.get_json()['message'])
+
+    def test_calendar_periods_use_date_ranges(self):
+        compiled = finance_filters.compile(MultiDict({'year': '2024', 'month': '2'}))
+        self.assertNotIn('EXTRACT', str(compiled.criteria[0]).upper())
+        rows = compiled.apply(Finance.query).all()
+        self.assertEqual([finance.transaction_date for finance in rows], [date(2024, 2, 29), date(2024, 2, 1)])
+        with self.assertRaises(FilterError):
+            finance_filters.compile(MultiDict({'year': '2024', 'month': '13'}))
+
+        response = self.client.get('/api/matches?date__max=2024-05-02&sort=date', headers=self.headers)
+        self.assertEqual([match['opponent'] for match in response.get_json()['matches']], ['Opponent 0', 'Opponent 1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
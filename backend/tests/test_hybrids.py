@@ -0,0 +1,138 @@
+import unittest
+from datetime import date, datetime, time, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import Finance, Match, Player, PlayerStats, Training, User
+from app.services.tokens import token_claims
+
+
+def years_before(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:  # February 29th
+        return day.replace(year=day.year - years, day=28)
+
+
+class HybridParityTest(unittest.TestCase):
+    """The SQL side of each hybrid property agrees with its Python side."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.admin = User(username='admin', email='admin@esc.tn', password='Secret123',
+                          first_name='Ad', last_name='Min', role='admin')
+        db.session.add(self.admin)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def assertParity(self, model, names):
+        for obj in model.query.all():
+            for name in names:
+                with self.subTest(model=model.__name__, id=obj.id, hybrid=name):
+                    in_sql = db.session.query(getattr(model, name)).filter(model.id == obj.id).scalar()
+                    in_python = getattr(obj, name)
+                    if isinstance(in_python, bool):
+                        self.assertEqual(bool(in_sql), in_python)
+                        matched = model.query.filter(model.id == obj.id, getattr(model, name)).count()
+                        self.assertEqual(matched == 1, in_python)
+                    else:
+                        self.assertEqual(in_sql, in_python)
+
+    def test_player(self):
+        today = date.today()
+        birth_dates = [years_before(today, 20), years_before(today + timedelta(days=1), 20),
+                       years_before(today - timedelta(days=1), 20), years_before(today, 35) + timedelta(days=40),
+                       date(2000, 2, 29), date(2004, 12, 31), date(2005, 1, 1)]
+        contracts = [(None, None), (today - timedelta(days=30), None), (today - timedelta(days=30), today),
+                     (today, today + timedelta(days=30)), (today + timedelta(days=1), today + timedelta(days=30)),
+                     (date(2020, 1, 1), today - timedelta(days=1)), (date(2020, 1, 1), date(2030, 1, 1))]
+        for i, (birth_date, (start, end)) in enumerate(zip(birth_dates, contracts)):
+            user = User(username=f'player{i}', email=f'player{i}@esc.tn', password='Secret123',
+                        first_name='Player', last_name=str(i), role='player')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Player(user_id=user.id, position='ST', birth_date=birth_date, nationality='TN',
+                                  contract_start=start, contract_end=end))
+        db.session.commit()
+        self.assertParity(Player, ('age', 'contract_active', 'contract_running'))
+
+    def test_match(self):
+        now = datetime.utcnow()
+        for i, (when, result) in enumerate(((now + timedelta(days=2), 'pending'), (now - timedelta(days=2), 'pending'),
+                                            (now + timedelta(days=2), 'win'), (now - timedelta(hours=2), 'loss'))):
+            db.session.add(Match(opponent=f'Opponent {i}', date=when, location='Chorbane', result=result))
+        db.session.commit()
+        self.assertParity(Match, ('is_upcoming', 'is_finished'))
+
+    def test_training(self):
+        now = datetime.now()
+        earlier, later = (now - timedelta(minutes=5)).time(), (now + timedelta(minutes=5)).time()
+        sessions = [(now.date(), earlier, time(23, 59)), (now.date(), later, time(23, 59)),
+                    (now.date() + timedelta(days=1), time(9), time(10, 30)),
+                    (now.date() - timedelta(days=1), time(17, 45), time(19, 15)),
+                    (now.date() + timedelta(days=3), time(8, 50), time(9, 5))]
+        if later < earlier:  # Around midnight
+            sessions = sessions[2:]
+        for i, (day, start, end) in enumerate(sessions):
+            db.session.add(Training(title=f'Session {i}', date=day, start_time=start, end_time=end, location='Field'))
+        db.session.commit()
+        self.assertParity(Training, ('is_upcoming', 'duration_minutes'))
+
+    def test_finance(self):
+        today = date.today()
+        for i, (due_date, status) in enumerate(((None, 'pending'), (today - timedelta(days=1), 'pending'),
+                                                (today - timedelta(days=1), 'approved'), (today, 'pending'),
+                                                (today + timedelta(days=5), 'pending'))):
+            db.session.add(Finance(type='expense', category='equipment', amount=10, title=f'Item {i}',
+                                   transaction_date=today, due_date=due_date, status=status, created_by=self.admin.id))
+        db.session.commit()
+        self.assertParity(Finance, ('is_overdue',))
+
+    def test_pass_accuracy(self):
+        user = User(username='player', email='player@esc.tn', password='Secret123',
+                    first_name='Pl', last_name='Ayer', role='player')
+        db.session.add(user)
+        db.session.flush()
+        player = Player(user_id=user.id, position='CM', birth_date=date(2000, 1, 1), nationality='TN')
+        db.session.add(player)
+        # Includes exact halves (49/400 = 12.25%) where rounding modes differ
+        for i, (completed, attempted) in enumerate(((0, 0), (0, 10), (10, 10), (1, 3), (2, 3),
+                                                    (49, 400), (7, 8), (123, 457))):
+            match = Match(opponent=f'Opponent {i}', date=datetime(2024, 1, 1 + i), location='Chorbane')
+            db.session.add(match)
+            db.session.flush()
+            db.session.add(PlayerStats(player_id=player.id, match_id=match.id,
+                                       passes_completed=completed, passes_attempted=attempted))
+        db.session.commit()
+        self.assertParity(PlayerStats, ('pass_accuracy',))
+
+    def test_list_endpoints_filter_and_sort(self):
+        today = date.today()
+        for i, years in enumerate((19, 21, 22, 30)):
+            user = User(username=f'player{i}', email=f'player{i}@esc.tn', password='Secret123',
+                        first_name='Player', last_name=str(i), role='player')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Player(user_id=user.id, position='ST', birth_date=years_before(today, years) - timedelta(days=1),
+                                  nationality='TN', jersey_number=i + 1))
+        db.session.commit()
+        token = create_access_token(identity=self.admin.id, additional_claims=token_claims(self.admin))
+        headers = {'Authorization': f'Bearer {token}'}
+
+        response = self.client.get('/api/players?age_max=21&sort=-age', headers=headers)
+        self.assertEqual([player['age'] for player in response.get_json()['players']], [21, 19])
+
+        response = self.client.get('/api/players?sort=height', headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
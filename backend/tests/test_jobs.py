@@ -0,0 +1,154 @@
+import time
+import unittest
+from unittest import mock
+
+from app import create_app
+from app.services.jobs import Job, JobQueue
+
+
+class LocalRedis:
+    """Just enough of the Redis commands the job queue uses, in memory."""
+
+    def __init__(self):
+        self.keys, self.lists, self.sorted_sets = {}, {}, {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.keys:
+            return None
+        self.keys[key] = value
+        return True
+
+    def delete(self, key):
+        return int(self.keys.pop(key, None) is not None)
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    def brpop(self, key, timeout=0):
+        items = self.lists.get(key)
+        return (key, items.pop()) if items else None
+
+    def zadd(self, key, mapping):
+        self.sorted_sets.setdefault(key, {}).update(mapping)
+
+    def zrangebyscore(self, key, low, high, start=0, num=None):
+        members = sorted((score, member) for member, score in self.sorted_sets.get(key, {}).items()
+                         if low <= score <= high)
+        return [member for _, member in members][start:start + num if num else None]
+
+    def zrem(self, key, member):
+        return self.sorted_sets.get(key, {}).pop(member, None) is not None
+
+
+class JobQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing', {'JOB_MAX_RETRIES': 2,
+                                          'JOB_RETRY_BACKOFF': 10})
+        self.queue = JobQueue(self.app)
+        self.calls = []
+
+        @self.queue.task()
+        def flaky(fail_times):
+            self.calls.append(fail_times)
+            if len(self.calls) <= fail_times:
+                raise RuntimeError('try again')
+
+        self.flaky = flaky
+
+    def redis_queue(self):
+        self.queue.backend = 'redis'
+        self.queue._redis = LocalRedis()
+        return self.queue._redis
+
+    def test_eager_retries_then_propagates(self):
+        with self.assertLogs(self.app.logger, 'WARNING'):
+            self.assertIsNotNone(self.flaky.enqueue(2))
+        self.assertEqual(len(self.calls), 3)
+
+        self.calls.clear()
+        with self.assertLogs(self.app.logger, 'WARNING'), self.assertRaises(RuntimeError):
+            self.flaky.enqueue(5)
+        self.assertEqual(len(self.calls), 3)
+
+        self.calls.clear()
+        self.queue.eager_propagates = False
+        with self.assertLogs(self.app.logger, 'ERROR'):
+            self.flaky.enqueue(5)
+
+    def test_retry_backoff_and_dead_letter(self):
+        redis = self.redis_queue()
+        self.flaky.enqueue(5)
+        job = Job.from_json(redis.brpop('esc:jobs:queue')[1])
+
+        # Retries wait in the scheduled set: 10s, then 20s
+        for delay in (10, 20):
+            before = time.time()
+            with self.assertLogs(self.app.logger, 'WARNING'):
+                self.assertFalse(self.queue.run(job))
+            (payload, run_at), = redis.sorted_sets['esc:jobs:scheduled'].items()
+            self.assertAlmostEqual(run_at - before, delay, delta=1)
+            redis.zrem('esc:jobs:scheduled', payload)
+            job = Job.from_json(payload)
+
+        # Out of retries: the job goes to the dead-letter list, not back to the queue
+        with self.assertLogs(self.app.logger, 'ERROR'):
+            self.assertFalse(self.queue.run(job))
+        self.assertEqual(Job.from_json(redis.lists['esc:jobs:dead'][0]).attempts, 3)
+        self.assertFalse(redis.sorted_sets['esc:jobs:scheduled'])
+        self.assertEqual(len(self.calls), 3)
+
+    def test_idempotency_key(self):
+        self.assertIsNotNone(self.flaky.enqueue(0, idempotency_key='match-1'))
+        self.assertIsNone(self.flaky.enqueue(0, idempotency_key='match-1'))
+        self.assertIsNotNone(self.flaky.enqueue(0, idempotency_key='match-2'))
+        self.assertEqual(len(self.calls), 2)
+
+        # Keys expire after JOB_IDEMPOTENCY_TTL
+        with mock.patch('time.time', return_value=time.time() + self.queue.idempotency_ttl + 1):
+            self.assertIsNotNone(self.flaky.enqueue(0, idempotency_key='match-1'))
+
+        redis = self.redis_queue()
+        self.flaky.enqueue(0, idempotency_key='match-3')
+        self.assertIsNone(self.flaky.enqueue(0, idempotency_key='match-3'))
+        self.assertEqual(len(redis.lists['esc:jobs:queue']), 1)
+
+    def test_dead_letter_releases_idempotency_key(self):
+        self.queue.eager_propagates = False
+        with self.assertLogs(self.app.logger, 'ERROR'):
+            self.assertIsNotNone(self.flaky.enqueue(5, idempotency_key='image-1'))
+        # The failed work can be queued again right away
+        self.assertIsNotNone(self.flaky.enqueue(0, idempotency_key='image-1'))
+
+        redis = self.redis_queue()
+        self.flaky.enqueue(5, idempotency_key='image-2')
+        job = Job.from_json(redis.brpop('esc:jobs:queue')[1])
+        job.attempts = 2
+        with self.assertLogs(self.app.logger, 'ERROR'):
+            self.queue.run(job)
+        self.assertNotIn('esc:jobs:idem:flaky:image-2', redis.keys)
+        self.assertIsNotNone(self.flaky.enqueue(0, idempotency_key='image-2'))
+
+    def test_expired_idempotency_keys_are_pruned(self):
+        for index in range(3):
+            self.flaky.enqueue(0, idempotency_key=f'match-{index}')
+        self.assertEqual(len(self.queue._idempotency_keys), 3)
+        with mock.patch('time.time', return_value=time.time() + self.queue.idempotency_ttl + 61):
+            self.flaky.enqueue(0, idempotency_key='match-9')
+        self.assertEqual(list(self.queue._idempotency_keys), ['flaky:match-9'])
+
+    def test_scheduled_jobs_are_promoted_when_due(self):
+        redis = self.redis_queue()
+        self.flaky.enqueue(0, delay=60)
+        self.flaky.enqueue(0, delay=1)
+        self.assertEqual(self.queue.promote_scheduled(), 0)
+
+        with mock.patch('time.time', return_value=time.time() + 2):
+            self.assertEqual(self.queue.promote_scheduled(), 1)
+        self.queue.work(burst=True)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(len(redis.sorted_sets['esc:jobs:scheduled']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from app import create_app, db
+from app.models import User
+from app.services.last_login import LastLoginRecorder
+
+
+class LastLoginRecorderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.users = []
+        for name in ('first', 'second', 'third'):
+            user = User(username=name, email=f'{name}@esc.tn', password='Secret123',
+                        first_name=name.title(), last_name='User')
+            db.session.add(user)
+            db.session.flush()
+            self.users.append(user.id)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def recorder(self, **settings):
+        self.app.config.update({'LAST_LOGIN_FLUSH_INTERVAL': 60, 'LAST_LOGIN_BATCH_SIZE': 500, **settings})
+        with mock.patch('atexit.register'):
+            recorder = LastLoginRecorder(self.app)
+        self.addCleanup(recorder.flush)
+        return recorder
+
+    def last_logins(self):
+        db.session.expire_all()
+        return {user.id: user.last_login for user in User.query.all()}
+
+    def test_coalesces_per_user(self):
+        recorder = self.recorder()
+        now = datetime(2024, 5, 1, 12)
+        recorder.record(self.users[0], now)
+        recorder.record(self.users[0], now - timedelta(hours=1))
+        recorder.record(self.users[1], now)
+        self.assertEqual(recorder.pending_count, 2)
+        self.assertIsNone(self.last_logins()[self.users[0]])
+
+        self.assertEqual(recorder.flush(), 2)
+        self.assertEqual(self.last_logins(), {self.users[0]: now, self.users[1]: now, self.users[2]: None})
+
+    def test_flushes_full_batch(self):
+        recorder = self.recorder(LAST_LOGIN_BATCH_SIZE=2)
+        now = datetime(2024, 5, 1, 12)
+        recorder.record(self.users[0], now)
+        self.assertEqual(recorder.pending_count, 1)
+        recorder.record(self.users[1], now)
+        self.assertEqual(recorder.pending_count, 0)
+        self.assertEqual(self.last_logins()[self.users[1]], now)
+
+    def test_flushes_on_timer_and_retries_failures(self):
+        recorder = self.recorder(LAST_LOGIN_FLUSH_INTERVAL=0.05)
+        now = datetime(2024, 5, 1, 12)
+        with mock.patch.object(recorder, '_write', side_effect=RuntimeError('down')) as write, \
+                self.assertLogs(self.app.logger, 'WARNING'):
+            recorder.record(self.users[0], now)
+            time.sleep(0.2)
+        # The failed batch is kept and the timer re-armed without a new login
+        self.assertGreaterEqual(write.call_count, 2)
+        self.assertEqual(recorder.pending_count, 1)
+
+        time.sleep(0.2)
+        self.assertEqual(recorder.pending_count, 0)
+        self.assertEqual(self.last_logins()[self.users[0]], now)
+
+    def test_exit_hook_registered_once(self):
+        recorder = LastLoginRecorder()
+        with mock.patch('atexit.register') as register:
+            recorder.init_app(self.app)
+            recorder.init_app(self.app)
+        register.assert_called_once_with(recorder.flush)
+
+
+if __name__ == '__main__':
+    unittest.main()
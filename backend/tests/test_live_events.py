@@ -0,0 +1,143 @@
+import unittest
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db, live_events
+from app.models import Match, User
+from app.services.live_events import LiveEventBroker, event_stream
+from app.services.tokens import token_claims
+
+
+class LiveEventStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.broker = LiveEventBroker()
+
+    def test_fan_out_to_every_subscriber(self):
+        streams = [event_stream(self.broker.subscribe('match:1'), snapshot={'score': '0-0'}, heartbeat=0.01)
+                   for _ in range(2)]
+        for stream in streams:
+            self.assertEqual(next(stream), 'retry: 3000\n\n')
+            self.assertIn('event: snapshot', next(stream))
+        self.assertEqual(self.broker.subscriber_count('match:1'), 2)
+
+        self.broker.publish('match:1', 'goal', {'minute': 12})
+        self.broker.publish('match:2', 'goal', {'minute': 30})
+        for stream in streams:
+            self.assertEqual(next(stream), 'id: 1\nevent: goal\ndata: {"minute": 12}\n\n')
+            # Nothing else on this channel: keep-alive comments
+            self.assertEqual(next(stream), ': keepalive\n\n')
+
+        # Closing a stream (client gone) unsubscribes it
+        streams[0].close()
+        self.assertEqual(self.broker.subscriber_count('match:1'), 1)
+        streams[1].close()
+        self.assertEqual(self.broker.subscriber_count(), 0)
+
+    def test_resume_from_last_event_id(self):
+        for minute in (10, 20, 30):
+            self.broker.publish('match:1', 'goal', {'minute': minute})
+        stream = event_stream(self.broker.subscribe('match:1'), last_event_id=1, heartbeat=0.01)
+        next(stream)
+        self.assertTrue(next(stream).startswith('id: 2\n'))
+        self.assertTrue(next(stream).startswith('id: 3\n'))
+        self.broker.publish('match:1', 'card', {'minute': 40})
+        self.assertTrue(next(stream).startswith('id: 4\nevent: card'))
+        stream.close()
+
+    def test_event_published_while_reading_the_snapshot(self):
+        self.broker.publish('match:1', 'score', {'goals_for': 0})
+        subscription = self.broker.subscribe('match:1')
+        # A goal lands after subscribing, before the snapshot is read
+        self.broker.publish('match:1', 'score', {'goals_for': 1})
+        stream = event_stream(subscription, snapshot={'goals_for': 0}, heartbeat=0.01)
+        next(stream)
+        self.assertTrue(next(stream).startswith('id: 1\nevent: snapshot'))
+        self.assertTrue(next(stream).startswith('id: 2\nevent: score'))
+        # Delivered once, although it was both in the history and queued
+        self.assertEqual(next(stream), ': keepalive\n\n')
+        stream.close()
+
+    def test_redis_publish_is_a_single_script_call(self):
+        calls = []
+
+        class Redis:
+            def register_script(self, script):
+                def run(keys, args):
+                    calls.append((keys, args))
+                    return b'7'
+                return run
+
+        self.broker.backend, self.broker._redis = 'redis', Redis()
+        event = self.broker.publish('match:1', 'goal', {'minute': 12})
+        self.assertEqual(event.id, 7)
+        self.assertEqual(calls, [(['esc:live:match:1:seq', 'esc:live:match:1:history', 'esc:live:match:1'],
+                                  ['"goal"', '{"minute": 12}', 200])])
+
+    def test_overflowed_client_is_closed(self):
+        self.broker.max_queue = 1
+        stream = event_stream(self.broker.subscribe('match:1'), snapshot={}, heartbeat=0.01)
+        next(stream), next(stream)
+        self.assertEqual(next(stream), ': keepalive\n\n')
+        for minute in (10, 20):
+            self.broker.publish('match:1', 'goal', {'minute': minute})
+        # The stream ends; the client reconnects and resumes from history
+        self.assertRaises(StopIteration, next, stream)
+        self.assertEqual(self.broker.subscriber_count(), 0)
+
+
+class LiveMatchFeedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing', {'LIVE_EVENTS_HEARTBEAT': 0.01})
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='fan', email='fan@esc.tn', password='Secret123',
+                        first_name='Fan', last_name='Club', role='supporter')
+            match = Match(opponent='CA', date=datetime.now() - timedelta(minutes=30), location='Chorbane',
+                          goals_for=1, goals_against=0)
+            db.session.add_all([user, match])
+            db.session.commit()
+            self.match_id = match.id
+            self.token = create_access_token(identity=user.id, additional_claims=token_claims(user))
+
+    def stream(self, query='', **headers):
+        response = self.client.get(f'/api/matches/{self.match_id}/live{query}', headers=headers, buffered=False)
+        self.addCleanup(response.close)
+        return response
+
+    def test_requires_a_token(self):
+        self.assertEqual(self.stream().status_code, 401)
+        self.assertEqual(self.stream(f'?access_token={self.token}x').status_code, 422)
+
+        response = self.stream(Authorization=f'Bearer {self.token}')
+        self.assertEqual((response.status_code, response.mimetype), (200, 'text/event-stream'))
+
+    def test_unknown_match_leaves_no_subscription(self):
+        response = self.client.get(f'/api/matches/{self.match_id + 1}/live?access_token={self.token}')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(live_events.subscriber_count(), 0)
+
+    def test_snapshot_then_events(self):
+        response = self.stream(f'?access_token={self.token}')
+        self.assertEqual(response.status_code, 200)
+        chunks = iter(response.response)
+        next(chunks)
+        self.assertIn(b'event: snapshot', next(chunks))
+
+        live_events.publish(f'match:{self.match_id}', 'goal', {'minute': 55})
+        self.assertIn(b'event: goal', next(chunks))
+
+        # A reconnecting client only gets what it missed
+        live_events.publish(f'match:{self.match_id}', 'card', {'minute': 60})
+        response = self.stream(f'?access_token={self.token}', **{'Last-Event-ID': '1'})
+        chunks = iter(response.response)
+        next(chunks)
+        self.assertTrue(next(chunks).startswith(b'id: 2\nevent: card'))
+        self.assertEqual(next(chunks), b': keepalive\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
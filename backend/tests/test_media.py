@@ -0,0 +1,89 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+from app import create_app, media_store
+from app.services.media import variant_path
+from app.services.media_serving import IMMUTABLE_MAX_AGE
+
+
+class MediaServingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.app = create_app('testing', {'UPLOAD_FOLDER': self.media_root})
+        self.client = self.app.test_client()
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 48), (10, 120, 40)).save(buffer, 'PNG')
+        with self.app.app_context():
+            self.image = media_store.save_image(io.BytesIO(buffer.getvalue()))
+        self.url = media_store.url_for(self.image.relative_path)
+        with open(media_store.path_for(self.image.relative_path), 'rb') as image_file:
+            self.data = image_file.read()
+
+        os.makedirs(media_store.path_for('videos'))
+        with open(media_store.path_for('videos/clip.mp4'), 'wb') as video:
+            video.write(bytes(range(256)) * 4)
+
+    def tearDown(self):
+        shutil.rmtree(self.media_root)
+
+    def test_content_addressed_files_are_immutable(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, self.data)
+        self.assertEqual(response.headers['ETag'], f'"{self.image.content_hash}"')
+        self.assertTrue(response.cache_control.immutable)
+        self.assertEqual(response.cache_control.max_age, IMMUTABLE_MAX_AGE)
+
+        response = self.client.get(self.url, headers={'If-None-Match': f'"{self.image.content_hash}"'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+        # Other files keep a short lifetime
+        response = self.client.get('/media/videos/clip.mp4')
+        self.assertFalse(response.cache_control.immutable)
+        self.assertEqual(response.cache_control.max_age, self.app.config['MEDIA_MAX_AGE'])
+
+    def test_byte_ranges(self):
+        response = self.client.get('/media/videos/clip.mp4', headers={'Range': 'bytes=10-19'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, bytes(range(10, 20)))
+        self.assertEqual(response.headers['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(response.headers['Accept-Ranges'], 'bytes')
+
+        response = self.client.get('/media/videos/clip.mp4', headers={'Range': 'bytes=2000-'})
+        self.assertEqual(response.status_code, 416)
+
+    def test_missing_files(self):
+        self.assertEqual(self.client.get('/media/videos/missing.mp4').status_code, 404)
+        self.assertEqual(self.client.get('/media/../config.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/tmp/upload.tmp').status_code, 404)
+
+        # A variant not generated yet redirects to its original without caching
+        response = self.client.get(media_store.url_for(variant_path(self.image.content_hash, 'thumb', 'jpg')))
+        self.assertEqual(response.status_code, 307)
+        self.assertTrue(response.headers['Location'].endswith(self.url))
+        self.assertEqual(response.headers['Cache-Control'], 'no-store')
+
+    def test_accelerated_delivery(self):
+        self.app.config['MEDIA_ACCEL'] = 'nginx'
+        response = self.client.get(self.url)
+        self.assertEqual(response.headers['X-Accel-Redirect'], f'/protected-media/{self.image.relative_path}')
+        self.assertEqual(response.headers['Content-Type'], 'image/png')
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], f'"{self.image.content_hash}"')
+
+        self.app.config['MEDIA_ACCEL'] = 'sendfile'
+        response = self.client.get('/media/videos/clip.mp4')
+        self.assertEqual(response.headers['X-Sendfile'], media_store.path_for('videos/clip.mp4'))
+        self.assertEqual(response.data, b'')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+import flask_migrate
+from sqlalchemy import inspect, text
+
+from app import create_app, db
+
+
+class MigrationsTest(unittest.TestCase):
+    """``flask db upgrade`` brings databases created before a column existed up to the models."""
+
+    def setUp(self):
+        handle, self.database = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.database}',
+                                          'MIGRATIONS_ENABLED': True})
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        os.remove(self.database)
+
+    def news_columns(self):
+        return {column['name'] for column in inspect(db.engine).get_columns('news')}
+
+    def indexes(self, table):
+        return {index['name']: index['column_names'] for index in inspect(db.engine).get_indexes(table)}
+
+    def test_upgrade_adds_news_text_metrics(self):
+        with db.engine.begin() as connection:
+            connection.execute(text('ALTER TABLE news DROP COLUMN word_count'))
+            connection.execute(text('ALTER TABLE news DROP COLUMN reading_time'))
+        flask_migrate.upgrade()
+        self.assertLessEqual({'word_count', 'reading_time'}, self.news_columns())
+
+        flask_migrate.downgrade(revision='base')
+        self.assertFalse({'word_count', 'reading_time'} & self.news_columns())
+
+    def test_upgrade_creates_missing_filter_indexes(self):
+        with db.engine.begin() as connection:
+            connection.execute(text('DROP INDEX ix_news_is_featured'))
+            connection.execute(text('DROP INDEX ix_players_nationality'))
+        flask_migrate.upgrade()
+        self.assertEqual(self.indexes('news')['idx_news_is_featured'], ['is_featured'])
+        self.assertEqual(self.indexes('players')['idx_players_nationality'], ['nationality'])
+
+    def test_upgrade_is_a_no_op_on_current_schema(self):
+        before = {table: self.indexes(table) for table in ('users', 'players', 'matches', 'news')}
+        flask_migrate.upgrade()
+        self.assertLessEqual({'word_count', 'reading_time'}, self.news_columns())
+        # No second index on a column the models already index
+        self.assertEqual({table: self.indexes(table) for table in before}, before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+from sqlalchemy import event, update
+
+from app import create_app, db
+from app.models import News, User
+
+
+class NewsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        author = User(username='editor', email='editor@esc.tn', password='Secret123',
+                      first_name='Edi', last_name='Tor', role='admin')
+        db.session.add(author)
+        db.session.commit()
+        self.author_id = author.id
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def article(self, title='Victory at home', content='word ' * 450, **kwargs):
+        article = News(title=title, content=content, author_id=self.author_id, **kwargs)
+        article.save_with_unique_slug()
+        db.session.commit()
+        return article
+
+
+class TextMetricsTest(NewsTestCase):
+
+    def test_metrics_computed_on_write(self):
+        article = self.article()
+        self.assertEqual((article.word_count, article.reading_time), (450, 2))
+        self.assertEqual(article.excerpt, ('word ' * 450)[:News.EXCERPT_LENGTH] + '...')
+
+        article.content = 'Short report'
+        article.update_text_metrics(regenerate_excerpt=True)
+        self.assertEqual((article.word_count, article.reading_time, article.excerpt), (2, 1, 'Short report'))
+        self.assertEqual(News.compute_text_metrics(''), (0, 1))
+
+    def test_backfill(self):
+        kept = self.article(excerpt='Written by hand')
+        empty = self.article(title='Another one', content='one two three')
+        db.session.execute(update(News).values(word_count=0, reading_time=1))
+        db.session.execute(update(News).where(News.id == empty.id).values(excerpt=None))
+        db.session.commit()
+
+        self.assertEqual(News.backfill_text_metrics(batch_size=1), 2)
+        db.session.expire_all()
+        self.assertEqual((kept.word_count, kept.reading_time, kept.excerpt), (450, 2, 'Written by hand'))
+        self.assertEqual((empty.word_count, empty.excerpt), (3, 'one two three'))
+
+
+class SlugTest(NewsTestCase):
+
+    def test_suffix_allocation(self):
+        self.assertEqual(self.article(title='Foo').slug, 'foo')
+        self.assertEqual(self.article(title='Foo').slug, 'foo-1')
+        # Slugs sharing the prefix without a numeric suffix do not count
+        self.assertEqual(self.article(title='Foo bar').slug, 'foo-bar')
+        self.assertEqual(self.article(title='Foo!').slug, 'foo-2')
+
+    def test_retries_on_conflict(self):
+        self.article(title='Foo')
+        article = News(title='Foo', content='Late report', author_id=self.author_id)
+        self.assertEqual(article.slug, 'foo-1')
+
+        # Another writer takes the slug between the query and the insert
+        self.article(title='Foo')
+        self.assertEqual(article.save_with_unique_slug(), 'foo-2')
+        db.session.commit()
+        self.assertEqual(News.query.filter_by(slug='foo-2').one().content, 'Late report')
+
+    def test_increment_views_is_one_update(self):
+        article = self.article()
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        article.increment_views()
+        article.increment_views()
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+        updates = [statement for statement in statements if statement.startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertIn('views_count=(news.views_count + ', updates[0])
+        db.session.expire_all()
+        self.assertEqual(article.views_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
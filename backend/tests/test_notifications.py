@@ -0,0 +1,96 @@
+import socketserver
+import threading
+import unittest
+
+from app import create_app, mail
+from app.services.notifications import NotificationDispatcher, NotificationTemplate, Recipient
+
+
+class LocalSMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept messages, recording one entry per connection."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        messages = []
+        self.server.connections.append(messages)
+        self.reply('220 localhost ESMTP')
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif command == 'RCPT' and 'refused' in line:
+                self.reply('550 No such user')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b'.\r\n', b''):
+                        break
+                    data.append(chunk)
+                messages.append(b''.join(data).decode())
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), LocalSMTPHandler)
+        self.server.connections = []
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.app = create_app('testing')
+        self.app.config.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=self.server.server_address[1],
+                               MAIL_USE_TLS=False, MAIL_USERNAME=None, MAIL_PASSWORD=None,
+                               MAIL_SUPPRESS_SEND=False, MAIL_BATCH_SIZE=20)
+        mail.init_app(self.app)
+        self.dispatcher = NotificationDispatcher(mail, self.app)
+        self.template = NotificationTemplate('Training on $date', 'Hello $first_name, see you on $date.')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_one_connection_per_batch(self):
+        recipients = [Recipient(f'player{i}@esc.tn', first_name=f'Player{i}') for i in range(30)]
+        recipients += [Recipient(f'fan{i}@gmail.com', first_name=f'Fan{i}') for i in range(5)]
+
+        with self.app.app_context():
+            result = self.dispatcher.dispatch(self.template, recipients, date='12/03')
+
+        self.assertEqual(result.sent, 35)
+        self.assertEqual(result.failed, [])
+        # esc.tn: 20 + 10, gmail.com: 5
+        self.assertEqual(result.batches, 3)
+        self.assertEqual(sorted(len(messages) for messages in self.server.connections), [5, 10, 20])
+
+    def test_template_is_personalized(self):
+        with self.app.app_context():
+            self.dispatcher.dispatch(self.template, [Recipient('a@esc.tn', first_name='Ali')], date='$5 day')
+
+        message = self.server.connections[0][0]
+        self.assertIn('Hello Ali, see you on $5 day.', message)
+
+    def test_refused_recipient_does_not_stop_batch(self):
+        recipients = [Recipient('refused@esc.tn', first_name='X'), Recipient('ok@esc.tn', first_name='Y')]
+
+        with self.app.app_context():
+            result = self.dispatcher.dispatch(self.template, recipients, date='12/03')
+
+        self.assertEqual(result.sent, 1)
+        self.assertEqual(result.failed, ['refused@esc.tn'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+from datetime import date, datetime, time
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import Finance, Match, News, Player, Training, User
+from app.services.tokens import requires, token_claims
+
+ROLES = ('admin', 'coach', 'staff', 'player', 'supporter')
+EVERYONE = ROLES
+
+# (method, path, roles allowed, status for the other roles). Allowed roles
+# get anything but the denied status: bodies are empty or invalid and ids
+# missing where the check comes first, so nothing changes between requests.
+# The player is the owner of player 1; article 1 is the coach's, article 2
+# the staff member's and article 3 an unpublished draft of the coach's.
+MATRIX = [
+    ('GET', '/api/auth/users', ('admin',), 403),
+
+    ('GET', '/api/players', EVERYONE, 403),
+    ('GET', '/api/players/1', EVERYONE, 403),
+    ('GET', '/api/players/positions', EVERYONE, 403),
+    ('POST', '/api/players', ('admin', 'coach'), 403),
+    ('PUT', '/api/players/1', ('admin', 'coach', 'player'), 403),
+    ('PUT', '/api/players/2', ('admin', 'coach'), 403),
+    ('DELETE', '/api/players/99', ('admin',), 403),
+
+    ('GET', '/api/matches', EVERYONE, 403),
+    ('GET', '/api/matches/1', EVERYONE, 403),
+    ('GET', '/api/matches/1/stats', EVERYONE, 403),
+    ('GET', '/api/matches/upcoming', EVERYONE, 403),
+    ('GET', '/api/matches/results', EVERYONE, 403),
+    ('POST', '/api/matches', ('admin', 'coach'), 403),
+    ('PUT', '/api/matches/1', ('admin', 'coach'), 403),
+    ('POST', '/api/matches/1/stats', ('admin', 'coach'), 403),
+    ('GET', '/api/matches/1/squad', ('admin', 'coach'), 403),
+    ('POST', '/api/matches/1/squad', ('admin', 'coach'), 403),
+    ('DELETE', '/api/matches/99', ('admin',), 403),
+
+    ('GET', '/api/trainings', EVERYONE, 403),
+    ('GET', '/api/trainings/1', EVERYONE, 403),
+    ('GET', '/api/trainings/1/attendance', EVERYONE, 403),
+    ('GET', '/api/trainings/upcoming', EVERYONE, 403),
+    ('GET', '/api/trainings/today', EVERYONE, 403),
+    ('POST', '/api/trainings', ('admin', 'coach'), 403),
+    ('PUT', '/api/trainings/1', ('admin', 'coach'), 403),
+    ('POST', '/api/trainings/1/attendance', ('admin', 'coach'), 403),
+    ('DELETE', '/api/trainings/99', ('admin',), 403),
+
+    ('GET', '/api/finances', ('admin', 'coach', 'staff'), 403),
+    ('GET', '/api/finances/1', ('admin', 'coach', 'staff'), 403),
+    ('GET', '/api/finances/export', ('admin', 'coach', 'staff'), 403),
+    ('GET', '/api/finances/summary', ('admin', 'coach', 'staff'), 403),
+    ('GET', '/api/finances/categories', EVERYONE, 403),
+    ('POST', '/api/finances', ('admin', 'staff'), 403),
+    ('PUT', '/api/finances/1', ('admin', 'staff'), 403),
+    ('PUT', '/api/finances/2', ('admin',), 403),
+    ('DELETE', '/api/finances/99', ('admin',), 403),
+    ('POST', '/api/finances/99/approve', ('admin',), 403),
+    ('POST', '/api/finances/99/reject', ('admin',), 403),
+
+    ('GET', '/api/news/3', ('admin', 'coach'), 404),
+    ('POST', '/api/news', ('admin', 'coach', 'staff'), 403),
+    ('PUT', '/api/news/1', ('admin', 'coach'), 403),
+    ('PUT', '/api/news/2', ('admin', 'staff'), 403),
+    ('POST', '/api/news/99/publish', ('admin',), 403),
+    ('POST', '/api/news/99/unpublish', ('admin',), 403),
+
+    ('POST', '/api/uploads/images', ('admin', 'coach', 'staff'), 403),
+    ('PUT', '/api/uploads/avatar', EVERYONE, 403),
+
+    # Last: these really delete
+    ('DELETE', '/api/news/1', ('admin', 'coach'), 403),
+    ('DELETE', '/api/news/2', ('admin', 'staff'), 403),
+]
+
+
+class PermissionMatrixTest(unittest.TestCase):
+    """Every role against every protected endpoint."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+    def seed(self):
+        db.drop_all()
+        db.create_all()
+        users = {role: User(username=role, email=f'{role}@esc.tn', password='Secret123',
+                            first_name=role.title(), last_name='User', role=role) for role in ROLES}
+        other = User(username='other', email='other@esc.tn', password='Secret123',
+                     first_name='Other', last_name='Player', role='player')
+        db.session.add_all([*users.values(), other])
+        db.session.flush()
+        db.session.add_all([
+            Player(user_id=users['player'].id, position='ST', birth_date=date(2000, 1, 1), nationality='TN'),
+            Player(user_id=other.id, position='GK', birth_date=date(2000, 1, 1), nationality='TN'),
+            Match(opponent='CA', date=datetime(2024, 1, 1, 15), location='Chorbane'),
+            Training(title='Session', date=date(2024, 1, 2), start_time=time(9), end_time=time(10), location='Field'),
+            Finance(type='expense', category='equipment', amount=10, title='Balls',
+                    transaction_date=date(2024, 1, 1), created_by=users['admin'].id),
+            Finance(type='expense', category='equipment', amount=10, title='Shirts', status='approved',
+                    transaction_date=date(2024, 1, 1), created_by=users['admin'].id),
+        ])
+        for author, published in (('coach', True), ('staff', True), ('coach', False)):
+            db.session.add(News(title=f'Article by {author}', content='Body', author_id=users[author].id,
+                                slug=f'{author}-{published}', published=published,
+                                published_at=datetime(2024, 1, 1) if published else None))
+        db.session.commit()
+        return {role: create_access_token(identity=user.id, additional_claims=token_claims(user))
+                for role, user in users.items()}
+
+    def test_roles_by_endpoints(self):
+        for role in ROLES:
+            with self.app.app_context():
+                token = self.seed()[role]
+            for method, path, allowed, denied_status in MATRIX:
+                with self.subTest(role=role, endpoint=f'{method} {path}'):
+                    response = self.client.open(path, method=method, json={} if method != 'GET' else None,
+                                                headers={'Authorization': f'Bearer {token}'})
+                    if role in allowed:
+                        self.assertNotEqual(response.status_code, denied_status)
+                    else:
+                        self.assertEqual(response.status_code, denied_status)
+
+
+class PolicyTest(unittest.TestCase):
+
+    def test_general_permissions_unchanged(self):
+        granted = {
+            'admin': {'read', 'write', 'delete', 'manage_users', 'manage_finances'},
+            'coach': {'read', 'write', 'manage_players', 'manage_trainings'},
+            'staff': {'read', 'write'},
+            'player': {'read', 'update_profile'},
+            'supporter': {'read'},
+        }
+        for role, permissions in granted.items():
+            user = User(username=role, email=f'{role}@esc.tn', password='Secret123',
+                        first_name=role, last_name='User', role=role)
+            for permission in ('read', 'write', 'delete', 'manage_users', 'manage_finances',
+                               'manage_players', 'manage_trainings', 'update_profile', 'unknown'):
+                self.assertEqual(user.has_permission(permission), permission in permissions, (role, permission))
+
+    def test_unknown_permission_fails_at_declaration(self):
+        with self.assertRaises(ValueError):
+            requires(permission='players.fly')
+
+
+if __name__ == '__main__':
+    unittest.main()
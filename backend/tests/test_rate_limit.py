@@ -0,0 +1,101 @@
+import unittest
+
+from flask_jwt_extended import create_refresh_token
+from sqlalchemy import event
+
+from app import create_app, db, rate_limiter
+from app.services.rate_limit import MemoryStorage, RequestRateLimiter, Rule
+
+
+class RateLimitAlgorithmsTest(unittest.TestCase):
+
+    def limiter(self, strategy):
+        limiter = RequestRateLimiter()
+        limiter.strategy = strategy
+        limiter.storage = MemoryStorage()
+        return limiter
+
+    def test_sliding_window_weights_previous_window(self):
+        limiter = self.limiter('sliding-window')
+        rule = Rule('10/minute', 'test')
+        for second in range(10):
+            self.assertTrue(limiter.hit(rule, 'client', now=60 + second)[0])
+        allowed, remaining, retry_after = limiter.hit(rule, 'client', now=75)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 45)
+
+        # Half way through the next window, half of the previous count remains
+        allowed, remaining, _ = limiter.hit(rule, 'client', now=150)
+        self.assertTrue(allowed)
+        self.assertEqual(remaining, 4)
+
+    def test_token_bucket_refills_at_the_average_rate(self):
+        limiter = self.limiter('token-bucket')
+        rule = Rule('2/second', 'test')
+        self.assertTrue(limiter.hit(rule, 'client', now=100.0)[0])
+        self.assertTrue(limiter.hit(rule, 'client', now=100.0)[0])
+        allowed, _, retry_after = limiter.hit(rule, 'client', now=100.1)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 0.4)
+        self.assertTrue(limiter.hit(rule, 'client', now=100.5)[0])
+
+    def test_rule_parsing(self):
+        rule = Rule('100/5 minutes per user', 'test')
+        self.assertEqual((rule.limit, rule.period, rule.scope), (100, 300, 'user'))
+
+
+class RateLimitRequestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing', {'RATELIMIT_ENABLED': True,
+                                          'RATELIMITS': {'auth.login': ['3/minute'], 'news': ['100/minute'],
+                                                         'auth.refresh': ['2/minute per user']}})
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+    def test_rejected_logins_skip_the_database(self):
+        statements = []
+        with self.app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        for _ in range(3):
+            response = self.client.post('/api/auth/login', json={'username': 'x', 'password': 'y'})
+            self.assertEqual(response.status_code, 401)
+        queries = len(statements)
+
+        response = self.client.post('/api/auth/login', json={'username': 'x', 'password': 'y'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response.headers['Retry-After']), 1)
+        self.assertEqual(len(statements), queries)
+
+        # Another client is not affected
+        response = self.client.post('/api/auth/login', json={'username': 'x', 'password': 'y'},
+                                    environ_base={'REMOTE_ADDR': '10.0.0.2'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_is_limited_per_user(self):
+        with self.app.app_context():
+            tokens = {user_id: create_refresh_token(identity=user_id) for user_id in (1, 2)}
+
+        def refresh(user_id):
+            return self.client.post('/api/auth/refresh', headers={'Authorization': f'Bearer {tokens[user_id]}'})
+
+        for _ in range(2):
+            self.assertNotEqual(refresh(1).status_code, 429)
+        self.assertEqual(refresh(1).status_code, 429)
+        # Same address, another user: its own bucket
+        response = refresh(2)
+        self.assertNotEqual(response.status_code, 429)
+        self.assertEqual(response.headers['X-RateLimit-Remaining'], '1')
+
+    def test_blueprint_rules_report_remaining(self):
+        response = self.client.get('/api/news')
+        self.assertEqual(response.headers['X-RateLimit-Limit'], '100')
+        self.assertEqual(response.headers['X-RateLimit-Remaining'], '99')
+        self.assertNotIn('X-RateLimit-Limit', self.client.get('/api/health').headers)
+        self.assertIs(self.app.extensions['rate_limiter'], rate_limiter)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import Match, Player, PlayerStats, User
+from app.services import ratings
+
+
+class RatingEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.players = {}
+        for name in ('form', 'strong', 'weak', 'unrated'):
+            user = User(username=name, email=f'{name}@esc.tn', password='Secret123',
+                        first_name=name.title(), last_name='Player', role='player')
+            db.session.add(user)
+            db.session.flush()
+            player = Player(user_id=user.id, position='CM', birth_date=date(2000, 1, 1), nationality='TN', rating=5.5)
+            db.session.add(player)
+            db.session.flush()
+            self.players[name] = player.id
+
+        # Two losses against Strong, three wins against Weak, most recent first
+        self.matches = []
+        for days, opponent, result in ((1, 'Strong', 'loss'), (2, 'Strong', 'loss'), (3, 'Weak', 'win'),
+                                       (4, 'Weak', 'win'), (5, 'Weak', 'win')):
+            match = Match(opponent=opponent, date=datetime.now() - timedelta(days=days), location='Chorbane',
+                          result=result)
+            db.session.add(match)
+            db.session.flush()
+            self.matches.append(match.id)
+        db.session.add(Match(opponent='Strong', date=datetime.now() + timedelta(days=3), location='Chorbane'))
+        db.session.flush()
+
+        def stats(player, match, rating, minutes=90):
+            db.session.add(PlayerStats(player_id=self.players[player], match_id=self.matches[match],
+                                       performance_rating=rating, minutes_played=minutes))
+
+        # Newest first: 8 over 90', 6 over 45', unrated, 4 without minutes
+        stats('form', 0, 8.0)
+        stats('form', 1, 6.0, minutes=45)
+        stats('form', 2, None)
+        stats('form', 3, 4.0, minutes=0)
+        stats('strong', 0, 7.0)
+        stats('weak', 2, 7.0)
+        stats('unrated', 4, None)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def test_weighted_form(self):
+        self.app.config['RATING_OPPONENT_FACTOR'] = 0
+        # Unrated appearances are skipped, not averaged in as zeros
+        self.assertEqual(ratings.form_ratings()[self.players['form']], round((8 + 0.7 * 0.5 * 6) / (1 + 0.7 * 0.5), 2))
+        self.assertNotIn(self.players['unrated'], ratings.form_ratings())
+
+    def test_opponent_strength(self):
+        # Strong took 6 points in 2 matches, Weak none in 3: (6 + 3) / 12 and (0 + 3) / 15
+        form = ratings.form_ratings()
+        self.assertEqual(form[self.players['strong']], round(7 * (1 + 0.2 * (0.75 - 0.5)), 2))
+        self.assertEqual(form[self.players['weak']], round(7 * (1 + 0.2 * (0.2 - 0.5)), 2))
+
+    def test_refresh_is_one_select_and_one_update(self):
+        statements = []
+        listener = lambda *args: statements.append(args[2].split()[0])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        new = ratings.refresh()
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+        self.assertEqual(statements.count('SELECT'), 1)
+        self.assertEqual(statements.count('UPDATE'), 1)
+        stored = dict(db.session.query(Player.id, Player.rating))
+        self.assertEqual({player_id: stored[player_id] for player_id in new}, new)
+        self.assertEqual(stored[self.players['unrated']], 5.5)
+
+        player = db.session.get(Player, self.players['form'])
+        self.assertEqual(player.update_rating(), new[player.id])
+
+    def test_season_stats(self):
+        player = db.session.get(Player, self.players['form'])
+        season = date.today().year if date.today().month >= 8 else date.today().year - 1
+        expected = {stat.match_id for stat in player.stats if stat.match.date.date() >= date(season, 8, 1)}
+        self.assertEqual({stat.match_id for stat in player.get_season_stats(season)}, expected)
+        self.assertEqual(player.get_season_stats(1990), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from app import create_app, db, replica_router
+from app.models import News, User
+
+
+class ReplicaRoutingTest(unittest.TestCase):
+    """Two SQLite files stand in for the primary and its replica.
+
+    The files are not replicated, so each response shows which database
+    served it: the article title is 'Primary' on one and 'Replica' on the
+    other.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        primary = 'sqlite:///' + os.path.join(self.directory, 'primary.db')
+        replica = 'sqlite:///' + os.path.join(self.directory, 'replica.db')
+        self.app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': primary, 'DATABASE_REPLICA_URLS': [replica]})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            db.metadata.create_all(db.engines['replica:0'])
+            for engine, title in ((db.engines[None], 'Primary'), (db.engines['replica:0'], 'Replica')):
+                with engine.begin() as connection:
+                    connection.execute(User.__table__.insert(), {
+                        'id': 1, 'username': 'editor', 'email': 'editor@esc.tn', 'password_hash': 'x',
+                        'first_name': 'Ed', 'last_name': 'Itor', 'role': 'admin', 'is_active': True,
+                        'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow()})
+                    connection.execute(News.__table__.insert(), {
+                        'id': 1, 'title': title, 'slug': 'article', 'content': 'Body', 'category': 'club_news',
+                        'author_id': 1, 'published': True, 'published_at': datetime.utcnow(),
+                        'created_at': datetime.utcnow(), 'views_count': 0})
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        shutil.rmtree(self.directory)
+        shutil.rmtree(self.app.instance_path, ignore_errors=True)
+
+    def served_by(self):
+        response = self.client.get('/api/news')
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()['articles'][0]['title']
+
+    def views(self, bind):
+        with self.app.app_context():
+            with db.engines[bind].connect() as connection:
+                return connection.execute(db.select(News.views_count)).scalar()
+
+    def test_get_requests_read_from_replica(self):
+        self.assertEqual(self.served_by(), 'Replica')
+
+    def test_writes_in_get_requests_go_to_primary(self):
+        response = self.client.get('/api/news/1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.views(None), 1)
+        self.assertEqual(self.views('replica:0'), 0)
+
+    def test_client_reads_primary_after_a_write(self):
+        response = self.client.post('/api/auth/register', json={
+            'username': 'reader', 'email': 'reader@esc.tn', 'password': 'Secret123',
+            'first_name': 'Re', 'last_name': 'Ader'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.served_by(), 'Primary')
+
+        replica_router._writes.clear()  # window elapsed
+        self.assertEqual(self.served_by(), 'Replica')
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        with patch.object(replica_router, 'measure_lag', return_value=60.0):
+            self.assertEqual(self.served_by(), 'Primary')
+            self.assertFalse(self.client.get('/api/health/db').get_json()['replicas']['replica:0']['in_rotation'])
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        with patch.object(replica_router, 'measure_lag', side_effect=OSError('connection refused')):
+            self.assertEqual(self.served_by(), 'Primary')
+
+
+if __name__ == '__main__':
+    unittest.main()
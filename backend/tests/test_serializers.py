@@ -0,0 +1,198 @@
+import contextlib
+import json
+import re
+import unittest
+from datetime import date, datetime, time
+from decimal import Decimal
+from unittest import mock
+
+from flask import jsonify
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import Finance, Match, News, Player, PlayerStats, Training, TrainingAttendance, User
+from app.serializers import (
+    attendance_serializer, dumps, finance_serializer, match_serializer, news_serializer, player_serializer,
+    player_stats_serializer, training_serializer, user_serializer,
+)
+from app.services.tokens import token_claims
+
+
+class SerializerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.context = self.app.test_request_context()
+        self.context.push()
+        db.create_all()
+        self.user = User(username='admin', email='admin@esc.tn', password='Secret123', first_name='Ad',
+                         last_name='Min', role='admin', phone='+216 20 000 000', avatar='avatar.jpg')
+        db.session.add(self.user)
+        db.session.flush()
+        self.player = Player(user_id=self.user.id, position='ST', birth_date=date(1998, 5, 1), nationality='TN',
+                             jersey_number=9, height=Decimal('180.5'), weight=75, salary=Decimal('1200.50'),
+                             market_value=Decimal('50000'), contract_start=date(2024, 1, 1),
+                             contract_end=date(2026, 6, 30), medical_notes='Left knee')
+        self.match = Match(opponent='Club Africain', date=datetime(2024, 5, 1, 16, 30, 15, 123456),
+                           location='Chorbane', goals_for=2, goals_against=1, result='win',
+                           match_report='A deserved win', temperature=21.5)
+        db.session.add_all([self.player, self.match])
+        db.session.flush()
+        self.stats = PlayerStats(player_id=self.player.id, match_id=self.match.id, minutes_played=90, goals=1,
+                                 shots=4, shots_on_target=2, passes_completed=30, passes_attempted=40,
+                                 performance_rating=7.5)
+        self.training = Training(title='Pressing', date=date(2024, 5, 2), start_time=time(9),
+                                 end_time=time(10, 30), location='Chorbane')
+        db.session.add_all([self.stats, self.training])
+        db.session.flush()
+        self.attendance = TrainingAttendance(training_id=self.training.id, player_id=self.player.id,
+                                             attended=True, late_arrival=True)
+        self.finance = Finance(type='expense', category='equipment', amount=Decimal('1250.55'), title='Balls',
+                               transaction_date=date(2024, 2, 1), due_date=date(2024, 3, 1),
+                               created_by=self.user.id, payment_method='cash', reference_number='R-1',
+                               player_id=self.player.id, match_id=self.match.id, approved_by=self.user.id)
+        self.news = News(title='Derby win', content='word ' * 300, author_id=self.user.id, published=True,
+                         published_at=datetime(2024, 5, 2, 8), related_match_id=self.match.id,
+                         related_player_id=self.player.id, tags='derby,league', featured_image='derby.jpg')
+        self.news.save_with_unique_slug()
+        db.session.add_all([self.attendance, self.finance])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+
+class SerializerParityTest(SerializerTestCase):
+    """The serializers emit the same JSON as the models' to_dict()."""
+
+    def test_serializers_match_to_dict(self):
+        cases = [
+            (self.user, user_serializer, {}, {}),
+            (self.user, user_serializer, {'include_sensitive': True}, {'include_sensitive': True}),
+            (self.player, player_serializer, {}, {}),
+            (self.player, player_serializer, {'include_sensitive': True}, {'include_sensitive': True}),
+            (self.match, match_serializer, {}, {}),
+            (self.stats, player_stats_serializer, {}, {}),
+            (self.training, training_serializer, {}, {}),
+            (self.attendance, attendance_serializer, {}, {}),
+            (self.finance, finance_serializer, {}, {}),
+            (self.finance, finance_serializer, {'include_sensitive': True}, {'include_sensitive': True}),
+            (self.news, news_serializer, {}, {'include_content': False}),
+            (self.news, news_serializer, {'include_content': True}, {'include_content': True}),
+        ]
+        for obj, serializer, flags, to_dict_flags in cases:
+            expected = json.loads(jsonify(obj.to_dict(**to_dict_flags)).get_data())
+            # orjson when installed, and the standard library fallback
+            for backend in (contextlib.nullcontext(), mock.patch('app.serializers.orjson', None)):
+                with self.subTest(model=type(obj).__name__, flags=flags), backend:
+                    self.assertEqual(json.loads(dumps(serializer.dump(obj, **flags))), expected)
+                    self.assertEqual(json.loads(dumps(serializer.dump_many([obj], **flags))), [expected])
+
+        # The fixtures reach the related-object fields
+        finance = finance_serializer.dump(self.finance, include_sensitive=True)
+        self.assertEqual((finance['player_name'], finance['match_info']), ('Ad Min', 'vs Club Africain'))
+        self.assertEqual(news_serializer.dump(self.news)['related_player']['name'], 'Ad Min')
+
+    def test_decimal_and_date_encoding(self):
+        data = json.loads(dumps(finance_serializer.dump(self.finance, include_sensitive=True)))
+        self.assertEqual(data['amount'], 1250.55)
+        self.assertEqual(data['transaction_date'], '2024-02-01')
+        self.assertEqual(json.loads(dumps(match_serializer.dump(self.match)))['date'], '2024-05-01T16:30:15.123456')
+        self.assertEqual(json.loads(dumps(player_serializer.dump(self.player, include_sensitive=True)))['salary'],
+                         1200.5)
+
+
+class FieldsetTest(SerializerTestCase):
+    """?fields= and ?include= on the list endpoints."""
+
+    def setUp(self):
+        super().setUp()
+        supporter = User(username='fan', email='fan@esc.tn', password='Secret123', first_name='Fan',
+                         last_name='Club', role='supporter')
+        staff = User(username='staff', email='staff@esc.tn', password='Secret123', first_name='St',
+                     last_name='Aff', role='staff')
+        db.session.add_all([supporter, staff])
+        db.session.commit()
+        self.tokens = {user.role: create_access_token(identity=user.id, additional_claims=token_claims(user))
+                       for user in (self.user, supporter, staff)}
+        self.ids = {'player': self.player.id, 'match': self.match.id, 'finance': self.finance.id}
+
+        self.statements = []
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', self.record)
+        self.addCleanup(event.remove, engine, 'before_cursor_execute', self.record)
+        # Each request gets its own application context (and g)
+        db.session.remove()
+        self.context.pop()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        pass  # The fixtures' context was popped in setUp
+
+    def record(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def get(self, path, role=None):
+        headers = {'Authorization': f'Bearer {self.tokens[role]}'} if role else {}
+        self.statements.clear()
+        return self.client.get(path, headers=headers)
+
+    def selected(self, table):
+        """Columns returned by the SELECT statements on ``table``."""
+        return ' '.join(re.split(r'\sFROM\s', statement, maxsplit=1)[0] for statement in self.statements
+                        if statement.lstrip().upper().startswith('SELECT') and f'FROM {table}' in statement)
+
+    def test_unknown_fields_and_includes_are_rejected(self):
+        for path, role in (('/api/news?fields=id,bogus', None), ('/api/news?include=author', None),
+                           ('/api/matches?fields=score,secret', 'supporter'),
+                           ('/api/finances?include=creator', 'admin')):
+            with self.subTest(path=path):
+                response = self.get(path, role)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json()['error'], 'Invalid fieldset')
+
+    def test_sensitive_fields_need_the_role(self):
+        for path, role in (('/api/players?fields=id,salary', 'supporter'),
+                           ('/api/players?fields=medical_notes', 'supporter'),
+                           ('/api/finances?fields=id,payment_method', 'staff')):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path, role).status_code, 400)
+
+        response = self.get('/api/players?fields=id,salary', 'admin')
+        self.assertEqual(response.get_json()['players'], [{'id': self.ids['player'], 'salary': 1200.5}])
+        response = self.get('/api/finances?fields=id,payment_method', 'admin')
+        self.assertEqual(response.get_json()['transactions'], [{'id': self.ids['finance'], 'payment_method': 'cash'}])
+
+    def test_unrequested_text_columns_are_not_selected(self):
+        self.assertEqual(self.get('/api/news').status_code, 200)
+        self.assertNotIn('content', self.selected('news'))
+
+        self.get('/api/matches', 'supporter')
+        self.assertIn('match_report', self.selected('matches'))
+        response = self.get('/api/matches?fields=id,opponent,score', 'supporter')
+        self.assertEqual(response.get_json()['matches'],
+                         [{'id': self.ids['match'], 'opponent': 'Club Africain', 'score': '2-1'}])
+        self.assertNotIn('match_report', self.selected('matches'))
+
+        self.get('/api/players', 'admin')
+        self.assertIn('medical_notes', self.selected('players'))
+        response = self.get('/api/players?fields=id,full_name', 'admin')
+        self.assertEqual(response.get_json()['players'], [{'id': self.ids['player'], 'full_name': 'Ad Min'}])
+        self.assertNotIn('medical_notes', self.selected('players'))
+
+    def test_related_rows_load_only_the_columns_used(self):
+        article = self.get('/api/news').get_json()['articles'][0]
+        self.assertEqual((article['author_name'], article['related_player']['name']), ('Ad Min', 'Ad Min'))
+        self.assertEqual(article['related_match']['opponent'], 'Club Africain')
+
+        users = self.selected('users')
+        self.assertIn('first_name', users)
+        for column in ('email', 'password_hash', 'phone'):
+            self.assertNotIn(column, users)
+        self.assertNotIn('medical_notes', self.selected('players'))
+        self.assertNotIn('match_report', self.selected('matches'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from datetime import date, datetime, time, timedelta
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import Match, Player, PlayerStats, Training, TrainingAttendance, User
+from app.services import squad
+from app.services.tokens import token_claims
+
+
+class SquadSelectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            self.seed()
+
+    def seed(self):
+        today = date.today()
+        coach = User(username='coach', email='coach@esc.tn', password='Secret123',
+                     first_name='Co', last_name='Ach', role='coach')
+        db.session.add(coach)
+        contract = {'contract_start': today - timedelta(days=365), 'contract_end': today + timedelta(days=365)}
+        profiles = {
+            'fit': ('ST', 'active', contract),
+            'keeper': ('GK', 'active', contract),
+            'injured': ('ST', 'injured', contract),
+            'expired': ('CB', 'active', {'contract_start': date(2020, 1, 1), 'contract_end': date(2021, 1, 1)}),
+            'red': ('CB', 'active', contract),
+            'yellows': ('CM', 'active', contract),
+            'absent': ('CM', 'active', contract),
+            # Contract dates never entered: not held back
+            'unsigned': ('GK', 'active', {}),
+            'signing': ('CB', 'active', {'contract_start': today + timedelta(days=10)}),
+        }
+        self.ids = {}
+        for number, (name, (position, status, dates)) in enumerate(profiles.items(), start=1):
+            user = User(username=name, email=f'{name}@esc.tn', password='Secret123',
+                        first_name=name.title(), last_name='Player', role='player')
+            db.session.add(user)
+            db.session.flush()
+            player = Player(user_id=user.id, position=position, birth_date=date(2000, 1, 1), nationality='TN',
+                            jersey_number=number, status=status, **dates)
+            db.session.add(player)
+            db.session.flush()
+            self.ids[name] = player.id
+
+        matches = [Match(opponent=f'Opponent {i}', date=datetime.now() - timedelta(days=7 * i), location='Chorbane',
+                         result='win') for i in range(1, 4)]
+        self.upcoming = Match(opponent='Next', date=datetime.now() + timedelta(days=3), location='Chorbane')
+        db.session.add_all([*matches, self.upcoming])
+        db.session.flush()
+        # Red card in the last match, a yellow card in each of the last three
+        db.session.add(PlayerStats(player_id=self.ids['red'], match_id=matches[0].id, red_cards=1))
+        db.session.add_all(PlayerStats(player_id=self.ids['yellows'], match_id=match.id, yellow_cards=1)
+                           for match in matches)
+        # An old red card no longer counts
+        db.session.add(PlayerStats(player_id=self.ids['fit'], match_id=matches[2].id, red_cards=1))
+
+        trainings = [Training(title=f'Session {i}', date=today - timedelta(days=i), start_time=time(9),
+                              end_time=time(10), location='Field') for i in range(1, 4)]
+        db.session.add_all(trainings)
+        db.session.flush()
+        for training in trainings:
+            db.session.add(TrainingAttendance(training.id, self.ids['absent'], attended=False))
+            db.session.add(TrainingAttendance(training.id, self.ids['fit'], attended=True))
+        db.session.commit()
+        self.match_id = self.upcoming.id
+        self.token = create_access_token(identity=coach.id, additional_claims=token_claims(coach))
+
+    def test_sql_availability_matches_python(self):
+        with self.app.app_context():
+            for player in Player.query.all():
+                for name in ('is_available', 'contract_active', 'contract_running', 'is_suspended', 'is_selectable'):
+                    in_sql = Player.query.filter(Player.id == player.id, getattr(Player, name)).count() == 1
+                    self.assertEqual(in_sql, getattr(player, name), (player.id, name))
+                rate = db.session.query(Player.recent_attendance_rate).filter(Player.id == player.id).scalar()
+                self.assertEqual(rate, player.recent_attendance_rate)
+
+            pool, unavailable = squad.available_pool(include_unavailable=True)
+            self.assertEqual([player.player.id for player in pool['ST']], [self.ids['fit']])
+            self.assertEqual({player.player.id for player in pool['GK']}, {self.ids['keeper'], self.ids['unsigned']})
+            reasons = {candidate.player.id: candidate.reasons for candidate in unavailable}
+            self.assertEqual(reasons, {
+                self.ids['injured']: ['injured'],
+                self.ids['expired']: ['no_active_contract'],
+                self.ids['signing']: ['no_active_contract'],
+                self.ids['red']: ['card_suspension'],
+                self.ids['yellows']: ['card_suspension'],
+                self.ids['absent']: ['low_training_attendance'],
+            })
+
+    def test_pool_endpoint_is_one_query(self):
+        with self.app.app_context():
+            statements = []
+            event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        response = self.client.get(f'/api/matches/{self.match_id}/squad',
+                                   headers={'Authorization': f'Bearer {self.token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['available_count'], 3)
+        self.assertEqual(len([statement for statement in statements if 'FROM players' in statement]), 1)
+
+    def test_announce_rejects_unavailable_players(self):
+        headers = {'Authorization': f'Bearer {self.token}'}
+        response = self.client.post(f'/api/matches/{self.match_id}/squad', headers=headers,
+                                    json={'player_ids': [self.ids['fit'], self.ids['red']]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['player_ids'], [self.ids['red']])
+
+        response = self.client.post(f'/api/matches/{self.match_id}/squad', headers=headers,
+                                    json={'player_ids': [self.ids['fit'], self.ids['keeper']]})
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+from flask_jwt_extended import create_access_token, decode_token
+from sqlalchemy import event
+
+from app import create_app, db, token_revocation
+from app.models import User
+
+
+class TokenClaimsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            db.session.add(User(username='coach', email='coach@esc.tn', password='Secret123',
+                                first_name='Co', last_name='Ach', role='coach'))
+            db.session.commit()
+
+    def login(self):
+        response = self.client.post('/api/auth/login', json={'username': 'coach', 'password': 'Secret123'})
+        return response.get_json()
+
+    def headers(self, token):
+        return {'Authorization': f'Bearer {token}'}
+
+    def test_claims_authorize_without_user_queries(self):
+        token = self.login()['access_token']
+        with self.app.app_context():
+            self.assertEqual(decode_token(token)['role'], 'coach')
+            statements = []
+            event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        self.assertEqual(self.client.get('/api/matches', headers=self.headers(token)).status_code, 200)
+        self.assertFalse([statement for statement in statements if 'FROM users' in statement])
+
+        # Coaches may create matches, delete is admin only
+        self.assertEqual(self.client.post('/api/matches', json={}, headers=self.headers(token)).status_code, 400)
+        response = self.client.delete('/api/matches/1', headers=self.headers(token))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.get_json()['error'], 'Admin access required')
+
+    def test_role_change_revokes_access_tokens(self):
+        tokens = self.login()
+        with self.app.app_context():
+            User.query.filter_by(username='coach').one().role = 'supporter'
+            db.session.commit()
+
+        response = self.client.get('/api/matches', headers=self.headers(tokens['access_token']))
+        self.assertEqual(response.status_code, 401)
+
+        # The refresh token still works and picks up the new role
+        response = self.client.post('/api/auth/refresh', headers=self.headers(tokens['refresh_token']))
+        access_token = response.get_json()['access_token']
+        self.assertEqual(self.client.get('/api/matches', headers=self.headers(access_token)).status_code, 200)
+        self.assertEqual(self.client.post('/api/matches', json={}, headers=self.headers(access_token)).status_code, 403)
+
+    def test_logout_and_outdated_tokens(self):
+        token = self.login()['access_token']
+        self.assertEqual(self.client.post('/api/auth/logout', headers=self.headers(token)).status_code, 200)
+        self.assertEqual(self.client.get('/api/matches', headers=self.headers(token)).status_code, 401)
+
+        with self.app.app_context():
+            token = create_access_token(identity=1)
+        response = self.client.get('/api/matches', headers=self.headers(token))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.get_json()['error'], 'Token outdated')
+
+    def test_revocation_precision(self):
+        with self.app.app_context():
+            token_revocation.revoke_user(1)
+            payload = decode_token(self.login()['access_token'])
+        # iat stays an integer NumericDate; issued_at tells the new token apart
+        self.assertIsInstance(payload['iat'], int)
+        self.assertFalse(token_revocation.is_revoked(payload))
+        self.assertTrue(token_revocation.is_revoked({**payload, 'issued_at': payload['issued_at'] - 1}))
+        # Tokens without issued_at: revoked within the second of the revocation
+        del payload['issued_at']
+        payload['iat'] = int(token_revocation._users['1'])
+        self.assertTrue(token_revocation.is_revoked(payload))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from flask_jwt_extended import create_access_token
+from PIL import Image
+
+from app import create_app, db, media_store
+from app.models import News, User
+from app.services.media import UploadError, variant_path
+from app.services.tokens import token_claims
+
+
+def make_image(width=1200, height=800, image_format='PNG', color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+class UploadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.app = create_app('testing', {'UPLOAD_FOLDER': self.media_root})
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            coach = User(username='coach', email='coach@esc.tn', password='Secret123',
+                         first_name='Co', last_name='Ach', role='coach')
+            db.session.add(coach)
+            db.session.commit()
+            self.coach_id = coach.id
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=coach.id, additional_claims=token_claims(coach))}'}
+
+    def tearDown(self):
+        shutil.rmtree(self.media_root)
+
+    def upload(self, data, path='/api/uploads/images', method='post'):
+        return getattr(self.client, method)(path, data=data, headers={**self.headers, 'Content-Type': 'image/png'})
+
+    def test_streamed_hash_and_dedup(self):
+        data = make_image()
+        with self.app.app_context(), self.assertRaises(UploadError):
+            media_store.save_image(io.BytesIO(b''))
+
+        media_store.CHUNK_SIZE, chunk_size = 1024, media_store.CHUNK_SIZE
+        self.addCleanup(setattr, media_store, 'CHUNK_SIZE', chunk_size)
+        first = self.upload(data).get_json()['image']
+        self.assertEqual(first['hash'], hashlib.sha256(data).hexdigest())
+        self.assertEqual((first['size'], first['width'], first['height'], first['duplicate']), (len(data), 1200, 800, False))
+
+        second = self.upload(data).get_json()['image']
+        self.assertEqual((second['hash'], second['duplicate']), (first['hash'], True))
+        originals = [name for _, _, names in os.walk(os.path.join(self.media_root, 'originals')) for name in names]
+        self.assertEqual(originals, [f"{first['hash']}.png"])
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'tmp')), [])
+
+    def test_rejects_non_images(self):
+        response = self.upload(b'%PDF-1.4 not an image')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['error'], 'File is not a supported image')
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'tmp')), [])
+
+        response = self.upload(make_image(image_format='BMP'))
+        self.assertEqual((response.status_code, response.get_json()['error']), (400, 'Unsupported image format'))
+
+        # The size limit is enforced while streaming
+        media_store.max_size = 1000
+        self.assertEqual(self.upload(make_image()).status_code, 413)
+
+    def test_variants_are_generated_by_a_job(self):
+        image = self.upload(make_image()).get_json()['image']
+        self.assertTrue(image['variants_ready'])
+        for name, width in self.app.config['UPLOAD_IMAGE_SIZES'].items():
+            for extension in ('jpg', 'webp'):
+                with Image.open(media_store.path_for(variant_path(image['hash'], name, extension))) as variant:
+                    self.assertEqual(variant.size, (width, round(800 * width / 1200)))
+
+        # The sources list every variant, smallest first
+        sources = image['sources']
+        self.assertEqual(sources['src'], image['url'])
+        self.assertEqual(sources['thumb'], media_store.url_for(variant_path(image['hash'], 'thumb', 'jpg')))
+        self.assertEqual(sources['webp_srcset'].split(', ')[1],
+                         f"{media_store.url_for(variant_path(image['hash'], 'medium', 'webp'))} 960w")
+
+    def test_avatar_and_featured_image_sources(self):
+        user = self.upload(make_image(), '/api/uploads/avatar', 'put').get_json()['user']
+        self.assertEqual(user['avatar_sources']['src'], user['avatar'])
+        self.assertIn('320w', user['avatar_sources']['srcset'])
+
+        with self.app.app_context():
+            article = News(title='Photo', content='Text', author_id=self.coach_id, featured_image=user['avatar'])
+            self.assertEqual(article.featured_image_sources, user['avatar_sources'])
+            # Links saved before uploads existed have no variants
+            article.featured_image = 'https://example.com/photo.jpg'
+            self.assertIsNone(article.featured_image_sources)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Background job worker for the ESC Football App
+
+Runs jobs queued in Redis (JOB_QUEUE_BACKEND=redis), including scheduled
+jobs and retries.
+"""
+
+import argparse
+import os
+import sys
+import threading
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, job_queue
+
+def create_worker_app():
+    """The app without HTTP routes, plus the task definitions."""
+    app = create_app(os.getenv('FLASK_ENV', 'production'), {'BLUEPRINTS': []})
+    from app import tasks  # noqa: F401
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the background job worker.')
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('JOB_WORKERS', 4)))
+    parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty')
+    args = parser.parse_args()
+
+    app = create_worker_app()
+    if job_queue.backend != 'redis':
+        print('The worker requires JOB_QUEUE_BACKEND=redis')
+        sys.exit(1)
+
+    app.logger.info('Job worker started with %d threads (%d tasks registered)',
+                    args.concurrency, len(job_queue.tasks))
+
+    threads = [threading.Thread(target=job_queue.work, kwargs={'burst': args.burst}, daemon=True)
+               for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -183,6 +183,8 @@ BEGIN
         CREATE INDEX IF NOT EXISTS idx_news_published_at ON news(published_at);
         CREATE INDEX IF NOT EXISTS idx_news_category ON news(category);
         CREATE INDEX IF NOT EXISTS idx_news_slug ON news(slug);
+        -- Prefix index for slug suffix allocation (slug LIKE 'base-%')
+        CREATE INDEX IF NOT EXISTS idx_news_slug_pattern ON news(slug varchar_pattern_ops);
         CREATE INDEX IF NOT EXISTS idx_news_is_featured ON news(is_featured);
         CREATE INDEX IF NOT EXISTS idx_news_is_breaking ON news(is_breaking);
         
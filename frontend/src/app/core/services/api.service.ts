@@ -181,6 +181,23 @@ export class ApiService {
     return this.http.get(`${this.API_URL}/matches/${matchId}/stats`);
   }
 
+  /**
+   * Live match events (snapshot, score, goal, card) pushed by the server.
+   * EventSource reconnects on its own and resumes with Last-Event-ID,
+   * so there is no need to poll getMatch() during a match. EventSource
+   * cannot set headers, so the access token goes in the query string.
+   */
+  watchMatch(matchId: number): Observable<{ type: string; data: any }> {
+    return new Observable(subscriber => {
+      const token = encodeURIComponent(localStorage.getItem('access_token') || '');
+      const source = new EventSource(`${this.API_URL}/matches/${matchId}/live?access_token=${token}`);
+      const forward = (event: MessageEvent) =>
+        subscriber.next({ type: event.type, data: JSON.parse(event.data) });
+      ['snapshot', 'score', 'goal', 'card'].forEach(type => source.addEventListener(type, forward));
+      return () => source.close();
+    });
+  }
+
   getUpcomingMatches(limit?: number): Observable<any> {
     let params = new HttpParams();
     if (limit) {